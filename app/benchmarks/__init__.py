@@ -0,0 +1,87 @@
+"""
+Benchmarks of the planets API, run against a throwaway test database.
+
+Each benchmark is a module runnable from the app directory, for example:
+
+    python -m benchmarks.search --rows 1000000
+"""
+import math
+import os
+from contextlib import contextmanager
+
+
+def setup_django():
+    """
+    Configure Django for a benchmark run from the command line.
+    """
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "drf_project.settings")
+    # Logging the timings of every request would flood the output.
+    os.environ.setdefault("SERVER_TIMING_LOG_LEVEL", "WARNING")
+    django.setup()
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """
+    Context manager that runs its block against a freshly migrated test database.
+
+    The planet response cache is emptied too, since it outlives the runs and
+    would otherwise serve planets of an earlier database.
+
+    Args:
+        keepdb (bool, optional): Whether to keep the test database afterwards.
+            Defaults to False.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.test.utils import teardown_test_environment
+
+    from planets.cache import get_cache
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    get_cache().clear()
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def percentile(values, fraction):
+    """
+    Compute a percentile with the nearest-rank method.
+
+    Args:
+        values (list): The measures.
+        fraction (float): The percentile, between 0 and 1.
+
+    Returns:
+        float: The smallest measure that `fraction` of the measures are below or equal to.
+    """
+    ordered = sorted(values)
+    index = min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1
+    return ordered[index]
+
+
+def summarize(latencies):
+    """
+    Summarize latencies in milliseconds.
+
+    Args:
+        latencies (list): The latencies, in seconds.
+
+    Returns:
+        dict: The count, mean, median, 95th and 99th percentiles and maximum.
+    """
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        "count": len(milliseconds),
+        "mean_ms": round(sum(milliseconds) / len(milliseconds), 3),
+        "p50_ms": round(percentile(milliseconds, 0.50), 3),
+        "p95_ms": round(percentile(milliseconds, 0.95), 3),
+        "p99_ms": round(percentile(milliseconds, 0.99), 3),
+        "max_ms": round(max(milliseconds), 3),
+    }
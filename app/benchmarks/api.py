@@ -0,0 +1,324 @@
+"""
+Benchmark suite of the planet API and the populate command, with a baseline to compare runs to.
+
+For each of `--sizes`, loads that many planets linked to one to three
+terrains and one or two climates into a fresh test database, then times
+`--requests` requests of each kind, one after the other, recording their
+latency percentiles, their throughput and the most queries one of them ran:
+
+- list: GET /api/planets/?page_size=20
+- detail: GET /api/planets/<id>/
+- create: POST /api/planets/
+- update: PUT /api/planets/<id>/
+- delete: DELETE /api/planets/<id>/, of the planets created
+
+Then `populate` loads `--populate-rows` more planets from a local fake
+GraphQL API, and its duration, rows per second and queries are recorded:
+
+    python -m benchmarks.api --sizes 1000 100000 1000000 --output results.json
+
+Responses are not cached unless `--cache-timeout` is given, so every request
+reaches the database. A previous output passed as `--baseline` is compared
+with the run: a latency above the baseline by more than `--tolerance`, a
+throughput below it by as much, or any extra query is a regression, and the
+process exits with status 1.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from io import StringIO
+
+from benchmarks import setup_django
+from benchmarks import summarize
+from benchmarks import test_database
+from benchmarks.denorm import link_planets
+from benchmarks.search import load_planets
+from benchmarks.search import synthetic_names
+
+
+SCENARIOS = ("list", "detail", "create", "update", "delete")
+
+# Whether a higher value of each compared metric is better, or None when the
+# value must not grow at all.
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "throughput_rps": True,
+    "seconds": False,
+    "rows_per_s": True,
+    "queries": None,
+}
+
+
+class QueryCounter:
+    """
+    Execute wrapper counting the queries run on a connection.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def build_requests(scenario, planets, count, seed=0):
+    """
+    Build the requests of a scenario.
+
+    Args:
+        scenario (str): One of SCENARIOS.
+        planets (list): The (id, name) of the planets the requests may target.
+            The delete scenario deletes each of them once.
+        count (int): The number of requests.
+        seed (int, optional): Seed of the random targets. Defaults to 0.
+
+    Returns:
+        list: The method, path, JSON body or None, and expected status of each request.
+    """
+    rng = random.Random(seed)
+    if scenario == "list":
+        return [("get", "/api/planets/?page_size=20", None, 200)] * count
+    if scenario == "detail":
+        return [("get", f"/api/planets/{pk}/", None, 200) for pk, _ in rng.choices(planets, k=count)]
+    if scenario == "create":
+        return [
+            ("post", "/api/planets/", {"name": f"Benchmark {index}", "population": index}, 201)
+            for index in range(count)
+        ]
+    if scenario == "update":
+        return [
+            ("put", f"/api/planets/{pk}/", {"name": name, "population": index}, 200)
+            for index, (pk, name) in enumerate(rng.choices(planets, k=count))
+        ]
+    if scenario == "delete":
+        return [("delete", f"/api/planets/{pk}/", None, 204) for pk, _ in planets[:count]]
+    raise ValueError(f"Unknown scenario: {scenario}.")
+
+
+def measure(client, requests):
+    """
+    Send requests one after the other, timing them and counting their queries.
+
+    Args:
+        client (Client): The Django test client.
+        requests (list): The requests (see `build_requests`).
+
+    Returns:
+        tuple: The latency of each request in seconds, the number of queries
+        of each request, and the seconds taken by all of them.
+
+    Raises:
+        AssertionError: If a response does not have the expected status.
+    """
+    from django.db import connection
+
+    latencies = []
+    queries = []
+    started = time.perf_counter()
+    for method, path, body, expected in requests:
+        options = {} if body is None else {"data": json.dumps(body), "content_type": "application/json"}
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            request_started = time.perf_counter()
+            response = getattr(client, method)(path, **options)
+            latencies.append(time.perf_counter() - request_started)
+        queries.append(counter.count)
+        assert response.status_code == expected, f"{method.upper()} {path}: {response.status_code}"
+    return latencies, queries, time.perf_counter() - started
+
+
+def measure_populate(rows, page_size=100, concurrency=4):
+    """
+    Time `populate` loading planets from a local fake GraphQL API.
+
+    Args:
+        rows (int): The number of planets served by the API.
+        page_size (int, optional): The number of planets per page. Defaults to 100.
+        concurrency (int, optional): The number of pages fetched at once. Defaults to 4.
+
+    Returns:
+        dict: The seconds taken, the rows per second and the number of queries.
+    """
+    from django.core.management import call_command
+    from django.db import connection
+
+    from benchmarks.fake_graphql import FakeGraphQLServer
+    from benchmarks.fake_graphql import make_planets
+
+    counter = QueryCounter()
+    with FakeGraphQLServer(make_planets(rows)) as server, connection.execute_wrapper(counter):
+        started = time.perf_counter()
+        call_command(
+            "populate",
+            "--url", server.url,
+            "--page-size", str(page_size),
+            "--concurrency", str(concurrency),
+            stdout=StringIO(),
+        )
+        seconds = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(rows / seconds, 1),
+        "queries": counter.count,
+    }
+
+
+def run(rows, requests, warmup=20, populate_rows=1000, cache_timeout=0):
+    """
+    Load the dataset and time every scenario and `populate`, in the current database.
+
+    Args:
+        rows (int): The number of planets.
+        requests (int): The number of requests timed per scenario.
+        warmup (int, optional): The number of requests of each scenario sent
+            before timing. Defaults to 20.
+        populate_rows (int, optional): The number of planets loaded by
+            `populate`. Defaults to 1000.
+        cache_timeout (int, optional): How long responses are cached. Defaults to 0.
+
+    Returns:
+        dict: The latency summary, throughput and most queries per request of
+        each scenario, the measures of `populate`, and the time spent loading
+        the dataset.
+    """
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from planets.models import Planet
+
+    started = time.perf_counter()
+    load_planets(synthetic_names(rows))
+    link_planets()
+    load_seconds = time.perf_counter() - started
+
+    client = Client()
+    planets = list(Planet.objects.values_list("id", "name"))
+    result = {"rows": rows, "load_s": round(load_seconds, 1), "scenarios": {}}
+    with override_settings(PLANETS_CACHE_TIMEOUT=cache_timeout):
+        for scenario in SCENARIOS:
+            if scenario == "delete":
+                planets = list(Planet.objects.filter(name__startswith="Benchmark ").values_list("id", "name"))
+            batch = build_requests(scenario, planets, warmup + requests)
+            measure(client, batch[:warmup])
+            latencies, queries, elapsed = measure(client, batch[warmup:])
+            result["scenarios"][scenario] = {
+                **summarize(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 1),
+                "queries": max(queries),
+            }
+    if populate_rows:
+        result["scenarios"]["populate"] = measure_populate(populate_rows)
+    result["vendor"] = connection.vendor
+    return result
+
+
+def compare(result, baseline, tolerance):
+    """
+    Find the measures of a run that regressed from a baseline run.
+
+    Measures are matched by dataset size and scenario. Those missing from
+    either run are skipped.
+
+    Args:
+        result (dict): The output of the run.
+        baseline (dict): The output of the baseline run.
+        tolerance (float): The fraction a latency may grow, or a throughput
+            shrink, by. Query counts may not grow at all.
+
+    Returns:
+        list: The regressions, each with the size, scenario, metric, and the
+        baseline and current values.
+    """
+    baseline_runs = {run["rows"]: run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in result["runs"]:
+        baseline_run = baseline_runs.get(run["rows"], {"scenarios": {}})
+        for scenario, measures in run["scenarios"].items():
+            baseline_measures = baseline_run["scenarios"].get(scenario, {})
+            for metric, higher_is_better in METRICS.items():
+                if metric not in measures or metric not in baseline_measures:
+                    continue
+                current, expected = measures[metric], baseline_measures[metric]
+                if higher_is_better is None:
+                    regressed = current > expected
+                elif higher_is_better:
+                    regressed = current * (1 + tolerance) < expected
+                else:
+                    regressed = current > expected * (1 + tolerance)
+                if regressed:
+                    regressions.append({
+                        "rows": run["rows"],
+                        "scenario": scenario,
+                        "metric": metric,
+                        "baseline": expected,
+                        "current": current,
+                    })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000],
+        help="Numbers of planets, each loaded into a fresh database (default: 1000 100000 1000000).",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests per scenario (default: 200).")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests per scenario before timing (default: 20).")
+    parser.add_argument(
+        "--populate-rows", type=int, default=1000,
+        help="Number of planets loaded by populate, or 0 to skip it (default: 1000).",
+    )
+    parser.add_argument("--cache-timeout", type=int, default=0, help="Seconds responses are cached (default: 0).")
+    parser.add_argument("--output", help="Path the results are written to, as JSON.")
+    parser.add_argument("--baseline", help="Path of the results of a previous run to compare with.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2,
+        help="Fraction a latency or throughput may regress by before failing (default: 0.2).",
+    )
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+
+    # Django never closes an in-memory SQLite database, so each size would
+    # find the planets of the previous one.
+    database = settings.DATABASES["default"]
+    if database["ENGINE"] == "django.db.backends.sqlite3":
+        database.setdefault("TEST", {})["NAME"] = os.path.join(tempfile.gettempdir(), "benchmark_api.sqlite3")
+
+    result = {
+        "benchmark": "api",
+        "requests": args.requests,
+        "populate_rows": args.populate_rows,
+        "cache_timeout": args.cache_timeout,
+        "runs": [],
+    }
+    for rows in args.sizes:
+        with test_database():
+            result["runs"].append(
+                run(rows, args.requests, args.warmup, args.populate_rows, args.cache_timeout)
+            )
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            result["baseline"] = args.baseline
+            result["tolerance"] = args.tolerance
+            result["regressions"] = compare(result, json.load(baseline), args.tolerance)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+    return 1 if result.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
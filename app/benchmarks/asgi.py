@@ -0,0 +1,214 @@
+"""
+Benchmark of the planet reads served by the async views under ASGI against the sync views under WSGI.
+
+Loads `--rows` planets into a test database, then starts gunicorn on it three
+times: with its sync workers on drf_project.wsgi, as in Dockerfile.prod, and
+with uvicorn workers on drf_project.asgi, with the sync views and then with
+the async views. Each server gets `--requests` list and detail requests,
+`--concurrency` at a time, and their requests per second and latency
+percentiles are compared:
+
+    python -m benchmarks.asgi --rows 10000 --requests 5000 --concurrency 200
+
+Responses are not cached unless `--cache-timeout` is given, so every request
+reaches the database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import setup_django
+from benchmarks import summarize
+from benchmarks import test_database
+from benchmarks.denorm import link_planets
+from benchmarks.search import load_planets
+from benchmarks.search import synthetic_names
+
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+ASGI = ["drf_project.asgi:application", "--worker-class", "uvicorn.workers.UvicornWorker"]
+
+# The gunicorn arguments and the environment of each server.
+SERVERS = {
+    "wsgi": (["drf_project.wsgi:application"], {}),
+    "asgi_sync_views": (ASGI, {"PLANETS_ASYNC_VIEWS": "0"}),
+    "asgi": (ASGI, {"PLANETS_ASYNC_VIEWS": "1"}),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(name, database, workers, cache_timeout, timeout=30):
+    """
+    Start gunicorn on the test database and wait until it answers.
+
+    Args:
+        name (str): The name of the server in SERVERS.
+        database (str): The name of the test database.
+        workers (int): The number of gunicorn workers.
+        cache_timeout (int): The PLANETS_CACHE_TIMEOUT of the server.
+        timeout (int, optional): Seconds to wait for the server. Defaults to 30.
+
+    Returns:
+        tuple: The server process and its base URL.
+    """
+    from urllib.error import URLError
+    from urllib.request import urlopen
+
+    port = free_port()
+    arguments, server_env = SERVERS[name]
+    env = {
+        **os.environ,
+        **server_env,
+        "SQL_DATABASE": database,
+        "DJANGO_ALLOWED_HOSTS": "127.0.0.1",
+        "PLANETS_CACHE_TIMEOUT": str(cache_timeout),
+        "DEBUG": "0",
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", *arguments,
+            "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=APP_DIR,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urlopen(f"{url}/ping/"):
+                return process, url
+        except (URLError, ConnectionError):
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"The {name} server did not start.")
+
+
+async def load(url, paths, concurrency):
+    """
+    Send GET requests, `concurrency` at a time.
+
+    Args:
+        url (str): The base URL of the server.
+        paths (list): The paths requested.
+        concurrency (int): The number of requests in flight.
+
+    Returns:
+        tuple: The latency of each request, in seconds, and the total time.
+    """
+    import aiohttp
+
+    queue = list(reversed(paths))
+    latencies = []
+
+    async def worker(session):
+        while queue:
+            path = queue.pop()
+            started = time.perf_counter()
+            async with session.get(url + path) as response:
+                await response.read()
+                assert response.status == 200, response.status
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        return latencies, time.perf_counter() - started
+
+
+def sample_paths(planet_ids, count, seed=0):
+    """
+    Pick the requests: one list page for every four planet details.
+
+    Returns:
+        list: The paths.
+    """
+    rng = random.Random(seed)
+    return [
+        "/api/planets/?page_size=20" if index % 5 == 0 else f"/api/planets/{rng.choice(planet_ids)}/"
+        for index in range(count)
+    ]
+
+
+def run(rows, requests, concurrency, workers=1, cache_timeout=0, warmup=100):
+    """
+    Load the dataset and put every server under the same load, in the current database.
+
+    Args:
+        rows (int): The number of planets.
+        requests (int): The number of requests timed on each server.
+        concurrency (int): The number of requests in flight.
+        workers (int, optional): The number of workers of each server. Defaults to 1.
+        cache_timeout (int, optional): How long responses are cached. Defaults to 0.
+        warmup (int, optional): The number of requests sent before timing. Defaults to 100.
+
+    Returns:
+        dict: The requests per second and latency summary of each server.
+    """
+    from django.db import connection
+    from planets.models import Planet
+
+    load_planets(synthetic_names(rows))
+    link_planets()
+    paths = sample_paths(list(Planet.objects.values_list("id", flat=True)), requests)
+
+    result = {
+        "benchmark": "asgi",
+        "vendor": connection.vendor,
+        "rows": rows,
+        "concurrency": concurrency,
+        "workers": workers,
+    }
+    for name in SERVERS:
+        process, url = start_server(name, connection.settings_dict["NAME"], workers, cache_timeout)
+        try:
+            asyncio.run(load(url, paths[:warmup], concurrency))
+            latencies, elapsed = asyncio.run(load(url, paths, concurrency))
+        finally:
+            process.terminate()
+            process.wait()
+        result[name] = {"requests_per_s": round(len(latencies) / elapsed, 1), **summarize(latencies)}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Number of planets (default: 10000).")
+    parser.add_argument("--requests", type=int, default=5000, help="Number of requests per server (default: 5000).")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight (default: 200).")
+    parser.add_argument("--workers", type=int, default=1, help="Workers per server (default: 1).")
+    parser.add_argument("--cache-timeout", type=int, default=0, help="Seconds responses are cached (default: 0).")
+    parser.add_argument("--keepdb", action="store_true", help="Keep the test database.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+
+    # An in-memory SQLite test database cannot be shared with the servers.
+    database = settings.DATABASES["default"]
+    if database["ENGINE"] == "django.db.backends.sqlite3":
+        database.setdefault("TEST", {})["NAME"] = os.path.join(tempfile.gettempdir(), "benchmark_planets.sqlite3")
+
+    with test_database(keepdb=args.keepdb):
+        result = run(args.rows, args.requests, args.concurrency, args.workers, args.cache_timeout)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark of the per-request database connection overhead, with and without persistent or pooled connections.
+
+Times `--requests` request cycles against a test database: the connection
+is checked as at the start of a request, one query is run, and the
+connection is closed or kept as at the end of the request. Each cycle runs
+with a new connection per request (CONN_MAX_AGE=0), with a persistent
+connection checked by CONN_HEALTH_CHECKS, and, on PostgreSQL, with a
+connection checked out of the drf_project.db.postgresql_pool pool:
+
+    python -m benchmarks.connections --requests 2000
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks import setup_django
+from benchmarks import summarize
+from benchmarks import test_database
+
+
+POOLED_ENGINE = "drf_project.db.postgresql_pool"
+
+# The database settings each mode overrides.
+MODES = {
+    "per_request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": True},
+    "pooled": {"ENGINE": POOLED_ENGINE, "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+}
+
+
+def modes(vendor):
+    """
+    List the modes that can run on a database vendor, the pool being PostgreSQL only.
+
+    Returns:
+        list: The names of the modes.
+    """
+    return [name for name in MODES if name != "pooled" or vendor == "postgresql"]
+
+
+def measure(alias, requests):
+    """
+    Time request cycles on a database alias.
+
+    Args:
+        alias (str): The database alias.
+        requests (int): The number of request cycles.
+
+    Returns:
+        list: The latency of each cycle, in seconds.
+    """
+    from django.db import connections
+
+    connection = connections[alias]
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        # What the request_started and request_finished signals do.
+        connection.close_if_unusable_or_obsolete()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        connection.close_if_unusable_or_obsolete()
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return latencies
+
+
+def run(requests, warmup=50):
+    """
+    Time the request cycles of every mode, on the current database.
+
+    Args:
+        requests (int): The number of request cycles timed in each mode.
+        warmup (int, optional): The number of cycles run before timing. Defaults to 50.
+
+    Returns:
+        dict: The summary of the latencies of each mode, the pool statistics,
+        and the overhead per request removed by persistent connections.
+    """
+    from django.db import connection
+    from django.db import connections
+
+    from drf_project.db import pool
+
+    result = {"benchmark": "connections", "vendor": connection.vendor, "requests": requests}
+    for name in modes(connection.vendor):
+        alias = f"benchmark_{name}"
+        connections.settings[alias] = {**connection.settings_dict, **MODES[name]}
+        try:
+            measure(alias, warmup)
+            result[name] = summarize(measure(alias, requests))
+        finally:
+            del connections[alias]
+            del connections.settings[alias]
+        if alias in pool.pools:
+            result[name]["pool"] = pool.pools[alias].stats()
+            pool.pools.pop(alias).close_idle()
+    result["overhead_removed_ms"] = round(result["per_request"]["p50_ms"] - result["persistent"]["p50_ms"], 3)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Number of requests per mode (default: 2000).")
+    parser.add_argument("--keepdb", action="store_true", help="Keep the test database.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database(keepdb=args.keepdb):
+        result = run(args.requests)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
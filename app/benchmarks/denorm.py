@@ -0,0 +1,138 @@
+"""
+Benchmark of reading pages of planets through the joins or the denormalized names.
+
+Loads `--rows` planets linked to a few terrains and climates into a test
+database, then times `--pages` pages of `--page-size` planets serialized by
+PlanetReadSerializer, once reading the terrains and climates from the through
+tables and once from the denormalized columns:
+
+    python -m benchmarks.denorm --rows 100000 --pages 500
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from benchmarks import setup_django
+from benchmarks import summarize
+from benchmarks import test_database
+from benchmarks.search import load_planets
+from benchmarks.search import synthetic_names
+
+
+def link_planets(terrains=40, climates=20, seed=0, batch_size=10000):
+    """
+    Link every planet to one to three terrains and one or two climates, then fill their denormalized names.
+
+    Args:
+        terrains (int, optional): The number of terrains. Defaults to 40.
+        climates (int, optional): The number of climates. Defaults to 20.
+        seed (int, optional): Seed of the random links. Defaults to 0.
+        batch_size (int, optional): The number of links per insert. Defaults to 10000.
+    """
+    from planets import denorm
+    from planets.models import Climate
+    from planets.models import Planet
+    from planets.models import Terrain
+
+    rng = random.Random(seed)
+    planet_ids = list(Planet.objects.values_list("id", flat=True))
+    for relation, model, count, most in (
+        ("terrains", Terrain, terrains, 3),
+        ("climates", Climate, climates, 2),
+    ):
+        model.objects.bulk_create(model(name=f"{relation[:-1]} {index}") for index in range(count))
+        targets = list(model.objects.values_list("id", flat=True))
+        through = getattr(Planet, relation).through
+        column = f"{getattr(Planet, relation).field.m2m_reverse_field_name()}_id"
+        links = [
+            through(planet_id=planet_id, **{column: target_id})
+            for planet_id in planet_ids
+            for target_id in rng.sample(targets, rng.randint(1, most))
+        ]
+        through.objects.bulk_create(links, batch_size=batch_size)
+    denorm.refresh(planet_ids)
+
+
+def measure(pages, page_size, joined):
+    """
+    Time the serialization of pages of planets, queries included.
+
+    Args:
+        pages (list): The id after which each page starts.
+        page_size (int): The number of planets per page.
+        joined (bool): Whether to read the terrains and climates from the through tables.
+
+    Returns:
+        list: The latency of each page, in seconds.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from planets.models import Planet
+    from planets.serializers import PlanetReadSerializer
+
+    renderer = JSONRenderer()
+    latencies = []
+    for last_id in pages:
+        started = time.perf_counter()
+        planets = Planet.objects.filter(id__gt=last_id).order_by("id")[:page_size]
+        renderer.render(PlanetReadSerializer(planets, many=True, joined=joined).data)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run(rows, pages, page_size=100, warmup=20):
+    """
+    Load the dataset and time both read paths, in the current database.
+
+    Args:
+        rows (int): The number of planets.
+        pages (int): The number of pages timed on each path.
+        page_size (int, optional): The number of planets per page. Defaults to 100.
+        warmup (int, optional): The number of pages read before timing. Defaults to 20.
+
+    Returns:
+        dict: The summary of the latencies of each path, with the time spent
+        loading the dataset.
+    """
+    from django.db import connection
+
+    started = time.perf_counter()
+    load_planets(synthetic_names(rows))
+    link_planets()
+    load_seconds = time.perf_counter() - started
+
+    rng = random.Random(0)
+    starts = [rng.randrange(max(rows - page_size, 1)) for _ in range(pages)]
+    result = {
+        "benchmark": "denorm",
+        "vendor": connection.vendor,
+        "rows": rows,
+        "page_size": page_size,
+        "load_s": round(load_seconds, 1),
+    }
+    for name, joined in (("join", True), ("denormalized", False)):
+        measure(starts[:warmup], page_size, joined)
+        result[name] = summarize(measure(starts, page_size, joined))
+    result["speedup_p50"] = round(result["join"]["p50_ms"] / result["denormalized"]["p50_ms"], 2)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of planets (default: 100000).")
+    parser.add_argument("--pages", type=int, default=500, help="Number of pages read on each path (default: 500).")
+    parser.add_argument("--page-size", type=int, default=100, help="Number of planets per page (default: 100).")
+    parser.add_argument("--keepdb", action="store_true", help="Keep the test database.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database(keepdb=args.keepdb):
+        result = run(args.rows, args.pages, args.page_size)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
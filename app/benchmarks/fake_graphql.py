@@ -0,0 +1,184 @@
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from graphql import build_schema
+from graphql import graphql_sync
+
+
+SCHEMA = build_schema("""
+    type Query {
+        allPlanets(first: Int, after: String): PlanetsConnection
+    }
+
+    type PlanetsConnection {
+        pageInfo: PageInfo!
+        totalCount: Int
+        planets: [Planet]
+    }
+
+    type PageInfo {
+        hasNextPage: Boolean!
+        endCursor: String
+    }
+
+    type Planet {
+        name: String
+        population: Float
+        terrains: [String]
+        climates: [String]
+    }
+""")
+
+
+def make_planets(count, terrains=3, climates=2):
+    """
+    Build planet records like the ones of the SWAPI GraphQL API.
+
+    Args:
+        count (int): The number of planets.
+        terrains (int, optional): The number of terrains per planet. Defaults to 3.
+        climates (int, optional): The number of climates per planet. Defaults to 2.
+
+    Returns:
+        list: The planet records.
+    """
+    return [
+        {
+            "name": f"Planet {index}",
+            "population": float(index * 1000) if index % 5 else None,
+            "terrains": [f"terrain {(index + offset) % 40}" for offset in range(terrains)],
+            "climates": [f"climate {(index + offset) % 12}" for offset in range(climates)],
+        }
+        for index in range(count)
+    ]
+
+
+class FakeGraphQLServer:
+    """
+    In-process stand-in for the SWAPI GraphQL API, served over HTTP from a thread.
+
+    It pages `allPlanets` with relay connection cursors, like SWAPI does, and can
+    be slowed down or made to fail to exercise the concurrency and the retries
+    of the populate command.
+
+    Args:
+        planets (list): The planet records served.
+        latency (float, optional): Seconds each request waits before answering.
+            Defaults to 0.
+        failures (int, optional): Number of requests answered with a 500 error
+            before the server starts answering normally. Defaults to 0.
+        opaque_cursors (bool, optional): Whether to use cursors that cannot be
+            computed by the client, forcing it to fetch pages one after the
+            other. Defaults to False.
+
+    Attributes:
+        url (str): The URL of the GraphQL endpoint, once started.
+        requests (list): The variables of each GraphQL request received.
+        max_in_flight (int): The largest number of requests served at once.
+
+    Example:
+        with FakeGraphQLServer(make_planets(100)) as server:
+            call_command("populate", "--url", server.url)
+    """
+
+    def __init__(self, planets, latency=0, failures=0, opaque_cursors=False):
+        self.planets = planets
+        self.latency = latency
+        self.failures = failures
+        self.opaque_cursors = opaque_cursors
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.url = None
+
+    def cursor(self, offset):
+        prefix = "opaque" if self.opaque_cursors else "arrayconnection"
+        return base64.b64encode(f"{prefix}:{offset}".encode()).decode()
+
+    def all_planets(self, info, first=None, after=None):
+        start = 0
+        if after is not None:
+            start = int(base64.b64decode(after).decode().split(":")[1]) + 1
+        end = len(self.planets) if first is None else min(start + first, len(self.planets))
+        return {
+            "totalCount": len(self.planets),
+            "pageInfo": {
+                "hasNextPage": end < len(self.planets),
+                "endCursor": self.cursor(end - 1) if end > start else None,
+            },
+            "planets": self.planets[start:end],
+        }
+
+    def execute(self, body):
+        """
+        Run a GraphQL request, with the configured latency and failures.
+
+        Args:
+            body (dict): The JSON body of the request.
+
+        Returns:
+            tuple: The HTTP status and the JSON response.
+        """
+        with self.lock:
+            self.requests.append(body.get("variables") or {})
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failing = self.failures > 0
+            self.failures -= failing
+        try:
+            time.sleep(self.latency)
+            if failing:
+                return 500, {"errors": [{"message": "Internal server error"}]}
+            result = graphql_sync(
+                SCHEMA,
+                body["query"],
+                root_value={"allPlanets": self.all_planets},
+                variable_values=body.get("variables"),
+            )
+            response = {"data": result.data}
+            if result.errors:
+                response["errors"] = [error.formatted for error in result.errors]
+            return 200, response
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status, response = server.execute(body)
+                content = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/graphql"
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
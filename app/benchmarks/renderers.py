@@ -0,0 +1,128 @@
+"""
+Micro-benchmark of the fast JSON renderer and parser against DRF's stock ones.
+
+Renders and parses lists of serialized planets of increasing size with
+JSONRenderer and JSONParser, then with FastJSONRenderer and FastJSONParser,
+`--repeat` times each, and compares their median latencies:
+
+    python -m benchmarks.renderers --sizes 10 100 1000 10000 --repeat 50
+
+No database is needed: the planets are built in memory, shaped like the
+output of PlanetReadSerializer.
+"""
+import argparse
+import io
+import json
+import random
+import sys
+import time
+
+from benchmarks import setup_django
+from benchmarks import summarize
+from benchmarks.search import synthetic_names
+
+
+def planet_list(size, seed=0):
+    """
+    Build serialized planets, each with one to three terrains and one or two climates.
+
+    Args:
+        size (int): The number of planets.
+        seed (int, optional): Seed of the random values. Defaults to 0.
+
+    Returns:
+        list: The planets.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "id": index + 1,
+            "name": name,
+            "population": rng.choice([None, rng.randrange(10**12)]),
+            "terrains": [{"id": pk, "name": f"terrain {pk}"} for pk in sorted(rng.sample(range(1, 41), rng.randint(1, 3)))],
+            "climates": [{"id": pk, "name": f"climate {pk}"} for pk in sorted(rng.sample(range(1, 21), rng.randint(1, 2)))],
+        }
+        for index, name in enumerate(synthetic_names(size, seed))
+    ]
+
+
+def measure(function, repeat):
+    """
+    Time calls of a function.
+
+    Args:
+        function (callable): The function, called without arguments.
+        repeat (int): The number of calls.
+
+    Returns:
+        list: The latency of each call, in seconds.
+    """
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run(sizes, repeat, warmup=3):
+    """
+    Time rendering and parsing planet lists of each size with both implementations.
+
+    Args:
+        sizes (list): The numbers of planets.
+        repeat (int): The number of timed calls of each implementation.
+        warmup (int, optional): The number of calls before timing. Defaults to 3.
+
+    Returns:
+        dict: For each size, the payload size and the latency summary of each
+        implementation, with the speedups of the medians.
+
+    Raises:
+        AssertionError: If the implementations disagree on the bytes or the data.
+    """
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from drf_project.parsers import FastJSONParser
+    from drf_project.renderers import FastJSONRenderer
+    from drf_project.renderers import orjson
+
+    result = {"benchmark": "renderers", "orjson": getattr(orjson, "__version__", None), "sizes": {}}
+    for size in sizes:
+        planets = planet_list(size)
+        body = JSONRenderer().render(planets)
+        assert FastJSONRenderer().render(planets) == body
+        assert FastJSONParser().parse(io.BytesIO(body)) == planets
+
+        timings = {"bytes": len(body)}
+        for name, function in (
+            ("render", lambda: JSONRenderer().render(planets)),
+            ("fast_render", lambda: FastJSONRenderer().render(planets)),
+            ("parse", lambda: JSONParser().parse(io.BytesIO(body))),
+            ("fast_parse", lambda: FastJSONParser().parse(io.BytesIO(body))),
+        ):
+            measure(function, warmup)
+            timings[name] = summarize(measure(function, repeat))
+        for name in ("render", "parse"):
+            timings[f"{name}_speedup_p50"] = round(timings[name]["p50_ms"] / timings[f"fast_{name}"]["p50_ms"], 2)
+        result["sizes"][size] = timings
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 100, 1000, 10_000],
+        help="Numbers of planets per list (default: 10 100 1000 10000).",
+    )
+    parser.add_argument("--repeat", type=int, default=50, help="Number of timed calls (default: 50).")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    print(json.dumps(run(args.sizes, args.repeat), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
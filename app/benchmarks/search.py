@@ -0,0 +1,183 @@
+"""
+Benchmark of the planet name search on a synthetic dataset.
+
+Loads `--rows` planets with made-up names into a test database, then times
+`--queries` type-ahead searches through /api/planets/search/, and compares
+their 95th percentile with the PLANETS_SEARCH_LATENCY_TARGET_MS setting:
+
+    python -m benchmarks.search --rows 1000000 --queries 500
+
+The process exits with status 1 when the target is missed.
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+from benchmarks import setup_django
+from benchmarks import summarize
+from benchmarks import test_database
+
+
+SYLLABLES = [
+    "ta", "too", "ine", "ho", "na", "boo", "cor", "us", "cant", "dag", "ob", "ah", "end",
+    "or", "kas", "hyy", "uk", "mus", "fa", "jak", "ku", "bes", "pin", "yav", "in", "ger",
+    "on", "sis", "ka", "mi", "no", "lo", "dan", "tu", "ri", "xen", "vel", "qua", "ze", "bo",
+]
+
+
+def synthetic_names(count, seed=0):
+    """
+    Generate unique planet names made of two words of two syllables.
+
+    Every index maps to a different combination of four syllables, shuffled
+    with a multiplication modulo the number of combinations, so the names do
+    not come out in alphabetical order.
+
+    Args:
+        count (int): The number of names.
+        seed (int, optional): Changes the order of the names. Defaults to 0.
+
+    Returns:
+        list: The names.
+    """
+    base = len(SYLLABLES)
+    combinations = base ** 4
+    if count > combinations:
+        raise ValueError(f"At most {combinations} names can be generated.")
+    step = 7919 + seed
+    while math.gcd(step, base) != 1:
+        step += 1
+    names = []
+    for index in range(count):
+        number = (index * step + seed) % combinations
+        digits = []
+        for _ in range(4):
+            number, digit = divmod(number, base)
+            digits.append(SYLLABLES[digit])
+        names.append(f"{''.join(digits[:2]).capitalize()} {''.join(digits[2:]).capitalize()}")
+    return names
+
+
+def load_planets(names, batch_size=10000):
+    """
+    Insert planets with the given names and random populations.
+
+    Args:
+        names (list): The names of the planets.
+        batch_size (int, optional): The number of planets per insert. Defaults to 10000.
+    """
+    from django.db import connection
+    from planets.models import Planet
+
+    populations = random.Random(0)
+    for start in range(0, len(names), batch_size):
+        Planet.objects.bulk_create(
+            Planet(name=name, population=populations.randrange(10 ** 10))
+            for name in names[start:start + batch_size]
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def sample_queries(names, count, seed=0):
+    """
+    Pick what users would type: prefixes of the words of existing names,
+    from one to eight letters long, and a few searches matching nothing.
+
+    Args:
+        names (list): The names of the planets.
+        count (int): The number of searches.
+        seed (int, optional): Seed of the random choices. Defaults to 0.
+
+    Returns:
+        list: The searches.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for index in range(count):
+        if index % 20 == 19:
+            queries.append("zzqx")
+            continue
+        words = rng.choice(names).split()
+        start = rng.randrange(len(words))
+        text = " ".join(words[start:])
+        queries.append(text[:rng.randint(1, 8)].strip() or text[0])
+    return queries
+
+
+def measure(client, queries, limit=10):
+    """
+    Time each search through the search endpoint.
+
+    Args:
+        client (Client): The Django test client.
+        queries (list): The searches.
+        limit (int, optional): The number of matches asked for. Defaults to 10.
+
+    Returns:
+        list: The latency of each search, in seconds.
+    """
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        response = client.get("/api/planets/search/", {"q": query, "limit": limit})
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.content
+    return latencies
+
+
+def run(rows, queries, warmup=20):
+    """
+    Load the dataset and time the searches, in the current database.
+
+    Args:
+        rows (int): The number of planets.
+        queries (int): The number of searches timed.
+        warmup (int, optional): The number of searches run before timing. Defaults to 20.
+
+    Returns:
+        dict: The summary of the latencies, with the time spent loading the dataset.
+    """
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+
+    started = time.perf_counter()
+    names = synthetic_names(rows)
+    load_planets(names)
+    load_seconds = time.perf_counter() - started
+
+    client = Client()
+    searches = sample_queries(names, queries)
+    measure(client, searches[:warmup])
+    result = summarize(measure(client, searches))
+    result.update({
+        "benchmark": "search",
+        "vendor": connection.vendor,
+        "rows": rows,
+        "load_s": round(load_seconds, 1),
+        "target_p95_ms": settings.PLANETS_SEARCH_LATENCY_TARGET_MS,
+    })
+    result["passed"] = result["p95_ms"] <= result["target_p95_ms"]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of planets (default: 1000000).")
+    parser.add_argument("--queries", type=int, default=500, help="Number of searches (default: 500).")
+    parser.add_argument("--keepdb", action="store_true", help="Keep the test database.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database(keepdb=args.keepdb):
+        result = run(args.rows, args.queries)
+    print(json.dumps(result, indent=2))
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+
+from .renderers import FastJSONRenderer
+from .timing import timed
+
+
+class AsyncAPIView(View):
+    """
+    Async Django view serving the read requests of a DRF view natively under ASGI.
+
+    DRF views are synchronous, so an ASGI server runs each of their requests
+    in a thread. This view answers the requests its `api_view` has an async
+    handler for (`aget()` for GET, and so on) in the event loop instead, with
+    the async ORM and cache APIs. The handler receives the DRF request, already
+    negotiated, and returns a Response, or None to decline the request.
+
+    API exceptions and Http404 raised by the handler are turned into error
+    responses by the `handle_exception()` of the DRF view, as under WSGI,
+    without running the request again.
+
+    Anything else is handed to the DRF view, run in a thread as Django runs
+    any synchronous view: other methods, media types not in `renderer_classes`
+    (the browsable API for one), views with permissions or throttles, and
+    requests whose handler declined them.
+
+    Attributes:
+        api_view (APIView): The DRF view class.
+        renderer_classes (tuple): The renderers the async handlers may render with.
+
+    Example:
+        path("api/planets/", AsyncAPIView.as_view(api_view=PlanetList))
+    """
+    api_view = None
+    renderer_classes = (JSONRenderer, FastJSONRenderer)
+    fallback = None
+    view_is_async = True
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        api_view = initkwargs.get("api_view", cls.api_view)
+        view = super().as_view(fallback=sync_to_async(api_view.as_view()), **initkwargs)
+        # Like DRF views, CSRF is left to the authentication of the API view.
+        return csrf_exempt(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Answer the request with the async handler of the API view, or hand it to the API view.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        response = None
+        view = self.api_view()
+        handler = getattr(view, f"a{request.method.lower()}", None)
+        if handler is not None:
+            response = await self.handle(view, handler, request, *args, **kwargs)
+        if response is None:
+            response = await self.fallback(request, *args, **kwargs)
+        return response
+
+    async def handle(self, view, handler, request, *args, **kwargs):
+        """
+        Run an async handler of the API view, as the API view would run its sync handler.
+
+        Returns:
+            HttpResponse: The rendered response, or None if the API view has to
+            answer the request.
+        """
+        view.setup(request, *args, **kwargs)
+        view.request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        if not self.is_public(view):
+            return None
+        try:
+            view.format_kwarg = view.get_format_suffix(**kwargs)
+            renderer, media_type = view.perform_content_negotiation(view.request)
+            if type(renderer) not in self.renderer_classes:
+                return None
+        except (APIException, Http404):
+            return None
+        view.request.accepted_renderer, view.request.accepted_media_type = renderer, media_type
+        try:
+            response = await handler(view.request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            response = view.handle_exception(exc)
+        if response is None:
+            return None
+        response = view.finalize_response(view.request, response, *args, **kwargs)
+        if not isinstance(response, SimpleTemplateResponse):
+            return response
+        # Rendered here, as Django would otherwise render it in a thread.
+        with timed("render"):
+            response.render()
+        return HttpResponse(response.content, status=response.status_code, headers=response.headers)
+
+    def is_public(self, view):
+        """
+        Tell whether the API view lets anyone in, without throttling.
+
+        The async handlers skip authentication, which may query the database,
+        so views checking permissions or throttling are always handed over.
+        """
+        permissions = view.get_permissions()
+        return all(isinstance(permission, AllowAny) for permission in permissions) and not view.get_throttles()
@@ -0,0 +1,241 @@
+import threading
+import time
+
+from django.db import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    """
+    Raised when no pooled connection frees up in time.
+    """
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections shared by the threads of a process.
+
+    At most `max_size` connections are open at once. A thread checking out a
+    connection gets an idle one, opens a new one while the pool is not full,
+    or waits up to `timeout` seconds for another thread to check one in.
+    Connections older than `max_lifetime` seconds are closed when checked in,
+    and closed connections are never handed out.
+
+    Args:
+        max_size (int): The maximum number of open connections.
+        timeout (float): The number of seconds to wait for a connection.
+        max_lifetime (float, optional): The number of seconds a connection is
+            reused for. Defaults to 3600.
+
+    Example:
+        pool = ConnectionPool(max_size=10, timeout=5)
+        connection = pool.checkout(lambda: psycopg2.connect(dsn))
+        ...
+        pool.checkin(connection)
+    """
+
+    def __init__(self, max_size, timeout, max_lifetime=3600):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.idle = []
+        self.opened_at = {}
+        self.size = 0
+        self.waiting = 0
+        self.counters = dict.fromkeys(
+            ("opened", "closed", "checkouts", "timeouts", "wait_s", "wait_max_s", "checkout_s", "checkout_max_s"), 0
+        )
+        self.condition = threading.Condition()
+
+    def checkout(self, connect):
+        """
+        Take a connection from the pool, opening one if needed.
+
+        Args:
+            connect (callable): Opens a new connection.
+
+        Returns:
+            The connection.
+
+        Raises:
+            PoolTimeout: If no connection frees up within `timeout` seconds.
+        """
+        started = time.monotonic()
+        waited = 0
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No database connection freed up within {self.timeout} seconds "
+                        f"({self.max_size} connections in use)."
+                    )
+                self.waiting += 1
+                wait_started = time.monotonic()
+                self.condition.wait(remaining)
+                waited += time.monotonic() - wait_started
+                self.waiting -= 1
+            connection = self.idle.pop() if self.idle else None
+            if connection is None:
+                self.size += 1
+        if connection is not None and self.is_closed(connection):
+            self.discard(connection)
+            return self.checkout(connect)
+        if connection is None:
+            try:
+                connection = connect()
+            except BaseException:
+                self.release_slot()
+                raise
+            with self.condition:
+                self.opened_at[id(connection)] = time.monotonic()
+                self.counters["opened"] += 1
+        self.record(waited, time.monotonic() - started)
+        return connection
+
+    def checkin(self, connection, discard=False):
+        """
+        Give a connection back to the pool.
+
+        Args:
+            connection: The connection, which must not be in a transaction.
+            discard (bool, optional): Whether to close the connection instead
+                of keeping it for reuse. Defaults to False.
+        """
+        expired = time.monotonic() - self.opened_at.get(id(connection), 0) > self.max_lifetime
+        if discard or expired or self.is_closed(connection):
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self, connection):
+        """
+        Close a connection taken out of the pool and free its slot.
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.opened_at.pop(id(connection), None)
+            self.counters["closed"] += 1
+        self.release_slot()
+
+    def release_slot(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close_idle(self):
+        """
+        Close every idle connection.
+        """
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            self.discard(connection)
+
+    def is_closed(self, connection):
+        return bool(getattr(connection, "closed", False))
+
+    def record(self, wait, checkout):
+        with self.condition:
+            counters = self.counters
+            counters["checkouts"] += 1
+            counters["wait_s"] += wait
+            counters["wait_max_s"] = max(counters["wait_max_s"], wait)
+            counters["checkout_s"] += checkout
+            counters["checkout_max_s"] = max(counters["checkout_max_s"], checkout)
+
+    def stats(self):
+        """
+        Describe the pool and how long checkouts took.
+
+        The wait time is the time spent waiting for another thread to check a
+        connection in, and the checkout latency covers the whole checkout,
+        opening a connection included.
+
+        Returns:
+            dict: The size of the pool, its counters, and the mean and maximum
+            wait and checkout times in milliseconds.
+        """
+        with self.condition:
+            counters = dict(self.counters)
+            checkouts = counters["checkouts"] or 1
+            return {
+                "max_size": self.max_size,
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                "waiting": self.waiting,
+                "opened": counters["opened"],
+                "closed": counters["closed"],
+                "checkouts": counters["checkouts"],
+                "timeouts": counters["timeouts"],
+                "wait_mean_ms": round(counters["wait_s"] / checkouts * 1000, 3),
+                "wait_max_ms": round(counters["wait_max_s"] * 1000, 3),
+                "checkout_mean_ms": round(counters["checkout_s"] / checkouts * 1000, 3),
+                "checkout_max_ms": round(counters["checkout_max_s"] * 1000, 3),
+            }
+
+
+# The pool of each database alias, created on first use.
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    """
+    Return the pool of a database alias, creating it from its POOL settings.
+
+    Args:
+        alias (str): The database alias.
+        settings_dict (dict): The settings of the database.
+
+    Returns:
+        ConnectionPool: The pool.
+    """
+    with pools_lock:
+        if alias not in pools:
+            options = settings_dict.get("POOL", {})
+            pools[alias] = ConnectionPool(
+                max_size=options.get("MAX_SIZE", 10),
+                timeout=options.get("TIMEOUT", 5),
+                max_lifetime=options.get("MAX_LIFETIME", 3600),
+            )
+        return pools[alias]
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Database wrapper mixin taking connections from a ConnectionPool instead of opening them.
+
+    Closing the connection, which Django does at the end of every request
+    when CONN_MAX_AGE is 0, checks it back in, rolled back if needed. Broken
+    connections are closed instead. The pool is configured by the POOL entry
+    of the database settings: MAX_SIZE (10), TIMEOUT (5 seconds) and
+    MAX_LIFETIME (3600 seconds).
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        return self.pool.checkout(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        # A connection closed inside an atomic block stays attached to the
+        # wrapper until the block exits, so it cannot be handed to another.
+        discard = self.in_atomic_block or (self.errors_occurred and not self.is_usable())
+        if not discard and not self.autocommit:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        self.pool.checkin(connection, discard=discard)
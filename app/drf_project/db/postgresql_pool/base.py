@@ -0,0 +1,15 @@
+from django.db.backends.postgresql import base
+
+from drf_project.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """
+    PostgreSQL backend whose connections come from a bounded in-process pool.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        # Only set by the backend when it opens a connection.
+        self.isolation_level = connection.isolation_level
+        return connection
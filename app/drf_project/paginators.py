@@ -0,0 +1,94 @@
+from django.core.paginator import EmptyPage
+from django.core.paginator import Paginator
+from django.db import DatabaseError
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting large unfiltered tables from the database statistics.
+
+    `COUNT(*)` reads the whole table, which takes seconds on millions of
+    rows. When the object list is a whole table, its row count is read from
+    the planner statistics instead: `pg_class.reltuples` on PostgreSQL, and
+    `sqlite_stat1` on SQLite once ANALYZE ran. The estimate is used for every
+    page of tables estimated at `threshold` rows or more, so small tables are
+    still counted exactly. Filtered lists are always counted. A page past the
+    estimated last one, which the estimate may have cut off, is looked up
+    again against the exact count.
+
+    Attributes:
+        threshold (int): The smallest estimate trusted instead of counting.
+        estimated (bool): Whether `count` is an estimate.
+
+    Example:
+        class PlanetAdmin(admin.ModelAdmin):
+            paginator = EstimatedCountPaginator
+            show_full_result_count = False
+    """
+    threshold = 100_000
+    estimated = False
+
+    @cached_property
+    def count(self):
+        """
+        Return the estimated number of objects of a large table, or their exact number.
+        """
+        estimate = self.estimate()
+        if estimate is not None and estimate >= self.threshold:
+            self.estimated = True
+            return estimate
+        return super().count
+
+    def validate_number(self, number):
+        """
+        Validate a page number, counting exactly when it is past the estimated last page.
+        """
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.estimated or int(number) < 1:
+                raise
+        # count and num_pages are cached properties: replace the estimate and
+        # forget the number of pages computed from it.
+        self.estimated = False
+        self.__dict__["count"] = super().count
+        self.__dict__.pop("num_pages", None)
+        return super().validate_number(number)
+
+    def estimate(self):
+        """
+        Read the number of rows of the table from the database statistics.
+
+        Returns:
+            int: The estimated number of rows, or None if the object list is
+            not a whole table or the database has no statistics about it.
+        """
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        query = queryset.query
+        if query.where or query.distinct or query.is_sliced or query.combinator:
+            return None
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        if connection.vendor == "postgresql":
+            sql, params = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table]
+        elif connection.vendor == "sqlite":
+            sql, params = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table]
+        else:
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+        except DatabaseError:
+            return None
+        if row is None:
+            return None
+        # sqlite_stat1 starts with the number of rows, and PostgreSQL has -1
+        # for tables never analyzed.
+        rows = int(str(row[0]).split()[0])
+        return rows if rows >= 0 else None
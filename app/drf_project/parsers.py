@@ -0,0 +1,45 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ZERO_DIGITS
+from .renderers import FastJSONRenderer
+from .renderers import orjson
+
+
+# orjson reads integers above 64 bits as floats, where the stdlib keeps them
+# exact, so bodies with 19 digits in a row are left to the stdlib.
+LONG_NUMBER = b"0" * 19
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser decoding UTF-8 bodies with orjson, falling back to the stdlib json module.
+
+    Bodies orjson rejects are parsed again by JSONParser, so documents only
+    the stdlib accepts (NaN when STRICT_JSON is off, lone surrogates) still
+    parse, and invalid documents raise the same ParseError. Bodies holding
+    integers too long for orjson, and bodies in other encodings, go to
+    JSONParser directly.
+
+    Without orjson installed, this is JSONParser.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parse the incoming bytestream as JSON and return the resulting data.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER not in body.translate(ZERO_DIGITS):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
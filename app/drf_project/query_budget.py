@@ -0,0 +1,96 @@
+import functools
+import logging
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a block of code runs more database queries than it declared.
+    """
+
+
+class QueryBudget:
+    """
+    Context manager that counts the queries run inside its block.
+
+    When the block finishes and the number of queries is above `max_queries`,
+    the budget is either enforced (QueryBudgetExceeded is raised) or reported
+    as a warning in the logs, depending on `strict`.
+
+    Args:
+        max_queries (int): The maximum number of queries allowed in the block.
+        name (str, optional): A label used in the error message. Defaults to None.
+        strict (bool, optional): Whether to raise when the budget is exceeded.
+            Defaults to the QUERY_BUDGET_STRICT setting.
+        using (str, optional): The database alias to watch. Defaults to "default".
+
+    Example:
+        with QueryBudget(3, strict=True):
+            client.get("/api/planets/")
+    """
+
+    def __init__(self, max_queries, name=None, strict=None, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.name = name or "block"
+        self.strict = strict
+        self.using = using
+        self.queries = []
+
+    def __enter__(self):
+        self.queries = []
+        self._wrapper = connections[self.using].execute_wrapper(self._record)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None and len(self.queries) > self.max_queries:
+            self._report()
+        return False
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def _report(self):
+        message = (
+            f"{self.name} ran {len(self.queries)} queries, "
+            f"over its budget of {self.max_queries}:\n"
+            + "\n".join(f"  {index}. {sql}" for index, sql in enumerate(self.queries, 1))
+        )
+        strict = self.strict
+        if strict is None:
+            strict = getattr(settings, "QUERY_BUDGET_STRICT", settings.DEBUG)
+        if strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def query_budget(max_queries, using=DEFAULT_DB_ALIAS):
+    """
+    Decorator that declares the query budget of a view or view method.
+
+    Each call gets its own QueryBudget, so the decorator is safe to use on
+    views served from several threads.
+
+    Args:
+        max_queries (int): The maximum number of queries allowed per call.
+        using (str, optional): The database alias to watch. Defaults to "default".
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with QueryBudget(max_queries, name=func.__qualname__, using=using):
+                return func(*args, **kwargs)
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
@@ -0,0 +1,78 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+# Maps every digit to 0, which lets plain substring searches look for numbers
+# much faster than a regular expression would.
+ZERO_DIGITS = bytes.maketrans(b"123456789", b"000000000")
+
+
+def has_float_mismatch(ret):
+    """
+    Tell whether orjson output may hold a float written differently from `repr()`.
+
+    orjson writes some floats with an exponent where `repr()` writes another
+    one (1e16 for 1e+16), or without one (0.00001 for 1e-05). Strings looking
+    like them are rare enough to render them with the stdlib instead.
+
+    Args:
+        ret (bytes): The orjson output.
+
+    Returns:
+        bool: True if the output has a digit followed by "e", or "0.0000".
+    """
+    digits = ret.translate(ZERO_DIGITS)
+    return b"0e" in digits or b"0.0000" in digits
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson, falling back to the stdlib json module.
+
+    The output is byte for byte the output of JSONRenderer with the default
+    UNICODE_JSON and COMPACT_JSON settings, \\u2028 and \\u2029 escaped
+    included. Anything orjson would write differently is rendered by
+    JSONRenderer instead: indented output (the browsable API), other JSON
+    settings, integers above 64 bits, floats written in another notation,
+    and every object orjson cannot encode. Dates and times go through the
+    `encoder_class`, as with JSONRenderer.
+
+    Only NaN and infinite floats differ: orjson writes them as null, where
+    JSONRenderer raises a ValueError under STRICT_JSON. They cannot be seen in
+    the output, where null also stands for None, and looking for them in the
+    data costs as much as the stdlib rendering, so they are not handed over.
+
+    Without orjson installed, this is JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b""
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if has_float_mismatch(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
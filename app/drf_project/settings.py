@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 import dj_database_url
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "drf_project.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,6 +81,10 @@ WSGI_APPLICATION = "drf_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+def conn_max_age(value):
+    return None if value.lower() == "none" else int(value)
+
+
 DATABASES = {
     "default": {
         "ENGINE": os.environ.get("SQL_ENGINE", "django.db.backends.sqlite3"),
@@ -87,6 +93,17 @@ DATABASES = {
         "PASSWORD": os.environ.get("SQL_PASSWORD", "password"),
         "HOST": os.environ.get("SQL_HOST", "localhost"),
         "PORT": os.environ.get("SQL_PORT", "5432"),
+        # Seconds a connection is kept open between requests ("none" for no
+        # limit, 0 to close it after each request), checked before reuse.
+        "CONN_MAX_AGE": conn_max_age(os.environ.get("SQL_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": bool(int(os.environ.get("SQL_CONN_HEALTH_CHECKS", default=1))),
+        # Used by the drf_project.db.postgresql_pool engine, with SQL_CONN_MAX_AGE=0
+        # so that each request gives its connection back to the pool.
+        "POOL": {
+            "MAX_SIZE": int(os.environ.get("SQL_POOL_MAX_SIZE", default=10)),
+            "TIMEOUT": float(os.environ.get("SQL_POOL_TIMEOUT", default=5)),
+            "MAX_LIFETIME": float(os.environ.get("SQL_POOL_MAX_LIFETIME", default=3600)),
+        },
     }
 }
 
@@ -122,6 +139,21 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# The planet responses are invalidated through version keys kept in the cache,
+# so the backend must be shared by every worker: files by default, or Redis
+# or Memcached. A process-local backend such as LocMemCache disables the
+# planet response cache (see planets.cache).
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "drf_project_cache")),
+    }
+}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
@@ -139,9 +171,71 @@ AUTH_USER_MODEL = "planets.CustomUser"
 
 
 # Django REST Framework
-if not DEBUG:
-    REST_FRAMEWORK = {
-        "DEFAULT_RENDERER_CLASSES": (
-            "rest_framework.renderers.JSONRenderer",
-        )
-    }
+# JSON is encoded and decoded with orjson when it is installed (see
+# drf_project.renderers and drf_project.parsers).
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": (
+        "drf_project.renderers.FastJSONRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "drf_project.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+}
+if DEBUG:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] += ("rest_framework.renderers.BrowsableAPIRenderer",)
+
+
+# Query budgets
+# Views declare how many queries they may run with drf_project.query_budget.
+# When strict, going over the budget raises instead of logging a warning.
+QUERY_BUDGET_STRICT = int(os.environ.get("QUERY_BUDGET_STRICT", default=DEBUG))
+
+
+# Server timing
+# Each request reports its query count, database time, serializer time and
+# render time in a Server-Timing header and in the drf_project.timing logs
+# (see drf_project.timing). Queries lasting at least SERVER_TIMING_SLOW_QUERY_MS
+# milliseconds are logged with their EXPLAIN plan.
+SERVER_TIMING = int(os.environ.get("SERVER_TIMING", default=1))
+SERVER_TIMING_SLOW_QUERY_MS = float(os.environ.get("SERVER_TIMING_SLOW_QUERY_MS", default=200))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "drf_project.timing": {
+            "handlers": ["console"],
+            "level": os.environ.get("SERVER_TIMING_LOG_LEVEL", "INFO"),
+        },
+    },
+}
+
+
+# Planets API
+# Number of planets loaded and serialized per chunk by the streaming list.
+PLANETS_STREAM_CHUNK_SIZE = int(os.environ.get("PLANETS_STREAM_CHUNK_SIZE", default=1000))
+
+# Cache used for the planet list and detail responses, and how long they are kept.
+PLANETS_CACHE_ALIAS = os.environ.get("PLANETS_CACHE_ALIAS", "default")
+PLANETS_CACHE_TIMEOUT = int(os.environ.get("PLANETS_CACHE_TIMEOUT", default=300))
+
+# Maximum number of planets accepted by one request to the bulk endpoint.
+PLANETS_BULK_MAX_ITEMS = int(os.environ.get("PLANETS_BULK_MAX_ITEMS", default=1000))
+
+# Number of planets committed per batch by the import endpoint, and number of
+# line errors listed in its response.
+PLANETS_IMPORT_BATCH_SIZE = int(os.environ.get("PLANETS_IMPORT_BATCH_SIZE", default=500))
+PLANETS_IMPORT_MAX_ERRORS = int(os.environ.get("PLANETS_IMPORT_MAX_ERRORS", default=100))
+
+# Latency the planet search must answer within, at the 95th percentile, in
+# milliseconds. Checked by `python -m benchmarks.search`.
+PLANETS_SEARCH_LATENCY_TARGET_MS = int(os.environ.get("PLANETS_SEARCH_LATENCY_TARGET_MS", default=50))
+
+# Whether the planet list and detail reads are served by async views. Only
+# worth trying under an ASGI server: see `python -m benchmarks.asgi`.
+PLANETS_ASYNC_VIEWS = int(os.environ.get("PLANETS_ASYNC_VIEWS", default=0))
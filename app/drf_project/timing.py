@@ -0,0 +1,311 @@
+import contextlib
+import contextvars
+import logging
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError
+from django.db import connections
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Timer of the request being handled, if it is timed.
+request_timer = contextvars.ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """
+    Collects the timings of a request: its queries and its named phases.
+
+    Queries are recorded by `record()`, installed as an execute wrapper on the
+    database connections, and phases are measured with `phase()`. Queries
+    lasting at least `slow_query_ms` are kept with their EXPLAIN plan.
+
+    Args:
+        slow_query_ms (float, optional): The duration from which a query is
+            slow, in milliseconds, or None to never explain queries. Defaults to None.
+    """
+
+    def __init__(self, slow_query_ms=None):
+        self.slow_query_ms = slow_query_ms
+        self.queries = 0
+        self.db = 0.0
+        self.phases = defaultdict(float)
+        self.slow_queries = []
+        self._depths = defaultdict(int)
+        self._explaining = False
+
+    def record(self, execute, sql, params, many, context):
+        """
+        Execute a query, adding it to the database time of the request.
+        """
+        if self._explaining:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        except Exception:
+            self._add_query(time.perf_counter() - started)
+            raise
+        duration = self._add_query(time.perf_counter() - started)
+        if self.slow_query_ms is not None and duration * 1000 >= self.slow_query_ms and not many:
+            self.slow_queries.append({
+                "sql": sql,
+                "params": params,
+                "duration_ms": round(duration * 1000, 2),
+                "plan": self.explain(context["connection"], sql, params),
+            })
+        return result
+
+    def _add_query(self, duration):
+        self.queries += 1
+        self.db += duration
+        return duration
+
+    def explain(self, connection, sql, params):
+        """
+        Read the plan the database uses for a query.
+
+        Only SELECT queries are explained, so the explanation never writes. It
+        runs in a savepoint, so that a failing EXPLAIN does not abort the
+        transaction of the request on databases such as PostgreSQL.
+
+        Args:
+            connection (DatabaseWrapper): The connection the query ran on.
+            sql (str): The query.
+            params (list): The parameters of the query.
+
+        Returns:
+            str: The plan, one line per step, or None if the query is not a
+            SELECT or the database cannot explain it.
+        """
+        if not sql.lstrip().upper().startswith("SELECT"):
+            return None
+        self._explaining = True
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+                return "\n".join(str(row[-1]) for row in cursor.fetchall())
+        except DatabaseError:
+            return None
+        finally:
+            self._explaining = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Add the time spent in the block to a phase of the request.
+
+        Blocks of the same phase nested in one another are only counted once.
+
+        Args:
+            name (str): The name of the phase, such as "serialize".
+        """
+        self._depths[name] += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depths[name] -= 1
+            if not self._depths[name]:
+                self.phases[name] += time.perf_counter() - started
+
+    def start(self, name):
+        """
+        Start timing a phase ended by `stop()`, for phases not fitting in a block.
+        """
+        self._depths[name] += 1
+        self.phases[name] -= time.perf_counter()
+
+    def stop(self, name):
+        """
+        Stop timing a phase started by `start()`.
+        """
+        self._depths[name] -= 1
+        self.phases[name] += time.perf_counter()
+
+    def metrics(self, total):
+        """
+        Summarize the timings of the request.
+
+        Args:
+            total (float): The duration of the whole request, in seconds.
+
+        Returns:
+            dict: The number of queries, and the database time, each phase
+            time and the total time in milliseconds.
+        """
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db * 1000, 2),
+            **{f"{name}_ms": round(duration * 1000, 2) for name, duration in self.phases.items()},
+            "total_ms": round(total * 1000, 2),
+        }
+
+    def header(self, total):
+        """
+        Build the Server-Timing header of the request.
+
+        Args:
+            total (float): The duration of the whole request, in seconds.
+
+        Returns:
+            str: The header value, such as `db;dur=1.2;desc="3 queries", total;dur=4.5`.
+        """
+        entries = [f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"']
+        entries += [f"{name};dur={duration * 1000:.2f}" for name, duration in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+@contextlib.contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to a phase of the current request, if it is timed.
+
+    Args:
+        name (str): The name of the phase, such as "serialize".
+
+    Example:
+        with timed("serialize"):
+            data = serializer.data
+    """
+    timer = request_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware reporting where the time of each request went.
+
+    Each request gets a RequestTimer which counts the queries run on every
+    database and their time, the time of the "serialize" phase (see `timed`)
+    and the time DRF and template responses take to render. The timings are
+    sent in a `Server-Timing` header, which browser developer tools display,
+    and logged on the `drf_project.timing` logger with the method, path and
+    status, the same fields being attached to the log record as
+    `server_timing` for structured handlers.
+
+    Queries lasting at least SERVER_TIMING_SLOW_QUERY_MS are logged as
+    warnings with their parameters and EXPLAIN plan.
+
+    Streaming responses are timed until their headers are sent: the rows
+    they read and serialize while they are sent are not counted.
+
+    The middleware is left out when SERVER_TIMING is off. It should come
+    first in MIDDLEWARE, so that its total covers the other middleware and
+    that the render phase starts right before the response renders.
+
+    Under ASGI it stays asynchronous, so the async views keep the event loop.
+    Django runs their queries in the thread of `sync_to_async(thread_sensitive=True)`,
+    so the execute wrappers are installed on the connections of that thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timer = RequestTimer(settings.SERVER_TIMING_SLOW_QUERY_MS)
+        token = request_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                self.watch_queries(stack, timer)
+                response = self.get_response(request)
+        finally:
+            request_timer.reset(token)
+        return self.finish(request, response, timer, started)
+
+    async def __acall__(self, request):
+        """
+        Asynchronous version of `__call__()`.
+        """
+        timer = RequestTimer(settings.SERVER_TIMING_SLOW_QUERY_MS)
+        token = request_timer.set(timer)
+        started = time.perf_counter()
+        stack = contextlib.ExitStack()
+        try:
+            await sync_to_async(self.watch_queries, thread_sensitive=True)(stack, timer)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close, thread_sensitive=True)()
+        finally:
+            request_timer.reset(token)
+        return self.finish(request, response, timer, started)
+
+    def watch_queries(self, stack, timer):
+        """
+        Record the queries of every database of the current thread with the timer, until `stack` closes.
+        """
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer.record))
+
+    def finish(self, request, response, timer, started):
+        """
+        Add the Server-Timing header to the response, and log the timings.
+        """
+        total = time.perf_counter() - started
+        response["Server-Timing"] = timer.header(total)
+        self.log(request, response, timer, total)
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Time the rendering of the response, which Django runs right after this hook.
+        """
+        timer = request_timer.get()
+        if timer is not None:
+            timer.start("render")
+            response.add_post_render_callback(lambda response: timer.stop("render"))
+        return response
+
+    def log(self, request, response, timer, total):
+        """
+        Log the timings of a request, and the slow queries it ran.
+        """
+        metrics = timer.metrics(total)
+        logger.info(
+            "%s %s %s %s",
+            request.method,
+            request.get_full_path(),
+            response.status_code,
+            " ".join(f"{name}={value}" for name, value in metrics.items()),
+            extra={"server_timing": {
+                "method": request.method,
+                "path": request.get_full_path(),
+                "status": response.status_code,
+                **metrics,
+            }},
+        )
+        for query in timer.slow_queries:
+            logger.warning(
+                "Slow query (%sms) in %s %s: %s\nParameters: %s\nPlan:\n%s",
+                query["duration_ms"],
+                request.method,
+                request.get_full_path(),
+                query["sql"],
+                query["params"],
+                query["plan"],
+                extra={"slow_query": {"method": request.method, "path": request.get_full_path(), **query}},
+            )
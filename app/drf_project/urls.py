@@ -17,11 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from .views import db_pool
 from .views import ping
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path('ping/', ping, name="ping"),
+    path("db/pool/", db_pool, name="db-pool"),
     path("", include("planets.urls")),
 ]
@@ -1,6 +1,18 @@
 from django.http import JsonResponse
 
+from .db import pool
+
 
 def ping(request):
     data = {"ping": "pong!"}
     return JsonResponse(data)
+
+
+def db_pool(request):
+    """
+    Report the connection pool of each database using a pooled engine.
+
+    Returns:
+        JsonResponse: The stats of each pool (see ConnectionPool.stats), by database alias.
+    """
+    return JsonResponse({alias: connection_pool.stats() for alias, connection_pool in pool.pools.items()})
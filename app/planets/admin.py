@@ -1,10 +1,15 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
+from django.db.models import Q
 
+from drf_project.paginators import EstimatedCountPaginator
+
+from .filters import PlanetFilterBackend
 from .models import Climate
 from .models import CustomUser
 from .models import Planet
 from .models import Terrain
+from .search import filter_planets
 
 
 @admin.register(CustomUser)
@@ -14,16 +19,55 @@ class UserAdmin(DefaultUserAdmin):
 
 @admin.register(Planet)
 class PlanetAdmin(admin.ModelAdmin):
+    """
+    Admin of the planets, fit for millions of them.
+
+    The changelist reads the terrain and climate names from the denormalized
+    columns of each planet instead of querying them row by row, counts the
+    whole table from the database statistics (see EstimatedCountPaginator),
+    and never counts the unfiltered table next to a filtered one. The search
+    and the filters all use indexes.
+    """
     fields = ("name", "population")
     list_display = ("name", "population", "get_terrains", "get_climates")
+    list_filter = ("terrains", "climates")
+    search_fields = ("name",)
+    search_help_text = "Words starting the name of a planet, or the exact name of a terrain or climate."
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     @admin.display(description="terrains")
     def get_terrains(self, obj: Planet):
-        return ", ".join([terrain.name for terrain in obj.terrains.all()])
+        return ", ".join(terrain["name"] for terrain in obj.terrain_names)
 
     @admin.display(description="climates")
     def get_climates(self, obj: Planet):
-        return ", ".join([climate.name for climate in obj.climates.all()])
+        return ", ".join(climate["name"] for climate in obj.climate_names)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Keep the planets matching the search.
+
+        The name is searched in the index of the planet search (see
+        `filter_planets()`), and terrain and climate names are matched exactly,
+        regardless of their case, through the indexes of the links.
+
+        Args:
+            request: The HTTP request object.
+            queryset (QuerySet): The planets to search.
+            search_term (str): The search.
+
+        Returns:
+            tuple: The matching planets, and False as they hold no duplicates.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        filters = PlanetFilterBackend()
+        matches = Q(pk__in=filter_planets(Planet.objects.all(), search_term).values("pk"))
+        for relation, model in PlanetFilterBackend.relations.values():
+            matches |= Q(pk__in=filters.linked_planets(relation, model, {search_term.lower()}))
+        return queryset.filter(matches), False
 
 
 @admin.register(Terrain)
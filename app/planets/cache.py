@@ -0,0 +1,234 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+HITS_KEY = "planets:cache:hits"
+MISSES_KEY = "planets:cache:misses"
+LIST_VERSION_KEY = "planets:list:version"
+
+
+def get_cache():
+    """
+    Return the Django cache backend used for the planet responses.
+
+    Returns:
+        BaseCache: The cache named by the PLANETS_CACHE_ALIAS setting.
+    """
+    return caches[settings.PLANETS_CACHE_ALIAS]
+
+
+def is_shared(cache):
+    """
+    Tell whether a cache backend is shared by every worker of the server.
+
+    A process-local backend would only invalidate the responses of the worker
+    handling the write, while the others keep serving their stale copies under
+    the new ETag, so responses are never cached in one.
+
+    Args:
+        cache (BaseCache): The cache backend.
+
+    Returns:
+        bool: False for LocMemCache, True otherwise.
+    """
+    return not isinstance(cache, LocMemCache)
+
+
+def detail_version_key(pk):
+    return f"planets:detail:{pk}:version"
+
+
+def get_version(key):
+    """
+    Return the current value of a version counter, creating it if needed.
+
+    A missing counter starts from the current time rather than from 1, so that
+    entries written under an evicted counter are never served again.
+
+    Args:
+        key (str): The cache key of the counter.
+
+    Returns:
+        int: The current version.
+    """
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(key):
+    """
+    Asynchronous version of `get_version()`.
+    """
+    cache = get_cache()
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(key):
+    """
+    Increment a version counter, which invalidates every entry built with it.
+
+    Args:
+        key (str): The cache key of the counter.
+    """
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def request_digest(request):
+    return hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+
+def list_key(request):
+    """
+    Build the cache key of a planets list response.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        str: A key made of the list version and a digest of the requested URL.
+    """
+    return f"planets:list:{get_version(LIST_VERSION_KEY)}:{request_digest(request)}"
+
+
+async def alist_key(request):
+    """
+    Asynchronous version of `list_key()`.
+    """
+    return f"planets:list:{await aget_version(LIST_VERSION_KEY)}:{request_digest(request)}"
+
+
+def detail_key(request, pk):
+    """
+    Build the cache key of a single planet response.
+
+    Args:
+        request: The HTTP request object.
+        pk (int): The primary key of the planet.
+
+    Returns:
+        str: A key made of the planet version and a digest of the requested URL.
+    """
+    version = get_version(detail_version_key(pk))
+    return f"planets:detail:{pk}:{version}:{request_digest(request)}"
+
+
+async def adetail_key(request, pk):
+    """
+    Asynchronous version of `detail_key()`.
+    """
+    version = await aget_version(detail_version_key(pk))
+    return f"planets:detail:{pk}:{version}:{request_digest(request)}"
+
+
+def get_data(key):
+    """
+    Look up cached response data and count the hit or the miss.
+
+    Args:
+        key (str): The cache key of the response.
+
+    Returns:
+        The cached data, or None on a miss or when the cache is not shared
+        (see `is_shared()`).
+    """
+    cache = get_cache()
+    if not is_shared(cache):
+        return None
+    data = cache.get(key)
+    _count(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+async def aget_data(key):
+    """
+    Asynchronous version of `get_data()`.
+    """
+    cache = get_cache()
+    if not is_shared(cache):
+        return None
+    data = await cache.aget(key)
+    await _acount(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def set_data(key, data):
+    """
+    Store response data in the cache for PLANETS_CACHE_TIMEOUT seconds, if the cache is shared.
+
+    Args:
+        key (str): The cache key of the response.
+        data: The response data.
+    """
+    cache = get_cache()
+    if is_shared(cache):
+        cache.set(key, data, settings.PLANETS_CACHE_TIMEOUT)
+
+
+async def aset_data(key, data):
+    """
+    Asynchronous version of `set_data()`.
+    """
+    cache = get_cache()
+    if is_shared(cache):
+        await cache.aset(key, data, settings.PLANETS_CACHE_TIMEOUT)
+
+
+def invalidate_planets(planet_ids=()):
+    """
+    Invalidate the cached list responses and the responses of the given planets.
+
+    Args:
+        planet_ids (iterable, optional): The primary keys of the changed planets.
+            Defaults to none.
+    """
+    bump_version(LIST_VERSION_KEY)
+    for pk in planet_ids:
+        bump_version(detail_version_key(pk))
+
+
+def _count(key):
+    cache = get_cache()
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+async def _acount(key):
+    cache = get_cache()
+    await cache.aadd(key, 0, None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, None)
+
+
+def get_stats():
+    """
+    Return the hit and miss counters of the planet response cache.
+
+    Returns:
+        dict: The number of hits and misses.
+    """
+    cache = get_cache()
+    return {
+        "hits": cache.get(HITS_KEY, 0),
+        "misses": cache.get(MISSES_KEY, 0),
+    }
@@ -0,0 +1,153 @@
+import hashlib
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.db.models import Count
+from django.db.models import Max
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Planet
+from .models import PlanetDeletion
+
+
+# The aggregates identifying the state of the whole list. The deletion time
+# is read in the same query. aggregate() only takes aggregates, so its
+# subquery is wrapped in Max(), which makes it NULL when there are no planets.
+LIST_STATE = {
+    "count": Count("id"),
+    "versions": Sum("version"),
+    "updated_at": Max("updated_at"),
+    "deleted_at": Max(Subquery(PlanetDeletion.objects.filter(pk=1).values("deleted_at"))),
+}
+
+
+def record_deletion():
+    """
+    Remember that a planet was deleted now.
+
+    Deleting a planet does not move the latest `updated_at` of the remaining
+    ones, so the list needs this time to change its Last-Modified date. It is
+    written in the transaction of the deletion, to the database, so that every
+    worker sees it.
+    """
+    deleted_at = datetime.fromtimestamp(time.time(), tz=dt_timezone.utc)
+    if not PlanetDeletion.objects.filter(pk=1).update(deleted_at=deleted_at):
+        PlanetDeletion.objects.create(pk=1, deleted_at=deleted_at)
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from the values identifying a representation.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def list_validators(request):
+    """
+    Compute the ETag and the modification time of the planets list.
+
+    A single aggregate query is enough: any create, update or link change moves
+    the latest `updated_at` or the sum of the versions, and any delete moves the
+    count. The requested URL and media type are part of the ETag, since each
+    page, filter and format is a different representation.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        tuple: The ETag and the Last-Modified POSIX timestamp.
+    """
+    return _list_validators(request, Planet.objects.aggregate(**LIST_STATE))
+
+
+async def alist_validators(request):
+    """
+    Asynchronous version of `list_validators()`.
+    """
+    return _list_validators(request, await Planet.objects.aaggregate(**LIST_STATE))
+
+
+def _list_validators(request, state):
+    updated_at = state["updated_at"].timestamp() if state["updated_at"] else 0
+    if state["deleted_at"] is not None:
+        deleted_at = state["deleted_at"].timestamp()
+    elif state["count"]:
+        # No planet was ever deleted.
+        deleted_at = 0
+    else:
+        # Without planets the deletion time is not read, and could be any
+        # time: assuming now can only make clients download the empty list again.
+        deleted_at = time.time()
+    etag = make_etag(
+        request.build_absolute_uri(), request.accepted_media_type,
+        state["count"], state["versions"], updated_at,
+    )
+    return etag, max(updated_at, deleted_at)
+
+
+def detail_validators(request, pk):
+    """
+    Compute the ETag and the modification time of a planet.
+
+    Args:
+        request: The HTTP request object.
+        pk (int): The primary key of the planet.
+
+    Returns:
+        tuple: The ETag and the Last-Modified POSIX timestamp, or None if the
+        planet does not exist.
+    """
+    state = Planet.objects.filter(pk=pk).values_list("version", "updated_at").first()
+    return _detail_validators(request, pk, state)
+
+
+async def adetail_validators(request, pk):
+    """
+    Asynchronous version of `detail_validators()`.
+    """
+    state = await Planet.objects.filter(pk=pk).values_list("version", "updated_at").afirst()
+    return _detail_validators(request, pk, state)
+
+
+def _detail_validators(request, pk, state):
+    if state is None:
+        return None
+    version, updated_at = state
+    etag = make_etag(request.build_absolute_uri(), request.accepted_media_type, pk, version)
+    return etag, updated_at.timestamp()
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Answer a conditional request when the client already has the representation.
+
+    Args:
+        request: The HTTP request object.
+        etag (str): The current ETag.
+        last_modified (float): The current modification POSIX timestamp.
+
+    Returns:
+        HttpResponse: A 304 (Not Modified) or 412 (Precondition Failed) response,
+        or None if the representation has to be sent.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Add the ETag and Last-Modified headers to a response.
+    """
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
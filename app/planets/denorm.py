@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from .models import Planet
+
+
+# The denormalized column of each relation.
+COLUMNS = {
+    "terrains": "terrain_names",
+    "climates": "climate_names",
+}
+
+
+def compute(relation, planet_ids):
+    """
+    Read the terrains or climates of planets from the through table, in a single query.
+
+    Args:
+        relation (str): "terrains" or "climates".
+        planet_ids (list): The primary keys of the planets.
+
+    Returns:
+        dict: The list of {"id", "name"} objects of each planet, ordered by id.
+        Planets without any are missing.
+    """
+    related = defaultdict(list)
+    if not planet_ids:
+        return related
+    through = getattr(Planet, relation).through
+    target = getattr(Planet, relation).field.m2m_reverse_field_name()
+    rows = (
+        through.objects.filter(planet_id__in=planet_ids)
+        .order_by(f"{target}_id")
+        .values_list("planet_id", f"{target}_id", f"{target}__name")
+    )
+    for planet_id, related_id, related_name in rows:
+        related[planet_id].append({"id": related_id, "name": related_name})
+    return related
+
+
+def refresh(planet_ids, relations=COLUMNS, batch_size=1000):
+    """
+    Rewrite the denormalized columns of planets from their links.
+
+    Takes one query per relation and one update per batch of planets. Call it
+    after touching the planets, in the same transaction: the touch locks their
+    rows, so concurrent refreshes of a planet run one after the other and the
+    last one sees every link.
+
+    Args:
+        planet_ids (iterable): The primary keys of the planets.
+        relations (iterable, optional): The relations whose column is rewritten.
+            Defaults to all of them.
+        batch_size (int, optional): The number of planets per batch. Defaults to 1000.
+
+    Returns:
+        int: The number of planets rewritten.
+    """
+    planet_ids = sorted(set(planet_ids))
+    columns = [COLUMNS[relation] for relation in relations]
+    for start in range(0, len(planet_ids), batch_size):
+        batch = planet_ids[start:start + batch_size]
+        planets = [Planet(pk=pk) for pk in batch]
+        for relation, column in zip(relations, columns):
+            related = compute(relation, batch)
+            for planet in planets:
+                setattr(planet, column, related.get(planet.pk, []))
+        Planet.objects.bulk_update(planets, columns)
+    return len(planet_ids)
+
+
+def drift(batch_size=1000):
+    """
+    Compare the denormalized columns of every planet with its links.
+
+    Planets are read one batch at a time, in primary key order.
+
+    Args:
+        batch_size (int, optional): The number of planets per batch. Defaults to 1000.
+
+    Returns:
+        list: A (planet id, column, stored, expected) tuple for each column
+        that drifted.
+    """
+    drifted = []
+    planets = Planet.objects.order_by("id").values_list("id", *COLUMNS.values())
+    last_id = 0
+    while True:
+        rows = list(planets.filter(id__gt=last_id)[:batch_size])
+        if not rows:
+            return drifted
+        last_id = rows[-1][0]
+        batch = [row[0] for row in rows]
+        expected = {relation: compute(relation, batch) for relation in COLUMNS}
+        for planet_id, *stored in rows:
+            for (relation, column), value in zip(COLUMNS.items(), stored):
+                links = expected[relation].get(planet_id, [])
+                if value != links:
+                    drifted.append((planet_id, column, value, links))
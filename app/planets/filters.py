@@ -0,0 +1,154 @@
+import math
+
+from django.db import connections
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.models.functions import Lower
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Climate
+from .models import Planet
+from .models import Terrain
+
+
+class PlanetFilterBackend(BaseFilterBackend):
+    """
+    Filters the planets list with query parameters, each backed by an index.
+
+    - `terrain` and `climate` keep the planets linked to the named terrains or
+      climates, matched regardless of their case. Comma separated names are
+      alternatives (`?terrain=desert,tundra` is desert OR tundra), and
+      repeated parameters must all match (`?terrain=desert&terrain=mountains`
+      is desert AND mountains). Each one is a semi-join on the (terrain, planet)
+      index of the through table.
+    - `population__gt`, `population__gte`, `population__lt` and `population__lte`
+      bound the population, on the population index. Numbers such as `1e9` are
+      accepted.
+    - `name` and `name__startswith` match the unique name index. PostgreSQL
+      answers `LIKE 'Ta%'` from the `varchar_pattern_ops` index Django adds to
+      the name. SQLite cannot, so there the prefix is also turned into a
+      range, `name >= 'Ta' AND name < 'Tb'`, which its bytewise collation
+      makes exact. Under other collations the range would drop names.
+
+    Attributes:
+        relations (dict): The model of each relation filter.
+        population_lookups (tuple): The supported population lookups.
+        population_range (tuple): The smallest and largest bounds the population column can be compared with.
+    """
+    relations = {"terrain": ("terrains", Terrain), "climate": ("climates", Climate)}
+    population_lookups = ("gt", "gte", "lt", "lte")
+    population_range = BaseDatabaseOperations.integer_field_ranges["BigIntegerField"]
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Apply the filters found in the query parameters.
+
+        Args:
+            request: The HTTP request object.
+            queryset (QuerySet): The planets to filter.
+            view: The view listing the planets.
+
+        Returns:
+            QuerySet: The filtered planets.
+
+        Raises:
+            ValidationError: If a population bound is not a number, or is out
+                of the range of the population column.
+        """
+        params = request.query_params
+        for param, (relation, model) in self.relations.items():
+            for value in params.getlist(param):
+                names = {name.strip().lower() for name in value.split(",") if name.strip()}
+                if names:
+                    queryset = queryset.filter(pk__in=self.linked_planets(relation, model, names))
+
+        for lookup in self.population_lookups:
+            param = f"population__{lookup}"
+            if param in params:
+                bound = self.parse_number(param, params[param])
+                # Populations are integers, so the bound is rounded without
+                # changing the result, and compared with the index as is.
+                bound = math.ceil(bound) if lookup in ("gte", "lt") else math.floor(bound)
+                low, high = self.population_range
+                if not low <= bound <= high:
+                    raise ValidationError({param: [f"Ensure this value is between {low} and {high}."]})
+                queryset = queryset.filter(**{param: bound})
+
+        if "name" in params:
+            queryset = queryset.filter(name=params["name"])
+        prefix = params.get("name__startswith")
+        if prefix:
+            queryset = queryset.filter(name__startswith=prefix)
+            upper = self.prefix_upper_bound(prefix)
+            if connections[queryset.db].vendor == "sqlite" and upper is not None:
+                queryset = queryset.filter(name__gte=prefix, name__lt=upper)
+        return queryset
+
+    def prefix_upper_bound(self, prefix):
+        """
+        Compute the smallest string greater than every string starting with a prefix, in code point order.
+
+        The last character is replaced by the next one, skipping the
+        surrogates, which cannot be stored. A last character that is the
+        largest code point is dropped and the previous one is replaced instead.
+
+        Args:
+            prefix (str): The prefix.
+
+        Returns:
+            str: The upper bound, or None if there is none.
+        """
+        while prefix:
+            code = ord(prefix[-1]) + 1
+            if 0xD800 <= code <= 0xDFFF:
+                code = 0xE000
+            if code <= 0x10FFFF:
+                return prefix[:-1] + chr(code)
+            prefix = prefix[:-1]
+        return None
+
+    def linked_planets(self, relation, model, names):
+        """
+        Build the subquery of the planets linked to any of the given names.
+
+        Args:
+            relation (str): "terrains" or "climates".
+            model (Model): Terrain or Climate.
+            names (set): The lower case names.
+
+        Returns:
+            QuerySet: The ids of the planets, as a subquery.
+        """
+        through = getattr(Planet, relation).through
+        target = getattr(Planet, relation).field.m2m_reverse_field_name()
+        ids = model.objects.annotate(key=Lower("name")).filter(key__in=names).values("id")
+        return through.objects.filter(**{f"{target}_id__in": ids}).values("planet_id")
+
+    def parse_number(self, param, value):
+        """
+        Parse a population bound.
+
+        Args:
+            param (str): The name of the query parameter.
+            value (str): The value of the query parameter.
+
+        Integers are parsed exactly, since floats cannot hold every integer
+        above 2**53, and anything else, such as 1e9 or 2.5, as a float.
+
+        Returns:
+            int or float: The bound.
+
+        Raises:
+            ValidationError: If the value is not a finite number.
+        """
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        try:
+            number = float(value)
+        except ValueError:
+            number = math.nan
+        if not math.isfinite(number):
+            raise ValidationError({param: ["A valid number is required."]})
+        return number
@@ -0,0 +1,366 @@
+import hashlib
+import json
+from collections import Counter
+from itertools import islice
+
+from django.db.models import F
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from . import denorm
+from . import stats
+from .models import Climate
+from .models import Planet
+from .models import Terrain
+from .signals import planets_bulk_changed
+
+
+def batched(iterable, size):
+    """
+    Split an iterable into lists of at most `size` items.
+
+    Args:
+        iterable (iterable): The items to split.
+        size (int): The maximum number of items per list.
+
+    Yields:
+        list: The next batch of items.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def parse_ndjson(lines):
+    """
+    Parse newline delimited JSON one line at a time, carrying on after invalid lines.
+
+    Blank lines are skipped.
+
+    Args:
+        lines (iterable): The lines, as strings or bytes, such as an open file.
+
+    Yields:
+        tuple: The line number, the parsed JSON document of the line or None,
+        and the ValueError raised by an invalid line or None.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError as exc:
+            yield number, None, exc
+
+
+def read_ndjson(lines):
+    """
+    Parse newline delimited JSON one line at a time.
+
+    Blank lines are skipped.
+
+    Args:
+        lines (iterable): The lines, as strings or bytes, such as an open file.
+
+    Yields:
+        tuple: The line number and the parsed JSON document of each line.
+
+    Raises:
+        ValueError: If a line is not valid JSON, with the line number in the message.
+    """
+    for number, document, error in parse_ndjson(lines):
+        if error is not None:
+            raise ValueError(f"Line {number}: {error}") from error
+        yield number, document
+
+
+def fingerprint(record):
+    """
+    Hash the content of a planet record.
+
+    The order of the terrains and climates does not matter, nor does the
+    population being a float or an integer.
+
+    Args:
+        record (dict): The planet record.
+
+    Returns:
+        str: The SHA-256 hex digest of the record.
+    """
+    population = record.get("population")
+    content = {
+        "name": record["name"],
+        "population": int(population) if population is not None else None,
+        "terrains": sorted(set(record.get("terrains") or [])),
+        "climates": sorted(set(record.get("climates") or [])),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class PlanetLoader:
+    """
+    Writes planet records to the database with a fixed number of queries per batch.
+
+    A record is a dictionary with the `name` and `population` of a planet and
+    the lists of its `terrains` and `climates` names. Planets are matched by
+    name, and terrains and climates by name regardless of its case. New ones
+    are inserted with conflict-safe upserts, so concurrent loads never
+    duplicate them.
+
+    By default, existing planets are updated when their population changed or
+    when they gained terrains or climates, and links are only added, never
+    removed. In incremental mode, each record is compared with the fingerprint
+    stored on its planet: unchanged planets cost nothing more than the lookup,
+    and changed ones are rewritten with their links synced exactly, extra
+    links being removed.
+
+    Attributes:
+        batch_size (int): The number of records written per batch.
+        incremental (bool): Whether to skip the records matching their fingerprint.
+        track_names (bool): Whether to remember the names loaded, for `prune()`.
+        stats (Counter): The number of planets inserted, updated, unchanged and
+            deleted, and of terrains and climates inserted.
+    """
+    relations = (("terrains", Terrain), ("climates", Climate))
+
+    def __init__(self, batch_size=500, incremental=False, track_names=False):
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.track_names = track_names
+        self.names = set()
+        self.stats = Counter()
+
+    def load(self, records):
+        """
+        Write every record, one batch at a time.
+
+        Args:
+            records (iterable): The planet records. They are consumed lazily,
+                so a generator keeps only one batch in memory.
+
+        Returns:
+            Counter: The stats of the load.
+        """
+        for batch in batched(records, self.batch_size):
+            self.load_batch(batch)
+        return self.stats
+
+    def load_batch(self, records):
+        """
+        Write a batch of records.
+
+        Records sharing a name are written once, with the last of them.
+
+        Args:
+            records (list): The planet records.
+
+        Returns:
+            int: The number of planets in the batch, once records sharing a name are merged.
+        """
+        records = {record["name"]: record for record in records}
+        count = len(records)
+        if self.track_names:
+            self.names.update(records)
+
+        existing = Planet.objects.filter(name__in=records).only(
+            "id", "name", "population", "fingerprint"
+        )
+        planets = {planet.name: planet for planet in existing}
+
+        fingerprints = {}
+        if self.incremental:
+            fingerprints = {name: fingerprint(record) for name, record in records.items()}
+            unchanged = [
+                name for name in records
+                if name in planets and planets[name].fingerprint == fingerprints[name]
+            ]
+            for name in unchanged:
+                del records[name]
+            self.stats["unchanged"] += len(unchanged)
+
+        created, changed = self.upsert_planets(records, planets, fingerprints)
+        linked = set()
+        for relation, model in self.relations:
+            names = {name for record in records.values() for name in record.get(relation) or []}
+            ids = self.resolve_names(model, names, relation)
+            links = {
+                (planets[planet_name].pk, ids[name.lower()])
+                for planet_name, record in records.items()
+                for name in record.get(relation) or []
+            }
+            planet_ids = {planets[name].pk for name in records}
+            populations = {planets[name].pk: planets[name].population for name in records}
+            linked |= self.sync_links(relation, links, planet_ids, populations)
+
+        touched = linked - created - changed
+        if touched:
+            Planet.objects.filter(pk__in=touched).touch()
+        if linked:
+            denorm.refresh(linked)
+        self.stats["updated"] += len(touched)
+        self.stats["unchanged"] -= len(touched)
+
+        written = created | changed | touched
+        if written:
+            planets_bulk_changed.send(sender=self.__class__, planet_ids=sorted(written))
+        return count
+
+    def upsert_planets(self, records, planets, fingerprints):
+        """
+        Insert the new planets and update the existing ones.
+
+        A new planet inserted by a concurrent load in the meantime is updated
+        instead. Inserts do not return primary keys on conflicts, so the ids
+        of the new planets are read back with one more query.
+
+        Args:
+            records (dict): The planet records to write by name.
+            planets (dict): The existing planets by name. New planets are added to it.
+            fingerprints (dict): The fingerprint of each record, in incremental mode.
+
+        Returns:
+            tuple: The sets of ids of the planets inserted and updated.
+        """
+        now = timezone.now()
+        new, changed = [], []
+        repopulated = {}
+        for name, record in records.items():
+            population = record.get("population")
+            population = int(population) if population is not None else None
+            planet = planets.get(name)
+            if planet is None:
+                planets[name] = planet = Planet(
+                    name=name, population=population, fingerprint=fingerprints.get(name, ""),
+                )
+                new.append(planet)
+            elif self.incremental or planet.population != population:
+                if planet.population != population:
+                    repopulated[planet.pk] = population
+                planet.population = population
+                planet.fingerprint = fingerprints.get(name, "")
+                planet.version = F("version") + 1
+                planet.updated_at = now
+                changed.append(planet)
+
+        Planet.objects.bulk_create(
+            new,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["population", "fingerprint", "updated_at"],
+        )
+        if new:
+            ids = dict(
+                Planet.objects.filter(name__in=[planet.name for planet in new])
+                .values_list("name", "id")
+            )
+            for planet in new:
+                planet.pk = ids[planet.name]
+        pending = stats.population_deltas(repopulated)
+        Planet.objects.bulk_update(
+            changed,
+            ["population", "fingerprint", "version", "updated_at"],
+            batch_size=self.batch_size,
+        )
+        stats.apply_all(pending)
+        self.stats["inserted"] += len(new)
+        self.stats["updated"] += len(changed)
+        self.stats["unchanged"] += len(records) - len(new) - len(changed)
+        return {planet.pk for planet in new}, {planet.pk for planet in changed}
+
+    def resolve_names(self, model, names, relation):
+        """
+        Map terrain or climate names to their ids, inserting the missing ones.
+
+        Names are matched regardless of their case, and the missing ones are
+        inserted with the first spelling seen. Names inserted concurrently by
+        someone else are skipped, then read back with the new ones.
+
+        Args:
+            model (Model): Terrain or Climate.
+            names (set): The names to resolve.
+            relation (str): The name of the relation, used in the stats.
+
+        Returns:
+            dict: The id of each name, by lower case name.
+        """
+        def lookup(names):
+            rows = model.objects.annotate(key=Lower("name")).filter(
+                Q(key__in={name.lower() for name in names}) | Q(name__in=names)
+            )
+            return {name.lower(): pk for pk, name in rows.values_list("id", "name")}
+
+        ids = lookup(names) if names else {}
+        missing = {}
+        for name in sorted(names):
+            if name.lower() not in ids:
+                missing.setdefault(name.lower(), name)
+        if missing:
+            model.objects.bulk_create(
+                [model(name=name) for name in missing.values()],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            ids.update(lookup(set(missing.values())))
+        self.stats[f"{relation}_inserted"] += len(missing)
+        return ids
+
+    def sync_links(self, relation, links, planet_ids, populations):
+        """
+        Insert the missing links between planets and terrains or climates.
+
+        In incremental mode, the links of the planets that are not wanted any
+        more are deleted as well. The links written are counted in the
+        terrain and climate stats.
+
+        Args:
+            relation (str): "terrains" or "climates".
+            links (set): The (planet id, terrain or climate id) pairs wanted.
+            planet_ids (set): The planets whose links are written.
+            populations (dict): The population of each planet.
+
+        Returns:
+            set: The ids of the planets whose links changed.
+        """
+        if not planet_ids:
+            return set()
+        through = getattr(Planet, relation).through
+        target = getattr(Planet, relation).field.m2m_reverse_field_name()
+        existing = {
+            (planet_id, pk): link_id
+            for link_id, planet_id, pk in through.objects.filter(planet_id__in=planet_ids)
+            .values_list("id", "planet_id", f"{target}_id")
+        }
+        missing = links - existing.keys()
+        extra = {pair: link_id for pair, link_id in existing.items() if pair not in links}
+        through.objects.bulk_create(
+            [through(planet_id=planet_id, **{f"{target}_id": pk}) for planet_id, pk in missing],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        stats.links_changed(relation, missing, 1, populations)
+        if self.incremental and extra:
+            through.objects.filter(id__in=extra.values()).delete()
+            stats.links_changed(relation, extra, -1, populations)
+        else:
+            extra = {}
+        return {planet_id for planet_id, _ in missing | set(extra)}
+
+    def prune(self):
+        """
+        Delete the planets whose names were not loaded.
+
+        Needs `track_names`, and must run after every record was loaded.
+
+        Returns:
+            int: The number of planets deleted.
+        """
+        stale = [
+            pk for pk, name in Planet.objects.values_list("id", "name").iterator()
+            if name not in self.names
+        ]
+        for batch in batched(stale, self.batch_size):
+            Planet.objects.filter(pk__in=batch).delete()
+        self.stats["deleted"] += len(stale)
+        return len(stale)
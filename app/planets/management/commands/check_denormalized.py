@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from planets import denorm
+from planets.signals import planets_touched
+
+
+class Command(BaseCommand):
+    help = "Check that the denormalized terrain and climate names of the planets match their links"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Rewrite the columns that drifted instead of failing.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of planets checked per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handle method for the check_denormalized command.
+
+        Compares the `terrain_names` and `climate_names` columns of every planet
+        with its links and prints the columns that drifted. With `--fix`, the
+        planets that drifted are touched and rewritten from their links.
+
+        Returns:
+            None
+
+        Raises:
+            CommandError: Without `--fix`, if some planets drifted.
+        """
+        drifted = denorm.drift(batch_size=options["batch_size"])
+        for pk, column, stored, expected in drifted:
+            self.stdout.write(f"planet {pk} {column}: stored {stored}, expected {expected}")
+
+        planet_ids = sorted({pk for pk, *_ in drifted})
+        if not planet_ids:
+            self.stdout.write(self.style.SUCCESS("No drift."))
+            return
+        if not options["fix"]:
+            raise CommandError(f"{len(planet_ids)} planets drifted.")
+
+        with transaction.atomic():
+            planets_touched(planet_ids)
+        self.stdout.write(self.style.SUCCESS(f"{len(planet_ids)} planets drifted and were rewritten."))
@@ -0,0 +1,127 @@
+import gzip
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from planets.models import Planet
+from planets.serializers import PlanetReadSerializer
+from planets.streaming import encode_chunks
+from planets.streaming import iter_cursor_chunks
+
+
+class Command(BaseCommand):
+    help = "Export every planet to a file or to the standard output, as NDJSON, CSV or JSON"
+    formats = ("ndjson", "csv", "json")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=self.formats,
+            default="ndjson",
+            help="Format of the export (default: ndjson).",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Path of the export, or - for the standard output (default: -).",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the export with gzip, which paths ending in .gz always are.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.PLANETS_STREAM_CHUNK_SIZE,
+            help="Number of planets read and serialized at a time.",
+        )
+
+    def open_output(self, path, compress):
+        """
+        Open the binary stream the export is written to.
+
+        A file is written under a temporary name and only renamed to `path`
+        by `close_output()` once the export succeeded, so an existing export
+        is never left half overwritten.
+
+        Args:
+            path (str): The path of the export, or "-" for the standard output.
+            compress (bool): Whether to compress the export with gzip.
+
+        Returns:
+            tuple: The stream, and the underlying file or None for the standard output.
+        """
+        if path == "-":
+            target = None
+            stream = self.stdout.buffer
+        else:
+            target = open(f"{path}.tmp", "wb")
+            stream = target
+        if compress:
+            stream = gzip.GzipFile(fileobj=stream, mode="wb")
+        return stream, target
+
+    def close_output(self, stream, target, path, succeeded):
+        """
+        Finish the export, keeping the file only if the export succeeded.
+        """
+        if isinstance(stream, gzip.GzipFile):
+            stream.close()
+        if target is None:
+            self.stdout.buffer.flush()
+            return
+        target.close()
+        if succeeded:
+            os.replace(target.name, path)
+        else:
+            os.remove(target.name)
+
+    def handle(self, *args, **options):
+        """
+        Handle method for the export_planets command.
+
+        Reads every planet from a single query, `--chunk-size` rows at a time,
+        with their terrains and climates taken from their denormalized
+        columns, and writes each chunk as soon as it is serialized, so memory
+        use does not depend on the number of planets. The number of planets
+        exported and the rate are reported on the standard error.
+
+        Returns:
+            None
+
+        Raises:
+            CommandError: If the chunk size is not positive.
+        """
+        if options["chunk_size"] < 1:
+            raise CommandError("The chunk size must be positive.")
+        path = options["output"]
+        compress = options["gzip"] or path.endswith(".gz")
+
+        exported = 0
+
+        def counted(chunks):
+            nonlocal exported
+            for chunk in chunks:
+                exported += len(chunk)
+                yield chunk
+
+        started = time.perf_counter()
+        planets = Planet.objects.values(*PlanetReadSerializer.columns())
+        chunks = counted(iter_cursor_chunks(planets, options["chunk_size"]))
+        stream, target = self.open_output(path, compress)
+        succeeded = False
+        try:
+            for data in encode_chunks(chunks, options["format"]):
+                stream.write(data)
+            succeeded = True
+        finally:
+            self.close_output(stream, target, path, succeeded)
+
+        elapsed = time.perf_counter() - started
+        rate = exported / elapsed if elapsed else 0
+        self.stderr.write(
+            self.style.SUCCESS(f"Exported {exported} planets in {elapsed:.2f}s ({rate:.0f} rows/s).")
+        )
@@ -1,22 +1,44 @@
+import asyncio
+import base64
+import json
+import math
+import queue
+import sys
+import threading
+
 from gql import gql, Client
 from gql.transport.aiohttp import AIOHTTPTransport
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
 
-from planets.models import Climate
-from planets.models import Planet
-from planets.models import Terrain
+from planets.loaders import PlanetLoader
+from planets.loaders import read_ndjson
 
 
 class Command(BaseCommand):
     help = "Populate the database with planets"
     url = "https://swapi-graphql.netlify.app/.netlify/functions/index"
-    string = "query Query {allPlanets{planets{name population terrains climates}}}"
+    string = """
+        query Planets($first: Int, $after: String) {
+            allPlanets(first: $first, after: $after) {
+                totalCount
+                pageInfo { hasNextPage endCursor }
+                planets { name population terrains climates }
+            }
+        }
+    """
+    backoff = 0.5
+    stealth_options = ("stdin",)
 
     def init_gql_client(self, url):
         """
         Initializes a GraphQL client with the given URL.
 
+        The schema is not fetched: the query is known, and introspection would
+        cost an extra round trip.
+
         Args:
             url (str): The URL of the GraphQL server.
 
@@ -25,115 +47,353 @@ class Command(BaseCommand):
 
         """
         transport = AIOHTTPTransport(url=url)
-        return Client(transport=transport, fetch_schema_from_transport=True)
+        return Client(transport=transport, fetch_schema_from_transport=False)
 
-    def execute_query(self, client):
+    async def execute_query(self, session, query, variables, retries=3):
         """
-        Executes the GraphQL query using the provided client.
+        Executes the GraphQL query, retrying failed requests with exponential backoff.
 
         Args:
-            client: The GraphQL client used to execute the query.
+            session: The GraphQL client session used to execute the query.
+            query: The parsed GraphQL query.
+            variables (dict): The variables of the query.
+            retries (int, optional): The number of retries after a failure. Defaults to 3.
+                The first retry waits `backoff` seconds, and each next one twice as long.
 
         Returns:
-            The result of the query execution.
+            dict: The page of the `allPlanets` connection.
 
         """
-        query = gql(self.string)
-        return client.execute(query)
-    
-    def get_planets(self):
+        for attempt in range(retries + 1):
+            try:
+                result = await session.execute(query, variable_values=variables)
+                return result["allPlanets"]
+            except Exception:
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    def page_cursors(self, page, page_size):
         """
-        Retrieves a list of planets from the GraphQL API.
+        Computes the cursors of the pages following the first one.
+
+        Relay servers such as SWAPI use `arrayconnection:<offset>` cursors, so
+        the cursor of every page is known once the total count is, and pages
+        can be fetched concurrently.
+
+        Args:
+            page (dict): The first page of the connection.
+            page_size (int): The number of planets per page.
 
         Returns:
-            A list of planets retrieved from the API.
+            list: The `after` cursor of each following page, or None if the
+            cursors are opaque and the pages must be followed one by one.
         """
-        try:
-            client = self.init_gql_client(self.url)
-            result = self.execute_query(client)
-            return result["allPlanets"]["planets"]
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error: {e}"))
+        info = page["pageInfo"]
+        if not info["hasNextPage"]:
             return []
+        try:
+            prefix, offset = base64.b64decode(info["endCursor"]).decode().split(":")
+            offset = int(offset)
+        except (TypeError, ValueError):
+            return None
+        if prefix != "arrayconnection" or page.get("totalCount") is None:
+            return None
+        return [
+            base64.b64encode(f"arrayconnection:{start - 1}".encode()).decode()
+            for start in range(offset + 1, page["totalCount"], page_size)
+        ]
 
-    def create_or_update_planet(self, planet):
+    async def fetch_planets(self, put, url, page_size=100, concurrency=4, retries=3):
         """
-        Creates or updates a planet in the database.
+        Fetches every page of planets from the GraphQL API.
+
+        The first page tells how many planets there are; the others are then
+        fetched concurrently, at most `concurrency` at a time.
 
         Args:
-            planet (dict): A dictionary containing the planet's name and population.
+            put: The coroutine function receiving each page of planets.
+            url (str): The URL of the GraphQL server.
+            page_size (int, optional): The number of planets per page. Defaults to 100.
+            concurrency (int, optional): The maximum number of requests in flight.
+                Defaults to 4.
+            retries (int, optional): The number of retries of each request. Defaults to 3.
 
         Returns:
-            Planet: The created or updated planet object.
+            None
+        """
+        query = gql(self.string)
+        async with self.init_gql_client(url) as session:
+            page = await self.execute_query(session, query, {"first": page_size}, retries)
+            await put(page["planets"])
+            cursors = self.page_cursors(page, page_size)
 
+            if cursors is None:
+                while page["pageInfo"]["hasNextPage"]:
+                    variables = {"first": page_size, "after": page["pageInfo"]["endCursor"]}
+                    page = await self.execute_query(session, query, variables, retries)
+                    await put(page["planets"])
+                return
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch_page(after):
+                async with semaphore:
+                    variables = {"first": page_size, "after": after}
+                    page = await self.execute_query(session, query, variables, retries)
+                await put(page["planets"])
+
+            await asyncio.gather(*(fetch_page(after) for after in cursors))
+
+    def get_planets(self, url=None, page_size=100, concurrency=4, retries=3):
         """
-        planet_name = planet["name"]
-        population = planet["population"]
-        planet, _ = Planet.objects.update_or_create(
-            name=planet_name,
-            defaults={"population": population},
-        )
-        self.stdout.write(self.style.SUCCESS(f"Planet: {planet_name}"))
-        return planet
+        Retrieves planets from the GraphQL API while they are written.
+
+        Pages are fetched by an event loop in a background thread and handed
+        over through a bounded queue, so the database writes overlap with the
+        requests and at most a few pages wait in memory.
+
+        Args:
+            url (str, optional): The URL of the GraphQL server. Defaults to the SWAPI one.
+            page_size (int, optional): The number of planets per page. Defaults to 100.
+            concurrency (int, optional): The maximum number of requests in flight.
+                Defaults to 4.
+            retries (int, optional): The number of retries of each request. Defaults to 3.
+
+        Yields:
+            dict: The next planet.
+
+        Raises:
+            CommandError: If a page cannot be fetched.
+        """
+        pages = queue.Queue(maxsize=concurrency * 2)
+        stopped = threading.Event()
+        done = object()
+
+        async def put(planets):
+            while True:
+                if stopped.is_set():
+                    raise RuntimeError("The planets are not consumed any more.")
+                try:
+                    return pages.put_nowait(planets)
+                except queue.Full:
+                    await asyncio.sleep(0.01)
+
+        def hand_over(item):
+            while not stopped.is_set():
+                try:
+                    return pages.put(item, timeout=0.1)
+                except queue.Full:
+                    pass
 
-    def add_terrains_to_planet(self, planet, terrains):
+        def produce():
+            try:
+                asyncio.run(self.fetch_planets(put, url or self.url, page_size, concurrency, retries))
+                hand_over(done)
+            except Exception as e:
+                hand_over(e)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while (planets := pages.get()) is not done:
+                if isinstance(planets, Exception):
+                    raise CommandError(f"Error: {planets}")
+                yield from planets
+        finally:
+            stopped.set()
+            producer.join()
+
+    def check_planets(self, planets):
         """
-        Add terrains to a planet.
+        Checks the planets read from a file.
 
         Args:
-            planet (Planet): The planet to add terrains to.
-            terrains (list): A list of terrain names to add.
+            planets (iterable): The planets, each with its line or position in the file.
 
-        Returns:
-            None
+        Yields:
+            dict: The next planet.
+
+        Raises:
+            CommandError: If a planet has no name or an invalid population, or
+                the file is not valid JSON.
         """
-        for terrain in terrains:
-            terrain_obj, _ = Terrain.objects.get_or_create(name=terrain)
-            planet.terrains.add(terrain_obj)
+        low, high = BaseDatabaseOperations.integer_field_ranges["BigIntegerField"]
+        try:
+            for number, planet in planets:
+                if not isinstance(planet, dict) or not planet.get("name"):
+                    raise CommandError(f"Record {number}: expected a planet with a name.")
+                population = planet.get("population")
+                if population is not None and (
+                    isinstance(population, bool)
+                    or not isinstance(population, (int, float))
+                    or not math.isfinite(population)
+                    or not low <= int(population) <= high
+                ):
+                    raise CommandError(
+                        f"Record {number}: expected a number or null as population, got {population!r}."
+                    )
+                yield planet
+        except ValueError as e:
+            raise CommandError(e)
 
-    def add_climates_to_planet(self, planet, climates):
+    def get_planets_from_file(self, source, stdin=None):
         """
-        Adds the given climates to the specified planet.
+        Retrieves planets from a file instead of the GraphQL API.
+
+        NDJSON files (`.ndjson`, `.jsonl`) and the standard input (`-`) are read
+        lazily, one planet per line, so they can be larger than the memory.
+        JSON files hold a list of planets or a saved GraphQL response, and are
+        read at once.
 
         Args:
-            planet (Planet): The planet to which the climates will be added.
-            climates (list): A list of climate names to be added.
+            source (str): The path of the file, or "-" for the standard input.
+            stdin (file, optional): The standard input. Defaults to sys.stdin.
 
-        Returns:
-            None
+        Yields:
+            dict: The next planet.
+
+        Raises:
+            CommandError: If the file cannot be read or holds invalid planets.
         """
-        for climate in climates:
-            climate_obj, _ = Climate.objects.get_or_create(name=climate)
-            planet.climates.add(climate_obj)
+        if source == "-":
+            yield from self.check_planets(read_ndjson(stdin or sys.stdin))
+            return
+
+        try:
+            with open(source, encoding="utf-8") as file:
+                if not source.endswith(".json"):
+                    yield from self.check_planets(read_ndjson(file))
+                    return
+                data = json.load(file)
+        except OSError as e:
+            raise CommandError(f"Cannot read {source}: {e}")
+        except ValueError as e:
+            raise CommandError(f"Invalid JSON in {source}: {e}")
+
+        if isinstance(data, dict):
+            try:
+                data = data.get("data", data)["allPlanets"]["planets"]
+            except (KeyError, TypeError):
+                raise CommandError(f"No list of planets in {source}.")
+        yield from self.check_planets(enumerate(data, 1))
 
-    def populate_database(self, planets):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            help=(
+                "Read the planets from a .json or .ndjson file, or from the standard "
+                "input with '-', instead of the GraphQL API."
+            ),
+        )
+        parser.add_argument(
+            "--url",
+            default=self.url,
+            help="URL of the GraphQL API (default: the SWAPI one).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=100,
+            help="Number of planets requested per page (default: 100).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Maximum number of pages fetched at once (default: 4).",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=3,
+            help="Number of retries of a failed request (default: 3).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of planets written per batch (default: 500).",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help=(
+                "Only write the planets whose data changed since the last incremental "
+                "run, and sync their terrains and climates exactly."
+            ),
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete the planets that are missing from the source.",
+        )
+
+    def populate_database(self, planets, batch_size=500, incremental=False, prune=False):
         """
         Populates the database with planet data.
 
+        Planets are written in batches with a fixed number of queries each,
+        all inside one transaction.
+
         Args:
-            planets (list): A list of planet dictionaries containing planet data.
+            planets (iterable): The planet dictionaries containing planet data.
+            batch_size (int, optional): The number of planets written per batch.
+                Defaults to 500.
+            incremental (bool, optional): Whether to only write the planets that
+                changed since the last incremental run. Defaults to False.
+            prune (bool, optional): Whether to delete the planets missing from
+                `planets`. Defaults to False.
 
         Returns:
-            None
+            Counter: The number of planets inserted, updated, unchanged and
+            deleted, and of terrains and climates inserted.
+
+        Raises:
+            CommandError: If pruning was asked but no planet was read, which
+                would delete every planet.
         """
-        for planet in planets:
-            planet_obj = self.create_or_update_planet(planet)
-            self.add_terrains_to_planet(planet_obj, planet.get("terrains", []))
-            self.add_climates_to_planet(planet_obj, planet.get("climates", []))
+        loader = PlanetLoader(batch_size=batch_size, incremental=incremental, track_names=prune)
+        with transaction.atomic():
+            stats = loader.load(planets)
+            if prune:
+                if not loader.names:
+                    raise CommandError("No planets were read, refusing to prune every planet.")
+                loader.prune()
+        return stats
 
     def handle(self, *args, **options):
         """
         Handle method for the populate command.
 
         This method is called when the populate command is executed. It queries the planets,
-        populates the database with the retrieved planets, and prints a success message.
+        populates the database with the retrieved planets, and prints a summary.
 
         Returns:
             None
         """
         self.stdout.write("Querying planets...")
 
-        planets = self.get_planets()
-        self.populate_database(planets)
+        if options["source"]:
+            planets = self.get_planets_from_file(options["source"], options.get("stdin"))
+        else:
+            planets = self.get_planets(
+                url=options["url"],
+                page_size=options["page_size"],
+                concurrency=options["concurrency"],
+                retries=options["retries"],
+            )
+        stats = self.populate_database(
+            planets,
+            batch_size=options["batch_size"],
+            incremental=options["incremental"],
+            prune=options["prune"],
+        )
 
+        self.stdout.write(self.style.SUCCESS(
+            f"Planets: {stats['inserted']} inserted, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['deleted']} deleted. "
+            f"Terrains: {stats['terrains_inserted']} inserted. "
+            f"Climates: {stats['climates_inserted']} inserted."
+        ))
         self.stdout.write("Done!")
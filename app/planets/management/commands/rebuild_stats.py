@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from planets import stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the terrain and climate stats from scratch, reporting any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report the drift, and fail if there is any, without rebuilding.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handle method for the rebuild_stats command.
+
+        Compares the stored stats with stats computed from scratch, prints the
+        rows that drifted, then rebuilds the stats unless `--check` is given.
+
+        Returns:
+            None
+
+        Raises:
+            CommandError: With `--check`, if some stats drifted.
+        """
+        drifted = stats.drift()
+        for relation, pk, stored, expected in drifted:
+            self.stdout.write(
+                f"{relation} {pk}: stored (planets, populated, population) {stored}, expected {expected}"
+            )
+
+        if options["check"]:
+            if drifted:
+                raise CommandError(f"{len(drifted)} stats rows drifted.")
+            self.stdout.write(self.style.SUCCESS("No drift."))
+            return
+
+        written = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(drifted)} stats rows drifted. {written} stats rows rebuilt."
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.7 on 2026-10-18 12:14
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0007_planet_climates'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='climate',
+            options={'ordering': ('id',)},
+        ),
+        migrations.AlterModelOptions(
+            name='terrain',
+            options={'ordering': ('id',)},
+        ),
+    ]
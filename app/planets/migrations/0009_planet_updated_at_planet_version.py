@@ -0,0 +1,23 @@
+# Generated by Django 4.1.7 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0008_alter_climate_options_alter_terrain_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='planet',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='planet',
+            name='version',
+            field=models.PositiveBigIntegerField(default=1),
+        ),
+    ]
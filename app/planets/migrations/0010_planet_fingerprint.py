@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0009_planet_updated_at_planet_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='planet',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Lower
+
+
+def merge_duplicates(model, key, links):
+    """
+    Merge the rows of `model` sharing the same `key`, keeping the oldest one.
+
+    The many-to-many links of the duplicates are moved to the row kept, then
+    the duplicates are deleted along with their remaining links.
+
+    Args:
+        model (Model): The historical model to deduplicate.
+        key (Expression): The value rows are unique on.
+        links (list): The (through model, column pointing to `model`) pairs.
+    """
+    keep = {}
+    duplicates = {}
+    for pk, value in model.objects.annotate(key=key).order_by("id").values_list("id", "key"):
+        if value in keep:
+            duplicates[pk] = keep[value]
+        else:
+            keep[value] = pk
+    if not duplicates:
+        return
+
+    for through, column in links:
+        other = next(
+            field.attname for field in through._meta.fields
+            if field.is_relation and field.attname != column
+        )
+        existing = set(
+            through.objects.filter(**{f"{column}__in": set(duplicates.values())})
+            .values_list(column, other)
+        )
+        moved = {
+            (duplicates[pk], target)
+            for pk, target in through.objects.filter(**{f"{column}__in": duplicates})
+            .values_list(column, other)
+        } - existing
+        through.objects.bulk_create([through(**{column: pk, other: target}) for pk, target in moved])
+    model.objects.filter(pk__in=duplicates).delete()
+
+
+def deduplicate_names(apps, schema_editor):
+    Planet = apps.get_model("planets", "Planet")
+    Terrain = apps.get_model("planets", "Terrain")
+    Climate = apps.get_model("planets", "Climate")
+    terrains = Planet.terrains.through
+    climates = Planet.climates.through
+
+    merge_duplicates(Planet, F("name"), [(terrains, "planet_id"), (climates, "planet_id")])
+    merge_duplicates(Terrain, Lower("name"), [(terrains, "terrain_id")])
+    merge_duplicates(Climate, Lower("name"), [(climates, "climate_id")])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0010_planet_fingerprint'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_names, migrations.RunPython.noop),
+    ]
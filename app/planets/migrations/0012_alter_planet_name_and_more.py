@@ -0,0 +1,27 @@
+# Generated by Django 4.1.7 on 2026-10-18 12:26
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0011_deduplicate_names'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='planet',
+            name='name',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='climate',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='planets_climate_name_ci_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='terrain',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='planets_terrain_name_ci_unique'),
+        ),
+    ]
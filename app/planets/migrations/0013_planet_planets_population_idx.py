@@ -0,0 +1,30 @@
+# Generated by Django 4.1.7 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0012_alter_planet_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='planet',
+            index=models.Index(fields=['population'], name='planets_population_idx'),
+        ),
+        # The auto-created through tables only have a (planet, target) unique
+        # index; filtering planets by terrain or climate walks them the other
+        # way round.
+        migrations.RunSQL(
+            'CREATE INDEX planets_planet_terrains_terrain_planet_idx '
+            'ON planets_planet_terrains (terrain_id, planet_id)',
+            'DROP INDEX planets_planet_terrains_terrain_planet_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX planets_planet_climates_climate_planet_idx '
+            'ON planets_planet_climates (climate_id, planet_id)',
+            'DROP INDEX planets_planet_climates_climate_planet_idx',
+        ),
+    ]
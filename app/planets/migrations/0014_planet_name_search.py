@@ -0,0 +1,89 @@
+from django.db import migrations
+
+
+FTS_TABLE = "planets_planet_fts"
+
+# The SQLite full-text index of planet names. It reads the names from
+# planets_planet (external content) and triggers keep it in sync with every
+# write, bulk ones included. Prefix indexes answer short type-ahead queries.
+SQLITE_SETUP = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, content='planets_planet', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON planets_planet BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON planets_planet BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF name ON planets_planet BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE} (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_TEARDOWN = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# The PostgreSQL trigram index of planet names, which answers both similarity
+# (`%`) and substring (`ILIKE`) searches.
+POSTGRESQL_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX planets_planet_name_trgm_idx ON planets_planet USING gin (name gin_trgm_ops)",
+]
+POSTGRESQL_TEARDOWN = [
+    "DROP INDEX IF EXISTS planets_planet_name_trgm_idx",
+]
+
+
+def run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    run(schema_editor, {
+        "sqlite": SQLITE_SETUP,
+        "postgresql": POSTGRESQL_SETUP,
+    })
+
+
+def drop_search_index(apps, schema_editor):
+    run(schema_editor, {
+        "sqlite": SQLITE_TEARDOWN,
+        "postgresql": POSTGRESQL_TEARDOWN,
+    })
+
+
+def restore_sqlite_search_index(apps, schema_editor):
+    """
+    Set the SQLite index up again after planets_planet was rebuilt.
+
+    SQLite alters tables by copying them into a new one, which drops their
+    triggers, so later migrations altering planets_planet call this.
+    """
+    run(schema_editor, {"sqlite": SQLITE_TEARDOWN + SQLITE_SETUP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0013_planet_planets_population_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
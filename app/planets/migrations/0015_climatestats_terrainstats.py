@@ -0,0 +1,63 @@
+# Generated by Django 4.1.7 on 2026-10-18 12:36
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def compute_stats(apps, schema_editor):
+    Planet = apps.get_model("planets", "Planet")
+    for relation, model_name, column in (
+        ("terrains", "TerrainStats", "terrain_id"),
+        ("climates", "ClimateStats", "climate_id"),
+    ):
+        stats_model = apps.get_model("planets", model_name)
+        rows = getattr(Planet, relation).through.objects.values(column).annotate(
+            planets=Count("id"),
+            populated=Count("planet__population"),
+            population=Sum("planet__population"),
+        )
+        stats_model.objects.bulk_create([
+            stats_model(
+                pk=row[column],
+                planet_count=row["planets"],
+                populated_count=row["populated"],
+                population_total=row["population"] or 0,
+            )
+            for row in rows
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0014_planet_name_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClimateStats',
+            fields=[
+                ('planet_count', models.BigIntegerField(default=0)),
+                ('populated_count', models.BigIntegerField(default=0)),
+                ('population_total', models.BigIntegerField(default=0)),
+                ('climate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='planets.climate')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TerrainStats',
+            fields=[
+                ('planet_count', models.BigIntegerField(default=0)),
+                ('populated_count', models.BigIntegerField(default=0)),
+                ('population_total', models.BigIntegerField(default=0)),
+                ('terrain', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='planets.terrain')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(compute_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.1.7 on 2026-10-18 12:40
+
+from collections import defaultdict
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+search_index = import_module("planets.migrations.0014_planet_name_search")
+
+
+def fill_names(apps, schema_editor):
+    Planet = apps.get_model("planets", "Planet")
+    for relation, column, target in (
+        ("terrains", "terrain_names", "terrain"),
+        ("climates", "climate_names", "climate"),
+    ):
+        related = defaultdict(list)
+        rows = getattr(Planet, relation).through.objects.order_by(f"{target}_id").values_list(
+            "planet_id", f"{target}_id", f"{target}__name"
+        )
+        for planet_id, related_id, related_name in rows.iterator(chunk_size=10000):
+            related[planet_id].append({"id": related_id, "name": related_name})
+        Planet.objects.bulk_update(
+            [Planet(pk=pk, **{column: names}) for pk, names in related.items()],
+            [column],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0015_climatestats_terrainstats'),
+    ]
+
+    # Adding or removing the columns rebuilds planets_planet on SQLite, and
+    # drops the triggers of the search index with it.
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, search_index.restore_sqlite_search_index),
+        migrations.AddField(
+            model_name='planet',
+            name='climate_names',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='planet',
+            name='terrain_names',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.RunPython(fill_names, migrations.RunPython.noop),
+        migrations.RunPython(search_index.restore_sqlite_search_index, migrations.RunPython.noop),
+    ]
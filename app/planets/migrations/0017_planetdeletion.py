@@ -0,0 +1,29 @@
+# Generated by Django 4.1.7 on 2026-10-18 13:20
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def record_migration(apps, schema_editor):
+    # Planets may have been deleted before, when the time was kept in the
+    # cache, so the list is assumed to have changed now.
+    PlanetDeletion = apps.get_model("planets", "PlanetDeletion")
+    PlanetDeletion.objects.create(pk=1, deleted_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planets', '0016_planet_climate_names_planet_terrain_names'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanetDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(record_migration, migrations.RunPython.noop),
+    ]
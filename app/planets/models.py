@@ -1,5 +1,9 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class CustomUser(AbstractUser):
@@ -14,27 +18,186 @@ class CustomUser(AbstractUser):
     pass
 
 
+class PlanetQuerySet(models.QuerySet):
+    def touch(self):
+        """
+        Mark the planets as changed without loading them.
+
+        Bumps the version and the modification time of every planet in the
+        queryset, for changes that do not go through Planet.save(), such as
+        changes to their terrains and climates. Their fingerprints no longer
+        describe them, so they are cleared.
+
+        Returns:
+            int: The number of planets touched.
+        """
+        return self.update(
+            version=models.F("version") + 1, updated_at=timezone.now(), fingerprint="",
+        )
+
+    def delete(self):
+        """
+        Delete the planets, and uncount them from the terrain and climate stats.
+        """
+        from . import stats
+
+        with transaction.atomic(using=self.db):
+            stats.planets_removed(self.values("id"))
+            return super().delete()
+
+    def upsert(self, planets, fields):
+        """
+        Insert or update planets by name, with a fixed number of queries.
+
+        The planets that exist are updated with their version bumped and their
+        population counted in the stats, the others are inserted. When a
+        planet is inserted concurrently by someone else in the meantime, the
+        insert is rolled back and retried with that planet updated instead,
+        so it is neither duplicated nor overwritten without a new version.
+
+        Args:
+            planets (list): Unsaved planets, with the values to write.
+            fields (list): The fields to write besides the name.
+
+        Returns:
+            tuple: The lists of planets inserted and updated. Inserted planets
+            only have a primary key on databases returning it from bulk inserts.
+
+        Raises:
+            IntegrityError: If the insert fails for another reason than a name
+                taken in the meantime.
+        """
+        from . import stats
+
+        for planet in planets:
+            planet.fingerprint = ""
+        names = [planet.name for planet in planets]
+        while True:
+            existing = dict(self.filter(name__in=names).values_list("name", "id"))
+            new = [planet for planet in planets if planet.name not in existing]
+            try:
+                with transaction.atomic(using=self.db):
+                    self.bulk_create(new)
+                break
+            except IntegrityError:
+                if not self.filter(name__in=[planet.name for planet in new]).exists():
+                    raise
+
+        now = timezone.now()
+        changed = [planet for planet in planets if planet.name in existing]
+        for planet in changed:
+            planet.pk = existing[planet.name]
+            planet.version = models.F("version") + 1
+            planet.updated_at = now
+        pending = {}
+        if "population" in fields:
+            pending = stats.population_deltas({planet.pk: planet.population for planet in changed})
+        self.bulk_update(changed, [*fields, "version", "updated_at", "fingerprint"])
+        stats.apply_all(pending)
+        return new, changed
+
+
 class Planet(models.Model):
     """
     Represents a planet in the solar system.
+
+    `version` grows by one every time the planet or its links to terrains and
+    climates change, and `updated_at` records when that happened. Together they
+    identify a representation of the planet for conditional requests.
+
+    `fingerprint` is the hash of the upstream record the planet was last synced
+    from by the incremental populate. Any other write clears it, so the next
+    sync rewrites the planet.
+
+    Planets are identified by their name, which is unique.
+
+    `terrain_names` and `climate_names` copy the {"id", "name"} objects of the
+    planet's terrains and climates, ordered by id, so planets can be read
+    without joining the through tables. They are rewritten from the links by
+    `planets.denorm.refresh()` whenever the links or the names change, and
+    never by `save()`.
     """
 
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, unique=True)
     population = models.BigIntegerField(null=True)
     terrains = models.ManyToManyField("Terrain", related_name="planets")
     climates = models.ManyToManyField("Climate", related_name="planets")
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveBigIntegerField(default=1)
+    fingerprint = models.CharField(max_length=64, blank=True, default="", editable=False)
+    terrain_names = models.JSONField(default=list, editable=False)
+    climate_names = models.JSONField(default=list, editable=False)
+
+    # The columns derived from the links, which only planets.denorm writes.
+    denormalized_fields = ("terrain_names", "climate_names")
+
+    objects = PlanetQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["population"], name="planets_population_idx")]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Save the planet, bumping its version when it already exists.
+
+        The version is incremented in the database, so concurrent saves never
+        end up with the same version. The fingerprint is cleared, and a new
+        population is counted in the stats of the planet's terrains and climates.
+        The denormalized columns are left out of updates, since the instance may
+        hold stale copies of them.
+        """
+        from . import stats
+
+        bump = not self._state.adding
+        self.fingerprint = ""
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic(using=kwargs.get("using")):
+            pending = {}
+            if bump:
+                self.version = models.F("version") + 1
+                if update_fields is None:
+                    kwargs["update_fields"] = [
+                        field.name for field in self._meta.concrete_fields
+                        if not field.primary_key and field.name not in self.denormalized_fields
+                    ]
+                else:
+                    kwargs["update_fields"] = {*update_fields, "version", "updated_at", "fingerprint"}
+                if update_fields is None or "population" in update_fields:
+                    pending = stats.population_deltas({self.pk: self.population})
+            super().save(*args, **kwargs)
+            stats.apply_all(pending)
+        if bump:
+            self.refresh_from_db(fields=["version"])
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the planet, and uncount it from the terrain and climate stats.
+        """
+        from . import stats
+
+        with transaction.atomic(using=kwargs.get("using")):
+            stats.planets_removed([self.pk])
+            return super().delete(*args, **kwargs)
+
 
 class Terrain(models.Model):
     """
     Represents a type of terrain on a planet.
+
+    Names are unique regardless of their case.
     """
 
     name = models.CharField(max_length=255)
 
+    class Meta:
+        ordering = ("id",)
+        constraints = [
+            models.UniqueConstraint(Lower("name"), name="planets_terrain_name_ci_unique"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -42,9 +205,75 @@ class Terrain(models.Model):
 class Climate(models.Model):
     """
     Represents a climate type.
+
+    Names are unique regardless of their case.
     """
 
     name = models.CharField(max_length=255)
 
+    class Meta:
+        ordering = ("id",)
+        constraints = [
+            models.UniqueConstraint(Lower("name"), name="planets_climate_name_ci_unique"),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class PlanetDeletion(models.Model):
+    """
+    When a planet was last deleted, in a single row.
+
+    Deleting a planet does not move the latest `updated_at` of the remaining
+    ones, so the list reads this time to move its Last-Modified date. It is
+    kept in the database, where every process sees it, and written in the
+    transaction of the deletion.
+
+    Attributes:
+        deleted_at (datetime): The time of the last deletion.
+    """
+
+    deleted_at = models.DateTimeField()
+
+
+class AttributeStats(models.Model):
+    """
+    Precomputed population statistics of the planets linked to a terrain or climate.
+
+    Rows are kept up to date with deltas as planets, their populations and
+    their links change, and rebuilt from scratch by the `rebuild_stats`
+    command.
+
+    Attributes:
+        planet_count (int): The number of planets linked.
+        populated_count (int): The number of those planets whose population is known.
+        population_total (int): The sum of their populations.
+    """
+
+    planet_count = models.BigIntegerField(default=0)
+    populated_count = models.BigIntegerField(default=0)
+    population_total = models.BigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class TerrainStats(AttributeStats):
+    """
+    Precomputed population statistics of a terrain.
+    """
+
+    terrain = models.OneToOneField(
+        Terrain, on_delete=models.CASCADE, primary_key=True, related_name="stats",
+    )
+
+
+class ClimateStats(AttributeStats):
+    """
+    Precomputed population statistics of a climate.
+    """
+
+    climate = models.OneToOneField(
+        Climate, on_delete=models.CASCADE, primary_key=True, related_name="stats",
+    )
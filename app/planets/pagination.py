@@ -0,0 +1,150 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.pagination import _reverse_ordering
+
+
+class PlanetCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the planets list.
+
+    Pages are addressed with an opaque cursor holding the position of the last
+    row seen, so every page is fetched with `WHERE <column> > <position>` on an
+    indexed column and deep pages cost the same as the first one.
+
+    `paginate_queryset()` is CursorPagination's, split around the query so
+    that `apaginate_queryset()` can fetch the page with the async ORM.
+
+    Attributes:
+        ordering (str): The default ordering of the pages.
+        ordering_query_param (str): The query parameter clients use to choose the ordering.
+        ordering_fields (tuple): The indexed columns clients may order by.
+            Rows are also ordered by id, so that rows sharing a value come in
+            the same order on every page and the offset CursorPagination keeps
+            for them in the cursor always points to the same row.
+    """
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "id"
+    ordering_query_param = "ordering"
+    ordering_fields = ("id", "name")
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering requested by the client, or the default one.
+
+        Args:
+            request: The HTTP request object.
+            queryset: The queryset being paginated.
+            view: The view paginating the queryset.
+
+        Returns:
+            tuple: The ordering, followed by id in the same direction, such as
+            ("-name", "-id"), or ("id",).
+        """
+        ordering = request.query_params.get(self.ordering_query_param)
+        if not ordering or ordering.lstrip("-") not in self.ordering_fields:
+            ordering = self.ordering
+        if ordering.lstrip("-") == "id":
+            return (ordering,)
+        return (ordering, "-id" if ordering.startswith("-") else "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Fetch the page of rows the cursor of the request points to.
+        """
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.paginate_results(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Asynchronous version of `paginate_queryset()`.
+        """
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.paginate_results([row async for row in queryset.aiterator()])
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        Decode the cursor and build the query of the page.
+
+        Args:
+            queryset (QuerySet): The rows to paginate.
+            request: The HTTP request object.
+            view: The view paginating the queryset.
+
+        Returns:
+            QuerySet: The rows of the page and the first row of the next one,
+            or None if pagination is disabled.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith("-")
+            order_attr = order.lstrip("-")
+            if self.cursor.reverse != is_reversed:
+                queryset = queryset.filter(**{order_attr + "__lt": current_position})
+            else:
+                queryset = queryset.filter(**{order_attr + "__gt": current_position})
+
+        self.offset, self.reverse, self.current_position = offset, reverse, current_position
+        return queryset[offset:offset + self.page_size + 1]
+
+    def paginate_results(self, results):
+        """
+        Keep the rows of the page and work out the positions of the page links.
+
+        Args:
+            results (list): The rows fetched with the query of `page_queryset()`.
+
+        Returns:
+            list: The rows of the page.
+        """
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (self.current_position is not None) or (self.offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = self.current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (self.current_position is not None) or (self.offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = self.current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
@@ -0,0 +1,25 @@
+from drf_project.renderers import FastJSONRenderer
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """
+    Renderer which serializes to newline delimited JSON.
+
+    A list is rendered as one JSON document per line and anything else as a
+    single line, each item encoded exactly like the FastJSONRenderer encodes it.
+    """
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into newline delimited JSON, returning a bytestring.
+        """
+        if data is None:
+            return b""
+        if not isinstance(data, list):
+            data = [data]
+        render = super().render
+        return b"".join(
+            render(item, accepted_media_type, renderer_context) + b"\n" for item in data
+        )
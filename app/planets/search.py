@@ -0,0 +1,163 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models import Case
+from django.db.models import IntegerField
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.expressions import RawSQL
+
+from .models import Planet
+
+
+# The full-text index of planet names on SQLite, kept in sync by triggers
+# (see migration 0014). PostgreSQL uses a trigram index on the name instead.
+FTS_TABLE = "planets_planet_fts"
+
+# Short searches match a large share of the planets, and ranking all of them
+# is what makes type-ahead slow. Only the first CANDIDATES matches found in
+# the index are ranked, which only loses precision when so many planets match
+# that the user has to keep typing anyway.
+CANDIDATES = 1000
+
+
+def like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fts_query(query):
+    """
+    Turn what a user typed into an FTS5 query.
+
+    Every word must match the start of a word of the name, so that the name
+    is found while it is being typed.
+
+    Args:
+        query (str): The text typed by the user.
+
+    Returns:
+        str: The FTS5 query, or an empty string if there is no word to search.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def search_sqlite(query, limit):
+    match = fts_query(query)
+    if not match:
+        return []
+    prefix = like_escape(query) + "%"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT planet.id, planet.name, planet.population, -candidate.rank
+            FROM (
+                SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s
+            ) candidate
+            JOIN planets_planet planet ON planet.id = candidate.rowid
+            ORDER BY planet.name LIKE %s ESCAPE '\\' DESC, candidate.rank, planet.name
+            LIMIT %s
+            """,
+            [match, CANDIDATES, prefix, limit],
+        )
+        return [
+            {"id": pk, "name": name, "population": population, "score": score}
+            for pk, name, population, score in cursor.fetchall()
+        ]
+
+
+def search_postgresql(query, limit):
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    # Written as ILIKE and %, which the trigram index on the name answers,
+    # whereas Django's icontains compares UPPER(name).
+    matches = RawSQL(
+        '"planets_planet"."name" ILIKE %s OR "planets_planet"."name" %% %s',
+        [f"%{like_escape(query)}%", query],
+        output_field=BooleanField(),
+    )
+    candidates = Planet.objects.filter(matches).values("id")[:CANDIDATES]
+    planets = (
+        Planet.objects.filter(id__in=candidates)
+        .annotate(
+            score=TrigramSimilarity("name", query),
+            prefix=Case(
+                When(name__istartswith=query, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by("-prefix", "-score", "name")
+    )
+    return list(planets.values("id", "name", "population", "score")[:limit])
+
+
+def search_other(query, limit):
+    planets = Planet.objects.filter(name__icontains=query).order_by("name")
+    return [
+        {**planet, "score": None}
+        for planet in planets.values("id", "name", "population")[:limit]
+    ]
+
+
+def filter_planets(queryset, query):
+    """
+    Keep the planets whose name matches a search, without ranking them.
+
+    Names are matched with the same indexes as `search_planets()`: words
+    starting the words of the name in the FTS5 index on SQLite, and names
+    containing the search in the trigram index on PostgreSQL. Other
+    databases fall back to a slow substring search.
+
+    Args:
+        queryset (QuerySet): The planets to filter.
+        query (str): The search.
+
+    Returns:
+        QuerySet: The matching planets, or none if there is no word to search.
+    """
+    query = query.strip()
+    if connection.vendor == "sqlite":
+        match = fts_query(query)
+        if not match:
+            return queryset.none()
+        rowids = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        return queryset.filter(id__in=rowids)
+    if not query:
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        matches = RawSQL(
+            '"planets_planet"."name" ILIKE %s', [f"%{like_escape(query)}%"], output_field=BooleanField()
+        )
+        return queryset.filter(matches)
+    return queryset.filter(name__icontains=query)
+
+
+def search_planets(query, limit=10):
+    """
+    Find the planets whose name matches a search, best matches first.
+
+    Names starting with the search come first. Only the first CANDIDATES
+    matches are ranked. On SQLite, the words of the
+    search are matched against the start of the words of the names in an FTS5
+    index, and ranked with BM25. On PostgreSQL, names containing the search or
+    similar to it are found with a trigram index, and ranked by similarity.
+    Other databases fall back to a slow substring search.
+
+    Args:
+        query (str): The search, typically what a user is typing.
+        limit (int, optional): The maximum number of planets returned. Defaults to 10.
+
+    Returns:
+        list: The `id`, `name`, `population` and `score` of the matching planets.
+        The higher the score, the better the match.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    if connection.vendor == "sqlite":
+        return search_sqlite(query, limit)
+    if connection.vendor == "postgresql":
+        return search_postgresql(query, limit)
+    return search_other(query, limit)
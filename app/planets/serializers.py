@@ -1,5 +1,9 @@
+from django.db.models import QuerySet
 from rest_framework import serializers
 
+from drf_project.timing import timed
+
+from . import denorm
 from .models import Climate
 from .models import Planet
 from .models import Terrain
@@ -45,6 +49,10 @@ class PlanetSerializer(serializers.ModelSerializer):
 
     Serializes the Planet model fields and related terrains and climates.
 
+    The name is not checked for uniqueness here: creating a planet with a
+    taken name updates it instead, and the views turn the conflicts of
+    updates into errors.
+
     Attributes:
         terrains (TerrainSerializer): Serializer for the related terrains.
         climates (ClimateSerializer): Serializer for the related climates.
@@ -61,3 +69,171 @@ class PlanetSerializer(serializers.ModelSerializer):
         model = Planet
         fields = ("id", "name", "population", "terrains", "climates")
         read_only_fields = ("id",)
+        extra_kwargs = {"name": {"validators": []}}
+
+    def to_representation(self, instance):
+        """
+        Serialize a planet, timed as the "serialize" phase of the request.
+        """
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+
+class RelatedNameField(serializers.CharField):
+    """
+    Name of a terrain or climate, given as a string or, as exported, as an object with a `name`.
+    """
+
+    def run_validation(self, data=serializers.empty):
+        if isinstance(data, dict):
+            data = data.get("name")
+        return super().run_validation(data)
+
+
+class PlanetImportSerializer(PlanetSerializer):
+    """
+    Serializer validating the planets of an import.
+
+    The name and population follow the rules of PlanetSerializer, and the
+    terrains and climates are lists of names, created when missing, instead
+    of read-only nested objects. Valid data is written by PlanetLoader.
+
+    Attributes:
+        terrains (ListField): The names of the terrains of the planet.
+        climates (ListField): The names of the climates of the planet.
+    """
+    terrains = serializers.ListField(
+        child=RelatedNameField(max_length=Terrain._meta.get_field("name").max_length), required=False
+    )
+    climates = serializers.ListField(
+        child=RelatedNameField(max_length=Climate._meta.get_field("name").max_length), required=False
+    )
+
+
+class PlanetReadSerializer:
+    """
+    Read-only serializer for planets that skips model instances altogether.
+
+    It produces the same representation as PlanetSerializer, but builds it from
+    `values()` rows of planets, taking the terrains and climates from the
+    denormalized columns of the rows, so a page of planets is a single-table
+    read. With `joined` set, the columns are ignored and the terrains and
+    climates are read with one `values_list()` query per relation on the
+    through tables instead. Writes still go through PlanetSerializer.
+
+    Clients may ask for a subset of the representation (see `parse_fields`):
+    the rows then only need the `columns()` of those fields, and relations
+    left out are neither read nor queried.
+
+    Attributes:
+        fields (tuple): The planet columns read for each row.
+        relations (dict): The many-to-many fields rendered as nested lists, and
+            their denormalized columns.
+
+    Example:
+        planets = Planet.objects.values(*PlanetReadSerializer.fields)
+        PlanetReadSerializer(planets, many=True).data
+    """
+    fields = ("id", "name", "population", *denorm.COLUMNS.values())
+    relations = denorm.COLUMNS
+
+    def __init__(self, instance, many=False, joined=False, fields=None):
+        self.instance = instance
+        self.many = many
+        self.joined = joined
+        self.requested = self.representation() if fields is None else fields
+
+    @classmethod
+    def representation(cls):
+        """
+        List the fields of the representation, in their order.
+
+        Returns:
+            tuple: The field names.
+        """
+        return (*(field for field in cls.fields if field not in cls.relations.values()), *cls.relations)
+
+    @classmethod
+    def columns(cls, fields=None):
+        """
+        List the planet columns the rows need to serialize some fields.
+
+        The primary key is always read, as chunked reads and the joined mode
+        look planets up by it.
+
+        Args:
+            fields (iterable, optional): The requested fields. Defaults to all of them.
+
+        Returns:
+            tuple: The column names, for `values()`.
+        """
+        fields = cls.representation() if fields is None else fields
+        columns = {"id": None}
+        for field in fields:
+            columns[cls.relations.get(field, field)] = None
+        return tuple(columns)
+
+    @classmethod
+    def parse_fields(cls, query_params):
+        """
+        Read the fields a client asked for, from `?fields=` and `?expand=`.
+
+        `?fields=id,name` keeps only the listed fields, and `?expand=terrains`
+        adds the listed relations to them. Without `?fields=`, every field is
+        returned.
+
+        Args:
+            query_params (QueryDict): The query parameters of the request.
+
+        Returns:
+            tuple: The requested fields in representation order, or None for all of them.
+
+        Raises:
+            ValidationError: If a field or a relation is unknown, or no field is asked for.
+        """
+        def split(param, allowed):
+            names = [name.strip() for name in query_params.get(param, "").split(",") if name.strip()]
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                raise serializers.ValidationError({param: [f"Unknown fields: {', '.join(unknown)}."]})
+            return set(names)
+
+        fields = split("fields", cls.representation())
+        expand = split("expand", cls.relations)
+        if "fields" not in query_params:
+            return None
+        if not fields | expand:
+            raise serializers.ValidationError({"fields": ["Expected at least one field."]})
+        return tuple(field for field in cls.representation() if field in fields | expand)
+
+    @property
+    def data(self):
+        """
+        Serialize the planets.
+
+        Returns:
+            list or dict: A list of planet representations when `many` is set,
+            a single representation otherwise.
+        """
+        columns = [field for field in self.requested if field not in self.relations]
+        relations = {name: column for name, column in self.relations.items() if name in self.requested}
+        rows = self.instance
+        if isinstance(rows, QuerySet):
+            rows = rows.values(*self.columns(columns if self.joined else self.requested))
+        # Rows are read before the serialize phase starts, so that their
+        # queries are only counted in the database time of the request.
+        rows = list(rows) if self.many else [rows]
+        if self.joined:
+            planet_ids = [row["id"] for row in rows]
+            for name, column in relations.items():
+                related = denorm.compute(name, planet_ids)
+                rows = [{**row, column: related.get(row["id"], [])} for row in rows]
+        with timed("serialize"):
+            data = [
+                {
+                    **{field: row[field] for field in columns},
+                    **{name: row[column] for name, column in relations.items()},
+                }
+                for row in rows
+            ]
+        return data if self.many else data[0]
@@ -0,0 +1,164 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
+from django.dispatch import Signal
+from django.dispatch import receiver
+
+from . import cache
+from . import conditional
+from . import denorm
+from . import stats
+from .models import Climate
+from .models import Planet
+from .models import Terrain
+
+
+# Sent by the code writing planets in bulk (bulk_create, bulk_update, raw
+# through table inserts), which bypasses the model signals, with the primary
+# keys of the planets created or changed as `planet_ids`.
+planets_bulk_changed = Signal()
+
+
+def relation_of(sender):
+    """
+    The name of the relation of Planet a terrain or climate model, or a through model, belongs to.
+    """
+    return "terrains" if sender in (Terrain, Planet.terrains.through) else "climates"
+
+
+def invalidate_on_commit(planet_ids):
+    """
+    Invalidate the cached responses of planets once the transaction writing them commits.
+
+    Bumping the versions before the commit would let a concurrent read cache
+    the old rows under the new versions, which would then be served until
+    they expire. Outside a transaction, they are bumped right away.
+
+    Args:
+        planet_ids (iterable): The primary keys of the changed planets.
+    """
+    planet_ids = list(planet_ids)
+    transaction.on_commit(lambda: cache.invalidate_planets(planet_ids))
+
+
+def planets_touched(planet_ids, relations=denorm.COLUMNS):
+    """
+    Bump the version of planets whose terrains or climates changed, rewrite their denormalized names and invalidate their cached responses.
+
+    Args:
+        planet_ids (list): The primary keys of the planets.
+        relations (iterable, optional): The relations that changed. Defaults to all of them.
+    """
+    planet_ids = list(planet_ids)
+    if planet_ids:
+        Planet.objects.filter(pk__in=planet_ids).touch()
+        denorm.refresh(planet_ids, relations)
+    invalidate_on_commit(planet_ids)
+
+
+@receiver(post_save, sender=Planet)
+def planet_saved(sender, instance, **kwargs):
+    """
+    Invalidate the cached responses of a planet that was saved.
+    """
+    invalidate_on_commit([instance.pk])
+
+
+@receiver(post_delete, sender=Planet)
+def planet_deleted(sender, instance, **kwargs):
+    """
+    Invalidate the cached responses of a deleted planet and record when the list last lost a planet.
+    """
+    invalidate_on_commit([instance.pk])
+    conditional.record_deletion()
+
+
+@receiver(post_save, sender=Terrain)
+@receiver(post_save, sender=Climate)
+def attribute_saved(sender, instance, created, **kwargs):
+    """
+    Touch the planets showing a renamed terrain or climate.
+
+    A new terrain or climate is not linked to any planet yet, so nothing is
+    touched when one is created.
+    """
+    if not created:
+        planets_touched(instance.planets.values_list("id", flat=True), [relation_of(sender)])
+
+
+@receiver(pre_delete, sender=Terrain)
+@receiver(pre_delete, sender=Climate)
+def attribute_deleting(sender, instance, **kwargs):
+    """
+    Remember the planets linked to a terrain or climate before the links are deleted.
+    """
+    instance._linked_planet_ids = list(instance.planets.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Terrain)
+@receiver(post_delete, sender=Climate)
+def attribute_deleted(sender, instance, **kwargs):
+    """
+    Touch the planets a deleted terrain or climate was linked to.
+    """
+    planets_touched(getattr(instance, "_linked_planet_ids", []), [relation_of(sender)])
+
+
+@receiver(m2m_changed, sender=Planet.terrains.through)
+@receiver(m2m_changed, sender=Planet.climates.through)
+def planet_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Touch the planets whose terrains or climates changed, and rewrite their denormalized names.
+
+    The signal is sent from either side of the relation: `instance` is a planet
+    when `reverse` is False, and a terrain or climate otherwise, in which case
+    `pk_set` holds planet ids. Clearing from the terrain or climate side does not
+    send `pk_set`, so the linked planets are collected before the clear.
+    """
+    relations = [relation_of(sender)]
+    if action == "pre_clear" and reverse:
+        instance._linked_planet_ids = list(instance.planets.values_list("id", flat=True))
+    elif action == "post_clear" and reverse:
+        planets_touched(getattr(instance, "_linked_planet_ids", []), relations)
+    elif action in ("post_add", "post_remove") and pk_set or action == "post_clear":
+        planets_touched((pk_set or []) if reverse else [instance.pk], relations)
+
+
+@receiver(m2m_changed, sender=Planet.terrains.through)
+@receiver(m2m_changed, sender=Planet.climates.through)
+def planet_links_counted(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Apply the links added or removed to the terrain and climate stats.
+
+    Added links are exactly `pk_set`, but removals may name objects that were
+    not linked, and clears name none, so the links actually removed are read
+    before they are deleted.
+    """
+    relation = relation_of(sender)
+    through, column = stats.through_and_column(relation)
+    own, other = (column, "planet_id") if reverse else ("planet_id", column)
+
+    if action in ("pre_remove", "pre_clear"):
+        links = through.objects.filter(**{own: instance.pk})
+        if action == "pre_remove":
+            links = links.filter(**{f"{other}__in": pk_set})
+        instance._removed_links = list(links.values_list("planet_id", column))
+        return
+    if action == "post_add" and pk_set:
+        links = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+    elif action in ("post_remove", "post_clear"):
+        links = getattr(instance, "_removed_links", [])
+    else:
+        return
+    populations = None if reverse else {instance.pk: instance.population}
+    stats.links_changed(relation, links, 1 if action == "post_add" else -1, populations)
+
+
+@receiver(planets_bulk_changed)
+def planets_bulk_written(sender, planet_ids, **kwargs):
+    """
+    Invalidate the cached responses of planets written in bulk.
+    """
+    invalidate_on_commit(planet_ids)
@@ -0,0 +1,254 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models import When
+
+from .models import Climate
+from .models import ClimateStats
+from .models import Planet
+from .models import Terrain
+from .models import TerrainStats
+
+
+# The summary table of each relation, and the model it summarizes.
+RELATIONS = {
+    "terrains": (TerrainStats, Terrain),
+    "climates": (ClimateStats, Climate),
+}
+FIELDS = ("planet_count", "populated_count", "population_total")
+
+
+def through_and_column(relation):
+    through = getattr(Planet, relation).through
+    return through, f"{getattr(Planet, relation).field.m2m_reverse_field_name()}_id"
+
+
+def planet_delta(population, sign=1):
+    """
+    The change a planet brings to the stats of a terrain or climate it is linked to.
+
+    Args:
+        population (int): The population of the planet, or None if unknown.
+        sign (int, optional): 1 when the planet is linked, -1 when it is unlinked.
+
+    Returns:
+        tuple: The changes of the planet count, populated count and population total.
+    """
+    return sign, sign * (population is not None), sign * (population or 0)
+
+
+def apply(relation, deltas):
+    """
+    Add deltas to the stats of terrains or climates, with two queries.
+
+    Missing stats rows are created first, then every row is updated at once
+    with `F() + CASE`, so concurrent writers add up instead of overwriting
+    each other.
+
+    Args:
+        relation (str): "terrains" or "climates".
+        deltas (dict): The (planet count, populated count, population total)
+            changes by terrain or climate id.
+    """
+    stats_model, _ = RELATIONS[relation]
+    deltas = {pk: delta for pk, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    stats_model.objects.bulk_create([stats_model(pk=pk) for pk in deltas], ignore_conflicts=True)
+    updates = {}
+    for index, field in enumerate(FIELDS):
+        cases = [When(pk=pk, then=Value(delta[index])) for pk, delta in deltas.items() if delta[index]]
+        if cases:
+            updates[field] = F(field) + Case(*cases, default=Value(0))
+    stats_model.objects.filter(pk__in=deltas).update(**updates)
+
+
+def links_changed(relation, links, sign, populations=None):
+    """
+    Count links added to or removed from the through table.
+
+    Args:
+        relation (str): "terrains" or "climates".
+        links (iterable): The (planet id, terrain or climate id) pairs.
+        sign (int): 1 for added links, -1 for removed ones.
+        populations (dict, optional): The population of each planet. Read
+            from the database when not given.
+    """
+    links = list(links)
+    if not links:
+        return
+    if populations is None:
+        populations = dict(
+            Planet.objects.filter(pk__in={planet_id for planet_id, _ in links})
+            .values_list("id", "population")
+        )
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for planet_id, target_id in links:
+        for index, value in enumerate(planet_delta(populations.get(planet_id), sign)):
+            deltas[target_id][index] += value
+    apply(relation, deltas)
+
+
+def population_deltas(populations):
+    """
+    Compute how changing the population of planets changes the stats.
+
+    Must be called before the new populations are written, since the old
+    ones are read from the database.
+
+    Args:
+        populations (dict): The new population of each planet.
+
+    Returns:
+        dict: The deltas of each relation, for `apply_all()`.
+    """
+    pending = {}
+    if not populations:
+        return pending
+    for relation in RELATIONS:
+        through, column = through_and_column(relation)
+        deltas = defaultdict(lambda: [0, 0, 0])
+        rows = through.objects.filter(planet_id__in=populations).values_list(
+            "planet_id", column, "planet__population"
+        )
+        for planet_id, target_id, old in rows:
+            new = populations[planet_id]
+            if new != old:
+                delta = deltas[target_id]
+                delta[1] += (new is not None) - (old is not None)
+                delta[2] += (new or 0) - (old or 0)
+        pending[relation] = deltas
+    return pending
+
+
+def apply_all(pending):
+    """
+    Apply the deltas computed by `population_deltas()`.
+
+    Args:
+        pending (dict): The deltas of each relation.
+    """
+    for relation, deltas in pending.items():
+        apply(relation, deltas)
+
+
+def planets_removed(planet_ids):
+    """
+    Uncount planets about to be deleted, along with their links.
+
+    Args:
+        planet_ids: The ids of the planets, as a list or a subquery.
+    """
+    for relation in RELATIONS:
+        through, column = through_and_column(relation)
+        rows = (
+            through.objects.filter(planet_id__in=planet_ids)
+            .values(column)
+            .annotate(
+                planets=Count("id"),
+                populated=Count("planet__population"),
+                population=Sum("planet__population"),
+            )
+        )
+        apply(relation, {
+            row[column]: [-row["planets"], -row["populated"], -(row["population"] or 0)]
+            for row in rows
+        })
+
+
+def compute(relation):
+    """
+    Compute the stats of every terrain or climate from scratch.
+
+    Args:
+        relation (str): "terrains" or "climates".
+
+    Returns:
+        dict: The (planet count, populated count, population total) of each
+        terrain or climate linked to planets, by id.
+    """
+    through, column = through_and_column(relation)
+    rows = through.objects.values(column).annotate(
+        planets=Count("id"),
+        populated=Count("planet__population"),
+        population=Sum("planet__population"),
+    )
+    return {
+        row[column]: (row["planets"], row["populated"], row["population"] or 0)
+        for row in rows
+    }
+
+
+def drift():
+    """
+    Compare the stored stats with stats computed from scratch.
+
+    Returns:
+        list: A (relation, terrain or climate id, stored, expected) tuple for
+        each row that drifted, stored and expected being (planet count,
+        populated count, population total) tuples.
+    """
+    drifted = []
+    for relation, (stats_model, _) in RELATIONS.items():
+        expected = compute(relation)
+        stored = {
+            row[0]: tuple(row[1:])
+            for row in stats_model.objects.values_list("pk", *FIELDS)
+        }
+        for pk in sorted(expected.keys() | stored.keys()):
+            zero = (0, 0, 0)
+            if stored.get(pk, zero) != expected.get(pk, zero):
+                drifted.append((relation, pk, stored.get(pk, zero), expected.get(pk, zero)))
+    return drifted
+
+
+def rebuild():
+    """
+    Replace the stored stats with stats computed from scratch.
+
+    Returns:
+        int: The number of stats rows written.
+    """
+    written = 0
+    with transaction.atomic():
+        for relation, (stats_model, _) in RELATIONS.items():
+            rows = [
+                stats_model(pk=pk, **dict(zip(FIELDS, values)))
+                for pk, values in compute(relation).items()
+            ]
+            stats_model.objects.all().delete()
+            stats_model.objects.bulk_create(rows, batch_size=1000)
+            written += len(rows)
+    return written
+
+
+def summary():
+    """
+    Read the stats of every terrain and climate, with one query each.
+
+    Returns:
+        dict: The list of the stats of the terrains and of the climates,
+        sorted by name, with their planet count, total population and
+        average population (over the planets whose population is known).
+    """
+    result = {}
+    for relation, (_, model) in RELATIONS.items():
+        rows = model.objects.order_by("name", "id").values_list(
+            "id", "name", *(f"stats__{field}" for field in FIELDS)
+        )
+        result[relation] = [
+            {
+                "id": pk,
+                "name": name,
+                "planets": planets or 0,
+                "population": population or 0,
+                "average_population": population / populated if populated else None,
+            }
+            for pk, name, planets, populated, population in rows
+        ]
+    return result
@@ -0,0 +1,148 @@
+import csv
+import io
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from drf_project.renderers import FastJSONRenderer
+
+from .renderers import NDJSONRenderer
+from .serializers import PlanetReadSerializer
+
+
+def iter_planet_chunks(queryset, chunk_size):
+    """
+    Iterate over a queryset of planet rows in chunks ordered by primary key.
+
+    Each chunk is fetched with `WHERE id > <last id> ORDER BY id LIMIT <chunk_size>`,
+    so only one chunk is held in memory at a time and the relations of its
+    planets can be loaded chunk by chunk.
+
+    Args:
+        queryset (QuerySet): The planets to iterate over, as `values()` rows.
+        chunk_size (int): The number of planets per chunk.
+
+    Yields:
+        list: The planets of the next chunk.
+    """
+    queryset = queryset.order_by("id")
+    last_id = None
+    while True:
+        chunk_queryset = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]["id"]
+
+
+def iter_cursor_chunks(queryset, chunk_size):
+    """
+    Iterate over a queryset of planet rows in chunks read from a single query.
+
+    Unlike `iter_planet_chunks()`, the rows come from one query read with
+    `iterator()`, through a server-side cursor on PostgreSQL, so every chunk
+    belongs to the same snapshot of the table.
+
+    Args:
+        queryset (QuerySet): The planets to iterate over, as `values()` rows.
+        chunk_size (int): The number of planets per chunk.
+
+    Yields:
+        list: The planets of the next chunk.
+    """
+    rows = queryset.order_by("id").iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def encode_chunks(chunks, stream_format="json", fields=None):
+    """
+    Serialize chunks of planet rows into JSON, NDJSON or CSV.
+
+    In CSV, the first line holds the field names, and the terrains and
+    climates of a planet are written as their names separated by ";".
+
+    Args:
+        chunks (iterable): The chunks of planets, as lists of `values()` rows.
+        stream_format (str, optional): "json" for a JSON array, "ndjson" for one
+            planet per line or "csv". Defaults to "json".
+        fields (tuple, optional): The fields of each planet. Defaults to all of them.
+
+    Yields:
+        bytes: The encoded planets, one chunk at a time.
+    """
+    if stream_format == "ndjson":
+        renderer = NDJSONRenderer()
+        for chunk in chunks:
+            yield renderer.render(PlanetReadSerializer(chunk, many=True, fields=fields).data)
+        return
+
+    if stream_format == "csv":
+        header = fields or PlanetReadSerializer.representation()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for chunk in chunks:
+            for item in PlanetReadSerializer(chunk, many=True, fields=fields).data:
+                writer.writerow([
+                    ";".join(related["name"] for related in item[field])
+                    if field in PlanetReadSerializer.relations else item[field]
+                    for field in header
+                ])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    renderer = FastJSONRenderer()
+    separator = b"["
+    for chunk in chunks:
+        data = PlanetReadSerializer(chunk, many=True, fields=fields).data
+        yield separator + b",".join(renderer.render(item) for item in data)
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
+
+
+def stream_planets(queryset, stream_format="json", chunk_size=None, fields=None):
+    """
+    Serialize planets chunk by chunk into JSON or NDJSON.
+
+    Args:
+        queryset (QuerySet): The planets to serialize, as `values()` rows.
+        stream_format (str, optional): "json" for a JSON array or "ndjson" for one
+            planet per line. Defaults to "json".
+        chunk_size (int, optional): The number of planets per chunk. Defaults to
+            the PLANETS_STREAM_CHUNK_SIZE setting.
+        fields (tuple, optional): The fields of each planet. Defaults to all of them.
+
+    Yields:
+        bytes: The encoded planets, one chunk at a time.
+    """
+    chunk_size = chunk_size or settings.PLANETS_STREAM_CHUNK_SIZE
+    yield from encode_chunks(iter_planet_chunks(queryset, chunk_size), stream_format, fields)
+
+
+def planets_streaming_response(queryset, stream_format="json", chunk_size=None, fields=None):
+    """
+    Build a streaming response that serializes the planets while it is sent.
+
+    Args:
+        queryset (QuerySet): The planets to send.
+        stream_format (str, optional): "json" or "ndjson". Defaults to "json".
+        chunk_size (int, optional): The number of planets per chunk.
+        fields (tuple, optional): The fields of each planet. Defaults to all of them.
+
+    Returns:
+        StreamingHttpResponse: The streaming response.
+    """
+    content_type = NDJSONRenderer.media_type if stream_format == "ndjson" else FastJSONRenderer.media_type
+    return StreamingHttpResponse(
+        stream_planets(queryset, stream_format, chunk_size, fields),
+        content_type=content_type,
+    )
@@ -1,10 +1,43 @@
+from django.conf import settings
 from django.urls import path
 
+from drf_project.async_views import AsyncAPIView
+
+from .views import PlanetBulk
+from .views import PlanetCacheStats
 from .views import PlanetDetail
+from .views import PlanetImport
 from .views import PlanetList
+from .views import PlanetSearch
+from .views import PlanetStats
+
+
+def planet_patterns(asynchronous=False):
+    """
+    Build the URL patterns of the planets API.
+
+    Args:
+        asynchronous (bool, optional): Whether the list and detail reads are
+            served by async views. Defaults to False.
+
+    Returns:
+        list: The URL patterns.
+    """
+    if asynchronous:
+        list_view = AsyncAPIView.as_view(api_view=PlanetList)
+        detail_view = AsyncAPIView.as_view(api_view=PlanetDetail)
+    else:
+        list_view = PlanetList.as_view()
+        detail_view = PlanetDetail.as_view()
+    return [
+        path("api/planets/", list_view),
+        path("api/planets/<int:pk>/", detail_view),
+        path("api/planets/bulk/", PlanetBulk.as_view()),
+        path("api/planets/cache/", PlanetCacheStats.as_view()),
+        path("api/planets/import/", PlanetImport.as_view()),
+        path("api/planets/search/", PlanetSearch.as_view()),
+        path("api/planets/stats/", PlanetStats.as_view()),
+    ]
 
 
-urlpatterns = [
-    path("api/planets/", PlanetList.as_view()),
-    path("api/planets/<int:pk>/", PlanetDetail.as_view()),
-]
+urlpatterns = planet_patterns(settings.PLANETS_ASYNC_VIEWS)
@@ -1,54 +1,256 @@
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import F
 from django.http import Http404
+from django.utils import timezone
+from rest_framework.exceptions import UnsupportedMediaType
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.settings import api_settings
 
+from drf_project.query_budget import query_budget
+
+from . import cache
+from . import conditional
+from . import stats
+from .filters import PlanetFilterBackend
+from .loaders import PlanetLoader
+from .loaders import batched
+from .loaders import parse_ndjson
 from .models import Planet
+from .pagination import PlanetCursorPagination
+from .renderers import NDJSONRenderer
+from .search import search_planets
+from .serializers import PlanetImportSerializer
+from .serializers import PlanetReadSerializer
 from .serializers import PlanetSerializer
+from .signals import planets_bulk_changed
+from .streaming import planets_streaming_response
+
+
+NAME_TAKEN = {"name": ["planet with this name already exists."]}
 
 
 class PlanetList(APIView):
+    filter_backends = [PlanetFilterBackend]
+    pagination_class = PlanetCursorPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    requested_fields = None
+
+    def get_queryset(self):
+        """
+        Build the queryset used to list the planets.
+
+        Planets are read as `values()` rows for the PlanetReadSerializer, with
+        only the columns of the fields the client asked for (see
+        PlanetReadSerializer.parse_fields) and the column the pages are
+        ordered by.
+
+        Returns:
+            QuerySet: The planet rows.
+        """
+        columns = PlanetReadSerializer.columns(self.requested_fields)
+        ordering = self.pagination_class().get_ordering(self.request, None, self)[0].lstrip("-")
+        return Planet.objects.values(*dict.fromkeys((*columns, ordering)))
+
+    def filter_queryset(self, queryset):
+        """
+        Filter the planets with the query parameters (see PlanetFilterBackend).
+
+        Args:
+            queryset (QuerySet): The planets to filter.
+
+        Returns:
+            QuerySet: The filtered planets.
+        """
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def is_paginated(self, request):
+        """
+        Tell whether the client wants a paginated response.
+
+        Pagination is on by default. Clients that still expect the whole list
+        as a plain array can opt out with `?paginate=false`.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            bool: False if the client opted out of pagination, True otherwise.
+        """
+        flag = request.query_params.get("paginate", "true")
+        return flag.lower() not in ("0", "false", "no", "off")
+
+    def get_stream_format(self, request):
+        """
+        Tell whether the client wants the whole list streamed, and in which format.
+
+        Clients ask for a stream with `?stream=1` (a JSON array), `?stream=ndjson`,
+        or by accepting `application/x-ndjson`.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            str: "json" or "ndjson" for a streamed response, None otherwise.
+        """
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            return "ndjson"
+        flag = request.query_params.get("stream", "").lower()
+        if flag == "ndjson":
+            return "ndjson"
+        if flag in ("1", "true", "yes", "on", "json"):
+            return "json"
+        return None
+
+    def list(self, request, planets):
+        """
+        Serialize a page of planets, or all of them when pagination is off.
+
+        Args:
+            request: The HTTP request object.
+            planets (QuerySet): The planet rows to list.
+
+        Returns:
+            The response data.
+        """
+        if not self.is_paginated(request):
+            return PlanetReadSerializer(planets, many=True, fields=self.requested_fields).data
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(planets, request, view=self)
+        serializer = PlanetReadSerializer(page, many=True, fields=self.requested_fields)
+        return paginator.get_paginated_response(serializer.data).data
+
+    @query_budget(4)
     def get(self, request, format=None):
             """
-            Retrieve all the planets and return a serialized representation.
+            Retrieve a page of planets and return a serialized representation.
+
+            The response holds the `next` and `previous` page links and the
+            `results`. With `?paginate=false` every planet is returned as a
+            plain array instead, and streaming clients get every planet
+            serialized chunk by chunk (see `get_stream_format`). Planets can
+            be filtered by terrain, climate, population and name (see
+            PlanetFilterBackend), and trimmed to some of their fields with
+            `?fields=` and `?expand=`.
+
+            Other than streams, responses are cached until a planet, terrain
+            or climate changes. The `X-Cache` header tells whether the
+            response came from the cache. They also carry an ETag and a
+            Last-Modified date, and conditional requests for an unchanged list
+            get a 304 (Not Modified) response.
 
             Args:
                 request: The HTTP request object.
                 format: The requested format for the response data (default: None).
 
             Returns:
-                A Response object containing the serialized representation of all the planets.
+                A Response object containing the serialized representation of the planets.
             """
-            planets = Planet.objects.all()
-            serializer = PlanetSerializer(planets, many=True)
-            return Response(serializer.data)
+            self.requested_fields = PlanetReadSerializer.parse_fields(request.query_params)
+            planets = self.filter_queryset(self.get_queryset())
+            stream_format = self.get_stream_format(request)
+            if stream_format:
+                return planets_streaming_response(planets, stream_format, fields=self.requested_fields)
+
+            etag, last_modified = conditional.list_validators(request)
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+            key = cache.list_key(request)
+            data = cache.get_data(key)
+            hit = data is not None
+            if not hit:
+                data = self.list(request, planets)
+                cache.set_data(key, data)
+            response = Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+            return conditional.set_validators(response, etag, last_modified)
+
+    async def alist(self, request, planets):
+        """
+        Asynchronous version of `list()`.
+        """
+        if not self.is_paginated(request):
+            rows = [row async for row in planets.aiterator()]
+            return PlanetReadSerializer(rows, many=True, fields=self.requested_fields).data
+
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(planets, request, view=self)
+        serializer = PlanetReadSerializer(page, many=True, fields=self.requested_fields)
+        return paginator.get_paginated_response(serializer.data).data
+
+    async def aget(self, request, format=None):
+        """
+        Asynchronous version of `get()`, served by drf_project.async_views.AsyncAPIView.
+
+        Streams are left to `get()`.
+
+        Args:
+            request: The HTTP request object.
+            format: The requested format for the response data (default: None).
+
+        Returns:
+            A Response object containing the serialized representation of the
+            planets, or None for streams.
+        """
+        if self.get_stream_format(request):
+            return None
+        self.requested_fields = PlanetReadSerializer.parse_fields(request.query_params)
+        planets = self.filter_queryset(self.get_queryset())
+
+        etag, last_modified = await conditional.alist_validators(request)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        key = await cache.alist_key(request)
+        data = await cache.aget_data(key)
+        hit = data is not None
+        if not hit:
+            data = await self.alist(request, planets)
+            await cache.aset_data(key, data)
+        response = Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+        return conditional.set_validators(response, etag, last_modified)
 
     def post(self, request, format=None):
             """
-            Create a new planet.
+            Create a new planet, or update the planet with the same name.
 
             Parameters:
             - request: The HTTP request object.
             - format: The format of the response data (default: None).
 
             Returns:
-            - If the serializer is valid, returns a response with the serialized planet data and status code 201 (Created).
+            - If the serializer is valid, returns a response with the serialized planet data and status code 201 (Created), or 200 (OK) if a planet with that name existed and was updated.
             - If the serializer is not valid, returns a response with the serializer errors and status code 400 (Bad Request).
             """
             serializer = PlanetSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save()
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+                data = serializer.validated_data
+                planet, created = Planet.objects.update_or_create(name=data["name"], defaults=data)
+                serializer.instance = planet
+                return Response(
+                    serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+                )
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class PlanetDetail(APIView):
-    def get_object(self, pk):
+    def get_object(self, pk, queryset=None):
         """
         Retrieve a planet object by its primary key.
 
         Args:
             pk (int): The primary key of the planet.
+            queryset (QuerySet, optional): The queryset to look the planet up in.
+                Defaults to all the planets.
 
         Returns:
             Planet: The planet object with the specified primary key.
@@ -56,26 +258,84 @@ class PlanetDetail(APIView):
         Raises:
             Http404: If the planet with the specified primary key does not exist.
         """
+        if queryset is None:
+            queryset = Planet.objects.all()
         try:
-            return Planet.objects.get(pk=pk)
+            return queryset.get(pk=pk)
         except Planet.DoesNotExist:
             raise Http404
 
+    @query_budget(4)
     def get(self, request, pk, format=None):
             """
             Retrieve a specific planet by its primary key.
 
+            Like the list, the planet can be trimmed to some of its fields with
+            `?fields=` and `?expand=`.
+
             Args:
                 request (HttpRequest): The HTTP request object.
                 pk (int): The primary key of the planet to retrieve.
                 format (str, optional): The desired format for the response. Defaults to None.
 
             Returns:
-                Response: The serialized data of the retrieved planet.
+                Response: The serialized data of the retrieved planet, or a 304
+                (Not Modified) response if the client already has it.
             """
-            planet = self.get_object(pk)
-            serializer = PlanetSerializer(planet)
-            return Response(serializer.data)
+            fields = PlanetReadSerializer.parse_fields(request.query_params)
+            validators = conditional.detail_validators(request, pk)
+            if validators is None:
+                raise Http404
+            response = conditional.not_modified(request, *validators)
+            if response is not None:
+                return response
+
+            key = cache.detail_key(request, pk)
+            data = cache.get_data(key)
+            hit = data is not None
+            if not hit:
+                planet = self.get_object(pk, Planet.objects.values(*PlanetReadSerializer.columns(fields)))
+                data = PlanetReadSerializer(planet, fields=fields).data
+                cache.set_data(key, data)
+            response = Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+            return conditional.set_validators(response, *validators)
+
+    async def aget(self, request, pk, format=None):
+        """
+        Asynchronous version of `get()`, served by drf_project.async_views.AsyncAPIView.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            pk (int): The primary key of the planet to retrieve.
+            format (str, optional): The desired format for the response. Defaults to None.
+
+        Returns:
+            Response: The serialized data of the retrieved planet, or a 304
+            (Not Modified) response if the client already has it.
+
+        Raises:
+            Http404: If the planet does not exist.
+        """
+        fields = PlanetReadSerializer.parse_fields(request.query_params)
+        validators = await conditional.adetail_validators(request, pk)
+        if validators is None:
+            raise Http404
+        response = conditional.not_modified(request, *validators)
+        if response is not None:
+            return response
+
+        key = await cache.adetail_key(request, pk)
+        data = await cache.aget_data(key)
+        hit = data is not None
+        if not hit:
+            try:
+                planet = await Planet.objects.values(*PlanetReadSerializer.columns(fields)).aget(pk=pk)
+            except Planet.DoesNotExist:
+                raise Http404
+            data = PlanetReadSerializer(planet, fields=fields).data
+            await cache.aset_data(key, data)
+        response = Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+        return conditional.set_validators(response, *validators)
 
     def put(self, request, pk, format=None):
         """
@@ -87,12 +347,17 @@ class PlanetDetail(APIView):
             format (str, optional): The format of the response data. Defaults to None.
 
         Returns:
-            Response: The HTTP response object containing the updated planet data or error messages.
+            Response: The HTTP response object containing the updated planet data or error messages,
+            including when the new name is taken by another planet.
         """
         planet = self.get_object(pk)
         serializer = PlanetSerializer(planet, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                return Response(NAME_TAKEN, status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -111,3 +376,506 @@ class PlanetDetail(APIView):
         planet = self.get_object(pk)
         planet.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PlanetBulk(APIView):
+    def get_items(self, request):
+        """
+        Read the list of items sent in the request body.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            list: The items.
+
+        Raises:
+            ValidationError: If the body is not a list or has more than
+                PLANETS_BULK_MAX_ITEMS items.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"detail": "Expected a list of items."})
+        if len(items) > settings.PLANETS_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {"detail": f"Expected at most {settings.PLANETS_BULK_MAX_ITEMS} items."}
+            )
+        return items
+
+    def is_partial(self, request):
+        """
+        Tell whether the valid items should be written when some items fail.
+
+        By default (`?mode=atomic`) nothing is written unless every item is
+        valid. With `?mode=partial` the valid items are written and the
+        failures are reported.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            bool: True in partial mode, False in atomic mode.
+
+        Raises:
+            ValidationError: If the mode is unknown.
+        """
+        mode = request.query_params.get("mode", "atomic")
+        if mode not in ("atomic", "partial"):
+            raise ValidationError({"detail": "The mode must be 'atomic' or 'partial'."})
+        return mode == "partial"
+
+    def validate(self, items, partial=False):
+        """
+        Validate every item in one pass with PlanetSerializer(many=True).
+
+        Unlike `is_valid()`, the validated data of the valid items is kept
+        when other items fail, which the partial mode needs.
+
+        Args:
+            items (list): The items sent by the client.
+            partial (bool, optional): Whether fields may be missing. Defaults to False.
+
+        Returns:
+            list: A (validated data, errors) tuple for each item, one of them being None.
+        """
+        serializer = PlanetSerializer(data=items, many=True, partial=partial)
+        results = []
+        for item in items:
+            try:
+                results.append((serializer.child.run_validation(item), None))
+            except ValidationError as exc:
+                results.append((None, exc.detail))
+        return results
+
+    def check_names(self, validated):
+        """
+        Report the names repeated in the request as errors.
+
+        Args:
+            validated (list): The (validated data, errors) tuple of each item.
+
+        Returns:
+            list: The tuples, with the repeated names turned into errors.
+        """
+        seen = set()
+        results = []
+        for data, errors in validated:
+            name = (data or {}).get("name")
+            if name is not None and name in seen:
+                results.append((None, {"name": ["This name is repeated."]}))
+            else:
+                seen.add(name)
+                results.append((data, errors))
+        return results
+
+    def get_ids(self, items):
+        """
+        Read the primary key of each item.
+
+        Items may be objects with an `id` or bare primary keys. Missing,
+        invalid and repeated ids are reported as errors.
+
+        Args:
+            items (list): The items sent by the client.
+
+        Returns:
+            list: An (id, errors) tuple for each item, one of them being None.
+        """
+        seen = set()
+        results = []
+        for item in items:
+            pk = item.get("id") if isinstance(item, dict) else item
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                results.append((None, {"id": ["A valid integer is required."]}))
+            elif pk in seen:
+                results.append((None, {"id": ["This id is repeated."]}))
+            else:
+                seen.add(pk)
+                results.append((pk, None))
+        return results
+
+    def respond(self, results, partial, success_status):
+        """
+        Build the response holding one result per item.
+
+        In atomic mode, a single failure means nothing was written, and the
+        valid items are reported with status 424 (Failed Dependency).
+
+        Args:
+            results (list): The result of each item, with its status.
+            partial (bool): Whether the request was in partial mode.
+            success_status (int): The response status when every item succeeded.
+
+        Returns:
+            Response: The response, with status `success_status` when every item
+            succeeded, 207 (Multi-Status) when only some did, and 400 (Bad Request)
+            when none was written.
+        """
+        failed = [result for result in results if result["status"] >= 400]
+        if not failed:
+            return Response({"results": results}, status=success_status)
+        if not partial:
+            for result in results:
+                if result["status"] < 400:
+                    result.clear()
+                    result.update({
+                        "status": status.HTTP_424_FAILED_DEPENDENCY,
+                        "errors": {"detail": "Not written because other items failed."},
+                    })
+            return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+        if len(failed) == len(results):
+            return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": results}, status=status.HTTP_207_MULTI_STATUS)
+
+    def serialize(self, planets, key="id"):
+        """
+        Serialize the written planets with PlanetReadSerializer, in one query.
+
+        Args:
+            planets (QuerySet): The planets to serialize.
+            key (str, optional): The field the planets are keyed by. Defaults to "id".
+
+        Returns:
+            dict: The representation of each planet, by `key`.
+        """
+        rows = planets.values(*PlanetReadSerializer.fields)
+        return {row[key]: row for row in PlanetReadSerializer(rows, many=True).data}
+
+    def post(self, request, format=None):
+        """
+        Create planets in bulk.
+
+        Planets are upserted by name: those whose name exists are updated
+        instead, with status 200 (OK) in their result.
+
+        Args:
+            request (HttpRequest): The HTTP request object, holding a list of planets.
+            format (str, optional): The format of the response data. Defaults to None.
+
+        Returns:
+            Response: The created planet or the errors of each item.
+        """
+        items = self.get_items(request)
+        partial = self.is_partial(request)
+        validated = self.check_names(self.validate(items))
+        valid = [index for index, (_, errors) in enumerate(validated) if errors is None]
+
+        data, created = {}, set()
+        if valid and (partial or len(valid) == len(items)):
+            with transaction.atomic():
+                new, _ = Planet.objects.upsert(
+                    [Planet(**validated[index][0]) for index in valid], ["population"]
+                )
+                names = [validated[index][0]["name"] for index in valid]
+                data = self.serialize(Planet.objects.filter(name__in=names), key="name")
+                planets_bulk_changed.send(
+                    sender=self.__class__, planet_ids=[row["id"] for row in data.values()]
+                )
+            created = {planet.name for planet in new}
+
+        results = []
+        for index, (item, errors) in enumerate(validated):
+            if errors is not None:
+                results.append({"status": status.HTTP_400_BAD_REQUEST, "errors": errors})
+            elif item["name"] in created:
+                results.append({"status": status.HTTP_201_CREATED, "data": data[item["name"]]})
+            elif item["name"] in data:
+                results.append({"status": status.HTTP_200_OK, "data": data[item["name"]]})
+            else:
+                results.append({"status": status.HTTP_201_CREATED})
+        return self.respond(results, partial, status.HTTP_201_CREATED)
+
+    def patch(self, request, format=None):
+        """
+        Update planets in bulk.
+
+        Each item holds the `id` of a planet and the fields to change. Names
+        taken by other planets are reported as errors.
+
+        Args:
+            request (HttpRequest): The HTTP request object, holding a list of partial planets.
+            format (str, optional): The format of the response data. Defaults to None.
+
+        Returns:
+            Response: The updated planet or the errors of each item.
+        """
+        items = self.get_items(request)
+        partial = self.is_partial(request)
+        ids = self.get_ids(items)
+        validated = self.check_names(self.validate(items, partial=True))
+        existing = Planet.objects.in_bulk([pk for pk, errors in ids if errors is None])
+        names = [data["name"] for data, _ in validated if data and "name" in data]
+        owners = dict(Planet.objects.filter(name__in=names).values_list("name", "id"))
+
+        results = []
+        changes = {}
+        for (pk, id_errors), (data, errors) in zip(ids, validated):
+            if id_errors is not None:
+                results.append({"status": status.HTTP_400_BAD_REQUEST, "errors": id_errors})
+            elif pk not in existing:
+                results.append({"status": status.HTTP_404_NOT_FOUND, "errors": {"detail": "Not found."}})
+            elif errors is not None:
+                results.append({"status": status.HTTP_400_BAD_REQUEST, "errors": errors})
+            elif owners.get(data.get("name"), pk) != pk:
+                results.append({"status": status.HTTP_400_BAD_REQUEST, "errors": NAME_TAKEN})
+            else:
+                results.append({"status": status.HTTP_200_OK, "id": pk})
+                changes[pk] = data
+
+        failed = any(result["status"] >= 400 for result in results)
+        if changes and (partial or not failed):
+            now = timezone.now()
+            fields = {"version", "updated_at", "fingerprint"}
+            for pk, data in changes.items():
+                planet = existing[pk]
+                for field, value in data.items():
+                    setattr(planet, field, value)
+                planet.version = F("version") + 1
+                planet.updated_at = now
+                planet.fingerprint = ""
+                fields.update(data)
+            try:
+                with transaction.atomic():
+                    pending = stats.population_deltas({
+                        pk: data["population"] for pk, data in changes.items() if "population" in data
+                    })
+                    Planet.objects.bulk_update([existing[pk] for pk in changes], sorted(fields))
+                    stats.apply_all(pending)
+                    planets_bulk_changed.send(sender=self.__class__, planet_ids=list(changes))
+            except IntegrityError:
+                # Planets swapping their names, or a name taken concurrently.
+                for result in results:
+                    if "id" in result:
+                        result.clear()
+                        result.update({"status": status.HTTP_409_CONFLICT, "errors": NAME_TAKEN})
+                return self.respond(results, partial, status.HTTP_200_OK)
+
+            data = self.serialize(Planet.objects.filter(pk__in=changes))
+            for result in results:
+                if "id" in result:
+                    result["data"] = data[result.pop("id")]
+        return self.respond(results, partial, status.HTTP_200_OK)
+
+    def delete(self, request, format=None):
+        """
+        Delete planets in bulk.
+
+        Args:
+            request (HttpRequest): The HTTP request object, holding a list of ids.
+            format (str, optional): The format of the response data. Defaults to None.
+
+        Returns:
+            Response: The status of each deletion.
+        """
+        items = self.get_items(request)
+        partial = self.is_partial(request)
+        ids = self.get_ids(items)
+        existing = set(
+            Planet.objects.filter(pk__in=[pk for pk, errors in ids if errors is None])
+            .values_list("id", flat=True)
+        )
+
+        results = []
+        for pk, errors in ids:
+            if errors is not None:
+                results.append({"status": status.HTTP_400_BAD_REQUEST, "errors": errors})
+            elif pk not in existing:
+                results.append({"status": status.HTTP_404_NOT_FOUND, "errors": {"detail": "Not found."}})
+            else:
+                results.append({"status": status.HTTP_204_NO_CONTENT, "id": pk})
+
+        failed = any(result["status"] >= 400 for result in results)
+        if existing and (partial or not failed):
+            with transaction.atomic():
+                Planet.objects.filter(pk__in=existing).delete()
+        return self.respond(results, partial, status.HTTP_200_OK)
+
+
+class PlanetImport(APIView):
+    def get_stream(self, request):
+        """
+        Return the request body as a stream read line by line as it arrives.
+
+        Django 4.1 reads a WSGI body without a Content-Length, as sent with
+        chunked transfer encoding, as empty, so the input is read directly
+        when the server says it ends by itself (`wsgi.input_terminated`).
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            The body stream, iterating over lines.
+
+        Raises:
+            UnsupportedMediaType: If the body is not NDJSON.
+        """
+        if request.content_type.split(";")[0].strip() != NDJSONRenderer.media_type:
+            raise UnsupportedMediaType(request.content_type)
+        environ = getattr(request._request, "environ", {})
+        if "CONTENT_LENGTH" not in request.META and environ.get("wsgi.input_terminated"):
+            return environ["wsgi.input"]
+        return request._request
+
+    def get_batch_size(self, request):
+        """
+        Read the number of planets committed per batch, from `?batch_size=`.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            int: The batch size, PLANETS_IMPORT_BATCH_SIZE by default and at
+            most PLANETS_BULK_MAX_ITEMS.
+        """
+        try:
+            batch_size = int(request.query_params.get("batch_size", settings.PLANETS_IMPORT_BATCH_SIZE))
+        except ValueError:
+            batch_size = settings.PLANETS_IMPORT_BATCH_SIZE
+        return min(max(batch_size, 1), settings.PLANETS_BULK_MAX_ITEMS)
+
+    def validate(self, lines, summary):
+        """
+        Validate the planet of each line with PlanetImportSerializer.
+
+        Invalid lines are counted in the summary, and the first
+        PLANETS_IMPORT_MAX_ERRORS of them are listed with their line number.
+
+        Args:
+            lines (iterable): The lines of the body.
+            summary (dict): The summary of the import, updated as lines are read.
+
+        Yields:
+            dict: The validated data of the next valid planet.
+        """
+        serializer = PlanetImportSerializer()
+        for number, item, error in parse_ndjson(lines):
+            summary["lines"] += 1
+            if error is None:
+                try:
+                    yield serializer.run_validation(item)
+                    continue
+                except ValidationError as exc:
+                    errors = exc.detail
+            else:
+                errors = {"detail": f"JSON parse error - {error}"}
+            summary["failed"] += 1
+            if len(summary["errors"]) < settings.PLANETS_IMPORT_MAX_ERRORS:
+                summary["errors"].append({"line": number, "errors": errors})
+
+    def post(self, request, format=None):
+        """
+        Import planets sent as NDJSON, one planet per line.
+
+        The body is read and validated line by line as it arrives, and the
+        valid planets are upserted by name by PlanetLoader, one batch per
+        transaction, so memory use does not depend on the size of the body.
+        Invalid lines are skipped and reported. A planet lists its terrains
+        and climates by name, or as objects with a name, as exported by
+        `export_planets`.
+
+        Args:
+            request (HttpRequest): The HTTP request object, with an `application/x-ndjson` body.
+            format (str, optional): The format of the response data. Defaults to None.
+
+        Returns:
+            Response: The numbers of lines read and planets imported, inserted,
+            updated and unchanged, with the errors of the invalid lines. The
+            status is 200 (OK) when every line was imported, 207 (Multi-Status)
+            when only some were, and 400 (Bad Request) when none was.
+        """
+        stream = self.get_stream(request)
+        loader = PlanetLoader(batch_size=self.get_batch_size(request))
+        summary = {"lines": 0, "imported": 0, "failed": 0, "batches": 0, "errors": []}
+        for batch in batched(self.validate(stream, summary), loader.batch_size):
+            with transaction.atomic():
+                summary["imported"] += loader.load_batch(batch)
+            summary["batches"] += 1
+
+        summary.update({
+            key: loader.stats[key]
+            for key in ("inserted", "updated", "unchanged", "terrains_inserted", "climates_inserted")
+        })
+        summary["errors_truncated"] = summary["failed"] > len(summary["errors"])
+        if not summary["lines"]:
+            return Response({"detail": "Expected planets, one per line."}, status=status.HTTP_400_BAD_REQUEST)
+        if not summary["failed"]:
+            return Response(summary)
+        if summary["imported"]:
+            return Response(summary, status=status.HTTP_207_MULTI_STATUS)
+        return Response(summary, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PlanetSearch(APIView):
+    default_limit = 10
+    max_limit = 50
+
+    def get_limit(self, request):
+        """
+        Read the number of matches wanted, from `?limit=`.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            int: The limit, between 1 and `max_limit`.
+        """
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    @query_budget(1)
+    def get(self, request, format=None):
+        """
+        Search planets by name, for type-ahead.
+
+        Args:
+            request (HttpRequest): The HTTP request object, with the search in `?q=`.
+            format (str, optional): The format of the response data. Defaults to None.
+
+        Returns:
+            Response: The best matches first, with their score.
+
+        Raises:
+            ValidationError: If the search is missing.
+        """
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": ["This field is required."]})
+        return Response({"results": search_planets(query, self.get_limit(request))})
+
+
+class PlanetStats(APIView):
+    @query_budget(2)
+    def get(self, request, format=None):
+        """
+        Return the population statistics of every terrain and climate.
+
+        They are read from summary tables kept up to date as planets change,
+        so the cost does not depend on the number of planets.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            format (str, optional): The format of the response data. Defaults to None.
+
+        Returns:
+            Response: For each terrain and climate, the number of planets, their
+            total population and their average population.
+        """
+        return Response(stats.summary())
+
+
+class PlanetCacheStats(APIView):
+    def get(self, request, format=None):
+        """
+        Return the hit and miss counters of the planet response cache.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            format (str, optional): The format of the response data. Defaults to None.
+
+        Returns:
+            Response: The number of cache hits and misses.
+        """
+        return Response(cache.get_stats())
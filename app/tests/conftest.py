@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Fixture that empties the caches around every test, since the test database is rolled back but the caches are not.
+
+    The default cache is kept in files, which also outlive the test run.
+    """
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
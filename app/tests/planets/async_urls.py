@@ -0,0 +1,4 @@
+from planets.urls import planet_patterns
+
+
+urlpatterns = planet_patterns(asynchronous=True)
@@ -1,5 +1,6 @@
 import pytest
 
+from benchmarks.fake_graphql import FakeGraphQLServer
 from planets.models import Climate
 from planets.models import Planet
 from planets.models import Terrain
@@ -58,3 +59,34 @@ def add_climate():
         climate = Climate.objects.create(name=name)
         return climate
     return _add_climate
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """
+    Fixture that makes every query budget raise when it is exceeded during the tests.
+    """
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(scope="function")
+def fake_graphql():
+    """
+    Fixture that starts local stand-ins for the SWAPI GraphQL API.
+
+    Args:
+        planets (list): The planet records served.
+        **kwargs: The options of FakeGraphQLServer (latency, failures, opaque_cursors).
+
+    Returns:
+        FakeGraphQLServer: The started server, stopped at the end of the test.
+    """
+    servers = []
+
+    def _fake_graphql(planets, **kwargs):
+        server = FakeGraphQLServer(planets, **kwargs).start()
+        servers.append(server)
+        return server
+    yield _fake_graphql
+    for server in servers:
+        server.stop()
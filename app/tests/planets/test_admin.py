@@ -0,0 +1,111 @@
+import pytest
+from django.core.paginator import EmptyPage
+from django.db import connection
+
+from drf_project.paginators import EstimatedCountPaginator
+from planets.models import Planet
+
+
+@pytest.fixture(scope="function")
+def catalogue(add_planet, add_terrain, add_climate):
+    """
+    Fixture that adds planets linked to a few terrains and climates.
+
+    Returns:
+        list: The created planet objects.
+    """
+    desert = add_terrain(name="Desert")
+    ocean = add_terrain(name="ocean")
+    arid = add_climate(name="arid")
+    planets = [add_planet(name=name) for name in ("Tatooine", "Naboo", "Kamino", "Tatooine Moon")]
+    planets[0].terrains.add(desert)
+    planets[0].climates.add(arid)
+    planets[1].terrains.add(ocean)
+    planets[2].terrains.add(ocean)
+    return planets
+
+
+def changelist_names(admin_client, query=""):
+    resp = admin_client.get(f"/admin/planets/planet/{query}")
+    assert resp.status_code == 200
+    return sorted(planet.name for planet in resp.context["cl"].result_list)
+
+
+@pytest.mark.django_db
+def test_planet_changelist_query_count(admin_client, catalogue, add_planet, django_assert_num_queries):
+    """
+    Test case to verify that the changelist shows terrains and climates without a query per planet.
+
+    Besides the session and the user, the changelist reads the terrains and
+    climates of the filters, estimates the size of the table, counts it
+    while it is small, and reads the page.
+    """
+    admin_client.get("/admin/planets/planet/")
+    with django_assert_num_queries(7) as captured:
+        resp = admin_client.get("/admin/planets/planet/")
+    for index in range(10):
+        add_planet(name=f"Planet {index}")
+    with django_assert_num_queries(len(captured)):
+        admin_client.get("/admin/planets/planet/")
+
+    assert resp.status_code == 200
+    assert b'<td class="field-get_terrains">Desert</td>' in resp.content
+
+
+@pytest.mark.django_db
+def test_planet_changelist_search_and_filters(admin_client, catalogue):
+    """
+    Test case to verify that planets are searched by the words of their name or the names of their terrains and climates.
+    """
+    assert changelist_names(admin_client, "?q=tato") == ["Tatooine", "Tatooine Moon"]
+    assert changelist_names(admin_client, "?q=moon") == ["Tatooine Moon"]
+    assert changelist_names(admin_client, "?q=OCEAN") == ["Kamino", "Naboo"]
+    assert changelist_names(admin_client, "?q=arid") == ["Tatooine"]
+    assert changelist_names(admin_client, "?q=ocea") == []
+    ocean = catalogue[1].terrains.get()
+    assert changelist_names(admin_client, f"?terrains__id__exact={ocean.pk}") == ["Kamino", "Naboo"]
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator(catalogue, django_assert_num_queries):
+    """
+    Test case to verify that a large unfiltered table is counted from the statistics, and anything else exactly.
+    """
+    class Paginator(EstimatedCountPaginator):
+        threshold = 4
+
+    planets = Planet.objects.order_by("pk")
+    assert Paginator(planets, 2).estimate() is None
+    assert Paginator(planets, 2).count == 4
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    for planet in catalogue[2:]:
+        planet.delete()
+    with django_assert_num_queries(1):
+        assert Paginator(planets, 2).count == 4
+    assert EstimatedCountPaginator(planets, 2).count == 2
+    assert Paginator(planets.filter(name__startswith="T"), 2).count == 1
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator_pages_past_estimate(catalogue, add_planet):
+    """
+    Test case to verify that a page past the estimated last one is served from the exact count.
+    """
+    class Paginator(EstimatedCountPaginator):
+        threshold = 4
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    add_planet(name="Bespin")
+    add_planet(name="Hoth")
+
+    paginator = Paginator(Planet.objects.order_by("pk"), 2)
+    assert paginator.count == 4
+    assert paginator.num_pages == 2
+    assert [planet.name for planet in paginator.page(3)] == ["Bespin", "Hoth"]
+    assert paginator.count == 6
+    assert not paginator.estimated
+    with pytest.raises(EmptyPage):
+        paginator.page(4)
@@ -0,0 +1,192 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+
+ASYNC_URLS = "tests.planets.async_urls"
+
+
+def get_both(client, settings, url, **extra):
+    """
+    Send the same GET request to the sync views and to the async views.
+
+    Returns:
+        tuple: The sync and the async responses.
+    """
+    settings.ROOT_URLCONF = "drf_project.urls"
+    sync = client.get(url, **extra)
+    settings.ROOT_URLCONF = ASYNC_URLS
+    return sync, client.get(url, **extra)
+
+
+@pytest.fixture(scope="function")
+def catalogue(add_planet, add_terrain, add_climate):
+    """
+    Fixture that adds a few planets with terrains and climates.
+
+    Returns:
+        list: The created planet objects.
+    """
+    desert = add_terrain(name="desert")
+    arid = add_climate(name="arid")
+    planets = []
+    for index in range(5):
+        planet = add_planet(name=f"Planet {index}", population=index * 1000 or None)
+        planet.terrains.add(desert)
+        planet.climates.add(arid)
+        planets.append(planet)
+    return planets
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [
+    "/api/planets/",
+    "/api/planets/?page_size=2&ordering=-name",
+    "/api/planets/?paginate=false",
+    "/api/planets/?terrain=desert&population__gte=2000",
+    "/api/planets/?fields=name&expand=climates&ordering=-name",
+])
+def test_async_list_matches_sync_list(client, settings, catalogue, url):
+    """
+    Test case to verify that the async list returns the same bodies and headers as the sync one.
+
+    Args:
+        client: Django test client object.
+        settings: Fixture to override the Django settings.
+        catalogue: Fixture adding planets.
+        url (str): The requested URL.
+
+    Returns:
+        None
+    """
+    sync, asynchronous = get_both(client, settings, url)
+    assert asynchronous.status_code == sync.status_code == 200
+    assert asynchronous.content == sync.content
+    for header in ("Content-Type", "ETag", "Last-Modified", "Allow"):
+        assert asynchronous.get(header) == sync.get(header)
+    # Only the sync view reads the session, to authenticate the request.
+    assert asynchronous["Vary"] == "Accept"
+    assert sync["X-Cache"] == "MISS"
+    assert asynchronous["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_async_list_walks_pages_and_answers_conditional_requests(client, settings, catalogue):
+    """
+    Test case to verify that the async list follows cursors and answers conditional requests with a 304.
+
+    Args:
+        client: Django test client object.
+        settings: Fixture to override the Django settings.
+        catalogue: Fixture adding planets.
+
+    Returns:
+        None
+    """
+    settings.ROOT_URLCONF = ASYNC_URLS
+    resp = client.get("/api/planets/?page_size=2")
+    names = [planet["name"] for planet in resp.json()["results"]]
+    while resp.json()["next"]:
+        resp = client.get(resp.json()["next"])
+        names += [planet["name"] for planet in resp.json()["results"]]
+    assert names == [planet.name for planet in catalogue]
+
+    resp = client.get("/api/planets/", HTTP_IF_NONE_MATCH=resp["ETag"])
+    assert resp.status_code == 200
+    resp = client.get("/api/planets/", HTTP_IF_NONE_MATCH=client.get("/api/planets/")["ETag"])
+    assert resp.status_code == 304
+
+
+@pytest.mark.django_db
+def test_async_detail_matches_sync_detail(client, settings, catalogue, django_assert_num_queries):
+    """
+    Test case to verify that the async detail returns the same responses as the sync one, 404 included.
+
+    Args:
+        client: Django test client object.
+        settings: Fixture to override the Django settings.
+        catalogue: Fixture adding planets.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    url = f"/api/planets/{catalogue[1].id}/"
+    sync, asynchronous = get_both(client, settings, url)
+    assert asynchronous.content == sync.content
+    assert asynchronous["ETag"] == sync["ETag"]
+
+    sync, asynchronous = get_both(client, settings, f"{url}?fields=id,terrains")
+    assert asynchronous.content == sync.content
+    assert set(asynchronous.json()) == {"id", "terrains"}
+
+    settings.ROOT_URLCONF = ASYNC_URLS
+    with django_assert_num_queries(2):
+        resp = client.get(f"/api/planets/{catalogue[2].id}/")
+    assert resp["X-Cache"] == "MISS"
+    assert [terrain["name"] for terrain in resp.json()["terrains"]] == ["desert"]
+
+    sync, asynchronous = get_both(client, settings, "/api/planets/999999/")
+    assert asynchronous.status_code == sync.status_code == 404
+    assert asynchronous.content == sync.content
+    # The error is answered from the exception, without running the sync view.
+    with django_assert_num_queries(1):
+        client.get("/api/planets/999999/")
+
+
+@pytest.mark.django_db
+def test_async_views_hand_over_other_requests(client, settings, catalogue, django_assert_num_queries):
+    """
+    Test case to verify that invalid filters are answered in place, and writes and streams by the sync views.
+
+    Args:
+        client: Django test client object.
+        settings: Fixture to override the Django settings.
+        catalogue: Fixture adding planets.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    sync, asynchronous = get_both(client, settings, "/api/planets/?population__gt=many")
+    assert asynchronous.status_code == sync.status_code == 400
+    assert asynchronous.content == sync.content
+    with django_assert_num_queries(0):
+        client.get("/api/planets/?population__gt=many")
+
+    settings.ROOT_URLCONF = ASYNC_URLS
+    resp = client.get("/api/planets/?stream=ndjson")
+    assert len(b"".join(resp.streaming_content).splitlines()) == 5
+
+    resp = client.post("/api/planets/", {"name": "Tatooine", "population": 200_000}, content_type="application/json")
+    assert resp.status_code == 201
+    resp = client.put(f"/api/planets/{resp.json()['id']}/", {"name": "Tatooine", "population": 1}, content_type="application/json")
+    assert resp.status_code == 200
+    assert client.get(f"/api/planets/{resp.json()['id']}/").json()["population"] == 1
+
+
+@pytest.mark.django_db
+def test_async_views_under_asgi(settings, add_planet):
+    """
+    Test case to verify that the async views answer requests sent through the ASGI handler.
+
+    Args:
+        settings: Fixture to override the Django settings.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    settings.ROOT_URLCONF = ASYNC_URLS
+    planet = add_planet(name="Tatooine", population=200_000)
+    client = AsyncClient()
+
+    async def fetch():
+        return await client.get("/api/planets/"), await client.get(f"/api/planets/{planet.id}/")
+
+    planets, detail = async_to_sync(fetch)()
+    assert planets.status_code == 200
+    assert [row["name"] for row in json.loads(planets.content)["results"]] == ["Tatooine"]
+    assert json.loads(detail.content)["population"] == 200_000
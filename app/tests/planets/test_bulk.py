@@ -0,0 +1,257 @@
+import pytest
+
+from planets.models import Planet
+
+
+@pytest.mark.django_db
+def test_bulk_create_planets(client, django_assert_max_num_queries):
+    """
+    Test case to verify that planets are created in bulk with a bounded number of queries.
+
+    Args:
+        client: Django test client object.
+        django_assert_max_num_queries: Fixture to assert the maximum number of queries.
+
+    Returns:
+        None
+    """
+    items = [{"name": f"Planet {index}", "population": index} for index in range(50)]
+
+    with django_assert_max_num_queries(7):
+        resp = client.post("/api/planets/bulk/", items, content_type="application/json")
+    assert resp.status_code == 201
+    assert [result["status"] for result in resp.data["results"]] == [201] * 50
+    assert resp.data["results"][49]["data"]["name"] == "Planet 49"
+    assert resp.data["results"][49]["data"]["terrains"] == []
+    assert Planet.objects.count() == 50
+
+
+@pytest.mark.django_db
+def test_bulk_create_upserts_by_name(client, add_planet):
+    """
+    Test case to verify that bulk creation updates the planets whose name exists and rejects repeated names.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    earth = add_planet(name="Earth", population=1)
+
+    items = [{"name": "Earth", "population": 10}, {"name": "Mars", "population": 20}]
+    resp = client.post("/api/planets/bulk/", items, content_type="application/json")
+    assert resp.status_code == 201
+    assert [result["status"] for result in resp.data["results"]] == [200, 201]
+    assert resp.data["results"][0]["data"]["id"] == earth.id
+    earth.refresh_from_db()
+    assert earth.population == 10
+    assert earth.version == 2
+    assert Planet.objects.count() == 2
+
+    items = [{"name": "Venus"}, {"name": "Venus"}]
+    resp = client.post("/api/planets/bulk/?mode=partial", items, content_type="application/json")
+    assert resp.status_code == 207
+    assert resp.data["results"][1] == {"status": 400, "errors": {"name": ["This name is repeated."]}}
+    assert Planet.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_create_atomic_failure(client):
+    """
+    Test case to verify that no planet is created when one item is invalid in atomic mode.
+
+    Args:
+        client: Django test client object.
+
+    Returns:
+        None
+    """
+    items = [{"name": "Earth"}, {"population": 10}]
+
+    resp = client.post("/api/planets/bulk/", items, content_type="application/json")
+    assert resp.status_code == 400
+    assert resp.data["results"][0]["status"] == 424
+    assert resp.data["results"][1] == {
+        "status": 400, "errors": {"name": ["This field is required."]},
+    }
+    assert Planet.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_create_partial_success(client):
+    """
+    Test case to verify that the valid planets are created in partial mode.
+
+    Args:
+        client: Django test client object.
+
+    Returns:
+        None
+    """
+    items = [{"name": "Earth"}, {"population": 10}, {"name": "Mars"}]
+
+    resp = client.post("/api/planets/bulk/?mode=partial", items, content_type="application/json")
+    assert resp.status_code == 207
+    assert [result["status"] for result in resp.data["results"]] == [201, 400, 201]
+    assert resp.data["results"][2]["data"]["name"] == "Mars"
+    assert list(Planet.objects.values_list("name", flat=True)) == ["Earth", "Mars"]
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_invalid_envelopes(client, settings):
+    """
+    Test case to verify that bodies that are not lists, too long lists and unknown modes are rejected.
+
+    Args:
+        client: Django test client object.
+        settings: Fixture to override the Django settings.
+
+    Returns:
+        None
+    """
+    settings.PLANETS_BULK_MAX_ITEMS = 2
+
+    resp = client.post("/api/planets/bulk/", {"name": "Earth"}, content_type="application/json")
+    assert resp.status_code == 400
+    resp = client.post("/api/planets/bulk/", [{"name": "A"}] * 3, content_type="application/json")
+    assert resp.status_code == 400
+    resp = client.post("/api/planets/bulk/?mode=foo", [], content_type="application/json")
+    assert resp.status_code == 400
+    assert Planet.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_update_planets(client, add_planet, django_capture_on_commit_callbacks):
+    """
+    Test case to verify that planets are updated in bulk and their versions bumped.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_capture_on_commit_callbacks: Fixture to run the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    earth = add_planet(name="Earth", population=1)
+    mars = add_planet(name="Mars", population=2)
+    client.get(f"/api/planets/{earth.id}/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.patch(
+            "/api/planets/bulk/",
+            [{"id": earth.id, "population": 10}, {"id": mars.id, "name": "Red Planet"}],
+            content_type="application/json",
+        )
+    assert resp.status_code == 200
+    assert resp.data["results"][0]["data"]["population"] == 10
+    assert resp.data["results"][1]["data"]["name"] == "Red Planet"
+    assert resp.data["results"][1]["data"]["population"] == 2
+
+    earth.refresh_from_db()
+    assert earth.population == 10
+    assert earth.version == 2
+    resp = client.get(f"/api/planets/{earth.id}/")
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data["population"] == 10
+
+
+@pytest.mark.django_db
+def test_bulk_update_rejects_taken_names(client, add_planet):
+    """
+    Test case to verify that renaming planets to taken names is reported without writing anything.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    earth = add_planet(name="Earth")
+    mars = add_planet(name="Mars")
+
+    resp = client.patch(
+        "/api/planets/bulk/",
+        [{"id": mars.id, "name": "Earth"}, {"id": earth.id, "population": 5}],
+        content_type="application/json",
+    )
+    assert resp.status_code == 400
+    assert resp.data["results"][0]["errors"] == {"name": ["planet with this name already exists."]}
+    assert resp.data["results"][1]["status"] == 424
+
+    resp = client.patch(
+        "/api/planets/bulk/",
+        [{"id": earth.id, "name": "Mars"}, {"id": mars.id, "name": "Earth"}],
+        content_type="application/json",
+    )
+    assert resp.status_code == 400
+    assert [result["status"] for result in resp.data["results"]] == [400, 400]
+    assert sorted(Planet.objects.values_list("name", flat=True)) == ["Earth", "Mars"]
+
+
+@pytest.mark.django_db
+def test_bulk_update_reports_each_failure(client, add_planet):
+    """
+    Test case to verify that missing, unknown, repeated and invalid items are reported one by one.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    earth = add_planet(name="Earth", population=1)
+    mars = add_planet(name="Mars", population=2)
+    items = [
+        {"id": earth.id, "population": 10},
+        {"population": 10},
+        {"id": 999, "population": 10},
+        {"id": earth.id, "population": 20},
+        {"id": mars.id, "population": "many"},
+    ]
+
+    resp = client.patch("/api/planets/bulk/", items, content_type="application/json")
+    assert resp.status_code == 400
+    assert [result["status"] for result in resp.data["results"]] == [424, 400, 404, 400, 400]
+    earth.refresh_from_db()
+    assert earth.population == 1
+
+    resp = client.patch("/api/planets/bulk/?mode=partial", items, content_type="application/json")
+    assert resp.status_code == 207
+    assert [result["status"] for result in resp.data["results"]] == [200, 400, 404, 400, 400]
+    earth.refresh_from_db()
+    assert earth.population == 10
+
+
+@pytest.mark.django_db
+def test_bulk_delete_planets(client, add_planet):
+    """
+    Test case to verify that planets are deleted in bulk, all or nothing by default.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    earth = add_planet(name="Earth")
+    mars = add_planet(name="Mars")
+    hoth = add_planet(name="Hoth")
+
+    resp = client.delete("/api/planets/bulk/", [earth.id, 999], content_type="application/json")
+    assert resp.status_code == 400
+    assert Planet.objects.count() == 3
+
+    resp = client.delete(
+        "/api/planets/bulk/", [earth.id, {"id": mars.id}], content_type="application/json"
+    )
+    assert resp.status_code == 200
+    assert resp.data["results"] == [
+        {"status": 204, "id": earth.id}, {"status": 204, "id": mars.id},
+    ]
+    assert list(Planet.objects.values_list("id", flat=True)) == [hoth.id]
@@ -0,0 +1,297 @@
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+
+from planets import cache
+
+
+@pytest.mark.django_db
+def test_list_is_served_from_cache(client, add_planet, django_assert_num_queries):
+    """
+    Test case to verify that a repeated list request is served from the cache.
+
+    Only the aggregate query computing the ETag is run.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    add_planet(name="Earth")
+
+    resp = client.get("/api/planets/")
+    assert resp["X-Cache"] == "MISS"
+
+    with django_assert_num_queries(1):
+        resp_two = client.get("/api/planets/")
+    assert resp_two["X-Cache"] == "HIT"
+    assert resp_two.content == resp.content
+
+    resp_three = client.get("/api/planets/?paginate=false")
+    assert resp_three["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_detail_is_served_from_cache(client, add_planet, django_assert_num_queries):
+    """
+    Test case to verify that a repeated detail request is served from the cache.
+
+    Only the query reading the version of the planet is run.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+
+    assert client.get(f"/api/planets/{planet.id}/")["X-Cache"] == "MISS"
+    with django_assert_num_queries(1):
+        resp = client.get(f"/api/planets/{planet.id}/")
+    assert resp["X-Cache"] == "HIT"
+    assert resp.data["name"] == "Earth"
+
+
+@pytest.mark.django_db
+def test_update_invalidates_only_the_changed_planet(
+    client, add_planet, django_capture_on_commit_callbacks
+):
+    """
+    Test case to verify that updating a planet invalidates its detail and the list, but not other planets.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_capture_on_commit_callbacks: Fixture to run the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    earth = add_planet(name="Earth", population=1)
+    mars = add_planet(name="Mars")
+    for url in ("/api/planets/", f"/api/planets/{earth.id}/", f"/api/planets/{mars.id}/"):
+        client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.put(
+            f"/api/planets/{earth.id}/",
+            {"name": "Earth", "population": 2},
+            content_type="application/json",
+        )
+
+    resp = client.get(f"/api/planets/{earth.id}/")
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data["population"] == 2
+    resp = client.get("/api/planets/")
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data["results"][0]["population"] == 2
+    assert client.get(f"/api/planets/{mars.id}/")["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_invalidation_waits_for_commit(client, add_planet, django_capture_on_commit_callbacks):
+    """
+    Test case to verify that cached responses are only invalidated once the write commits.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_capture_on_commit_callbacks: Fixture to capture the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth", population=1)
+    url = f"/api/planets/{planet.id}/"
+    client.get(url)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        planet.population = 2
+        planet.save()
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    for callback in callbacks:
+        callback()
+    resp = client.get(url)
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data["population"] == 2
+
+
+@pytest.mark.django_db
+def test_delete_invalidates_cache(client, add_planet, django_capture_on_commit_callbacks):
+    """
+    Test case to verify that deleting a planet removes it from the cached list.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_capture_on_commit_callbacks: Fixture to run the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    client.get("/api/planets/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.delete(f"/api/planets/{planet.id}/")
+
+    resp = client.get("/api/planets/")
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_links_invalidate_cache_from_both_sides(
+    client, add_planet, add_terrain, add_climate, django_capture_on_commit_callbacks
+):
+    """
+    Test case to verify that adding, removing and clearing links from either side invalidates the planet.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        add_climate: Fixture to add a climate.
+        django_capture_on_commit_callbacks: Fixture to run the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    desert = add_terrain(name="desert")
+    arid = add_climate(name="arid")
+    url = f"/api/planets/{planet.id}/"
+
+    changes = [
+        (lambda: planet.terrains.add(desert), "terrains", ["desert"]),
+        (lambda: desert.planets.remove(planet), "terrains", []),
+        (lambda: arid.planets.add(planet), "climates", ["arid"]),
+        (lambda: arid.planets.clear(), "climates", []),
+        (lambda: planet.climates.add(arid), "climates", ["arid"]),
+        (lambda: planet.climates.clear(), "climates", []),
+    ]
+    for change, relation, names in changes:
+        client.get(url)
+        with django_capture_on_commit_callbacks(execute=True):
+            change()
+        resp = client.get(url)
+        assert resp["X-Cache"] == "MISS"
+        assert [item["name"] for item in resp.data[relation]] == names
+
+
+@pytest.mark.django_db
+def test_attribute_changes_invalidate_linked_planets(
+    client, add_planet, add_terrain, django_capture_on_commit_callbacks
+):
+    """
+    Test case to verify that renaming or deleting a terrain invalidates the planets linked to it.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        django_capture_on_commit_callbacks: Fixture to run the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    desert = add_terrain(name="desert")
+    planet.terrains.add(desert)
+    url = f"/api/planets/{planet.id}/"
+
+    client.get(url)
+    desert.name = "dunes"
+    with django_capture_on_commit_callbacks(execute=True):
+        desert.save()
+    resp = client.get(url)
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data["terrains"][0]["name"] == "dunes"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        desert.delete()
+    resp = client.get(url)
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data["terrains"] == []
+
+
+@pytest.mark.django_db
+def test_cache_stats(client, add_planet):
+    """
+    Test case to verify that the cache stats endpoint reports hits and misses.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    client.get(f"/api/planets/{planet.id}/")
+    client.get(f"/api/planets/{planet.id}/")
+    client.get(f"/api/planets/{planet.id}/")
+
+    resp = client.get("/api/planets/cache/")
+    assert resp.status_code == 200
+    assert resp.data == {"hits": 2, "misses": 1}
+
+
+@pytest.mark.django_db
+def test_invalidation_reaches_other_workers(client, add_planet, monkeypatch, settings):
+    """
+    Test case to verify that versions bumped by another worker, through its own cache instance, invalidate the responses of this one.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        monkeypatch: Fixture to patch the cache of the other worker in.
+        settings: Fixture to read the cache settings.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    url = f"/api/planets/{planet.id}/"
+    client.get("/api/planets/")
+    client.get(url)
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    location = settings.CACHES[settings.PLANETS_CACHE_ALIAS]["LOCATION"]
+    with monkeypatch.context() as patch:
+        patch.setattr(cache, "get_cache", lambda: FileBasedCache(location, {}))
+        cache.invalidate_planets([planet.id])
+
+    assert client.get("/api/planets/")["X-Cache"] == "MISS"
+    assert client.get(url)["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_process_local_cache_is_not_used(client, add_planet, settings):
+    """
+    Test case to verify that responses are not cached in a backend other workers cannot invalidate.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        settings: Fixture to switch to a LocMemCache.
+
+    Returns:
+        None
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    settings.PLANETS_CACHE_ALIAS = "local"
+    planet = add_planet(name="Earth")
+
+    client.get(f"/api/planets/{planet.id}/")
+    assert client.get(f"/api/planets/{planet.id}/")["X-Cache"] == "MISS"
+    assert client.get("/api/planets/cache/").data == {"hits": 0, "misses": 0}
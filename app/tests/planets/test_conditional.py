@@ -0,0 +1,209 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.utils.http import http_date
+
+from planets.models import Planet
+from planets.models import PlanetDeletion
+
+
+@pytest.mark.django_db
+def test_planet_version_bumps_on_save_and_links(add_planet, add_terrain):
+    """
+    Test case to verify that the version of a planet grows when it or its links change.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    assert planet.version == 1
+
+    planet.population = 10
+    planet.save()
+    assert planet.version == 2
+
+    desert = add_terrain(name="desert")
+    planet.terrains.add(desert)
+    planet.refresh_from_db()
+    assert planet.version == 3
+
+    desert.name = "dunes"
+    desert.save()
+    planet.refresh_from_db()
+    assert planet.version == 4
+
+
+@pytest.mark.django_db
+def test_detail_etag_not_modified(
+    client, add_planet, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    """
+    Test case to verify that a planet requested with its current ETag returns a 304 after one query.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_assert_num_queries: Fixture to assert the number of queries.
+        django_capture_on_commit_callbacks: Fixture to run the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    resp = client.get(f"/api/planets/{planet.id}/")
+    etag = resp["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    with django_assert_num_queries(1):
+        resp_two = client.get(f"/api/planets/{planet.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert resp_two.status_code == 304
+    assert resp_two["ETag"] == etag
+
+    with django_capture_on_commit_callbacks(execute=True):
+        planet.terrains.create(name="desert")
+    resp_three = client.get(f"/api/planets/{planet.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert resp_three.status_code == 200
+    assert resp_three["ETag"] != etag
+    assert resp_three.data["terrains"][0]["name"] == "desert"
+
+
+@pytest.mark.django_db
+def test_detail_if_modified_since(client, add_planet):
+    """
+    Test case to verify that a planet requested with If-Modified-Since returns a 304 until it changes.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    resp = client.get(f"/api/planets/{planet.id}/")
+    last_modified = resp["Last-Modified"]
+    assert last_modified == http_date(planet.updated_at.timestamp())
+
+    resp_two = client.get(f"/api/planets/{planet.id}/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp_two.status_code == 304
+
+    Planet.objects.filter(pk=planet.pk).update(
+        updated_at=planet.updated_at.replace(year=planet.updated_at.year + 1)
+    )
+    resp_three = client.get(f"/api/planets/{planet.id}/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp_three.status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_etag_changes_with_planets(client, add_planet):
+    """
+    Test case to verify that the list ETag changes when a planet is added, updated or deleted.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    earth = add_planet(name="Earth")
+    etags = [client.get("/api/planets/")["ETag"]]
+    assert client.get("/api/planets/", HTTP_IF_NONE_MATCH=etags[0]).status_code == 304
+
+    mars = add_planet(name="Mars")
+    etags.append(client.get("/api/planets/")["ETag"])
+    earth.population = 1
+    earth.save()
+    etags.append(client.get("/api/planets/")["ETag"])
+    mars.delete()
+    etags.append(client.get("/api/planets/")["ETag"])
+
+    assert len(set(etags)) == 4
+    resp = client.get("/api/planets/", HTTP_IF_NONE_MATCH=etags[0])
+    assert resp.status_code == 200
+    assert [planet["name"] for planet in resp.data["results"]] == ["Earth"]
+
+
+@pytest.mark.django_db
+def test_list_etag_depends_on_the_page(client, add_planet):
+    """
+    Test case to verify that each page of the list has its own ETag.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    add_planet(name="Earth")
+    add_planet(name="Mars")
+    resp = client.get("/api/planets/?page_size=1")
+    resp_two = client.get(resp.data["next"], HTTP_IF_NONE_MATCH=resp["ETag"])
+    assert resp_two.status_code == 200
+    assert resp_two["ETag"] != resp["ETag"]
+
+
+@pytest.mark.django_db
+def test_list_if_modified_since_after_delete(
+    client, add_planet, monkeypatch, django_capture_on_commit_callbacks
+):
+    """
+    Test case to verify that deleting a planet moves the Last-Modified date of the list.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        monkeypatch: Fixture to move the clock forward.
+        django_capture_on_commit_callbacks: Fixture to run the callbacks of the commits.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth")
+    last_modified = client.get("/api/planets/")["Last-Modified"]
+    assert client.get("/api/planets/", HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    later = time.time() + 10
+    monkeypatch.setattr("planets.conditional.time.time", lambda: later)
+    with django_capture_on_commit_callbacks(execute=True):
+        planet.delete()
+
+    resp = client.get("/api/planets/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp.status_code == 200
+    assert resp["Last-Modified"] == http_date(later)
+    assert resp.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_list_deletion_time_is_shared(client, add_planet, monkeypatch):
+    """
+    Test case to verify that the deletion time is read from the database, so workers with their own caches agree.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        monkeypatch: Fixture to move the clock forward.
+
+    Returns:
+        None
+    """
+    add_planet(name="Earth")
+    planet = add_planet(name="Mars")
+    last_modified = client.get("/api/planets/")["Last-Modified"]
+
+    later = time.time() + 10
+    monkeypatch.setattr("planets.conditional.time.time", lambda: later)
+    planet.delete()
+    assert http_date(PlanetDeletion.objects.get().deleted_at.timestamp()) == http_date(later)
+
+    # Another worker does not share the cache of this one.
+    cache.clear()
+    resp = client.get("/api/planets/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp.status_code == 200
+    assert resp["Last-Modified"] == http_date(later)
@@ -0,0 +1,162 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from planets import denorm
+from planets.loaders import PlanetLoader
+from planets.models import Planet
+
+
+def names(planet, column="terrain_names"):
+    """
+    Read the stored denormalized names of a planet.
+
+    Returns:
+        list: The names, in the stored order.
+    """
+    return [item["name"] for item in Planet.objects.values_list(column, flat=True).get(pk=planet.pk)]
+
+
+@pytest.mark.django_db
+def test_names_follow_links(add_planet, add_terrain, add_climate):
+    """
+    Test case to verify that adding, removing and clearing links from both sides rewrites the names.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        add_climate: Fixture to add a climate.
+
+    Returns:
+        None
+    """
+    tundra = add_terrain("tundra")
+    desert = add_terrain("desert")
+    arid = add_climate("arid")
+    tatooine = add_planet(name="Tatooine")
+    jakku = add_planet(name="Jakku")
+    assert names(tatooine) == []
+
+    tatooine.terrains.add(desert, tundra)
+    tatooine.climates.add(arid)
+    assert Planet.objects.values_list("terrain_names", flat=True).get(pk=tatooine.pk) == [
+        {"id": tundra.id, "name": "tundra"},
+        {"id": desert.id, "name": "desert"},
+    ]
+    assert names(tatooine, "climate_names") == ["arid"]
+
+    desert.planets.add(jakku)
+    tatooine.terrains.remove(tundra)
+    assert names(jakku) == ["desert"]
+    assert names(tatooine) == ["desert"]
+
+    desert.planets.clear()
+    arid.planets.clear()
+    assert names(tatooine) == names(jakku) == []
+    assert names(tatooine, "climate_names") == []
+    assert denorm.drift() == []
+
+
+@pytest.mark.django_db
+def test_names_follow_renames_and_deletions(add_planet, add_terrain):
+    """
+    Test case to verify that renaming or deleting a terrain rewrites the planets showing it.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    desert = add_terrain("desert")
+    tundra = add_terrain("tundra")
+    tatooine = add_planet(name="Tatooine")
+    tatooine.terrains.add(desert, tundra)
+
+    desert.name = "dunes"
+    desert.save()
+    assert names(tatooine) == ["dunes", "tundra"]
+
+    tundra.delete()
+    assert names(tatooine) == ["dunes"]
+    assert denorm.drift() == []
+
+
+@pytest.mark.django_db
+def test_save_keeps_names_of_stale_instances(add_planet, add_terrain):
+    """
+    Test case to verify that saving an instance loaded before its links changed does not write back stale names.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    tatooine = add_planet(name="Tatooine")
+    stale = Planet.objects.get(pk=tatooine.pk)
+    tatooine.terrains.add(add_terrain("desert"))
+
+    stale.population = 200_000
+    stale.save()
+    assert names(tatooine) == ["desert"]
+    assert Planet.objects.get(pk=tatooine.pk).population == 200_000
+
+
+@pytest.mark.django_db
+def test_names_follow_loader():
+    """
+    Test case to verify that the loader rewrites the names of the planets whose links it changed.
+    """
+    loader = PlanetLoader(incremental=True)
+    loader.load([
+        {"name": "Tatooine", "population": 200_000, "terrains": ["desert"], "climates": ["arid"]},
+        {"name": "Hoth", "population": None, "terrains": ["tundra", "ice caves"], "climates": ["frozen"]},
+    ])
+    hoth = Planet.objects.get(name="Hoth")
+    assert sorted(names(hoth)) == ["ice caves", "tundra"]
+
+    loader.load([
+        {"name": "Hoth", "population": None, "terrains": ["Ice Caves"], "climates": []},
+    ])
+    assert names(hoth) == ["ice caves"]
+    assert names(hoth, "climate_names") == []
+    assert denorm.drift() == []
+
+
+@pytest.mark.django_db
+def test_check_denormalized_command(add_planet, add_terrain):
+    """
+    Test case to verify that the check_denormalized command reports drift, fails on it, and fixes it with --fix.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    desert = add_terrain("desert")
+    tatooine = add_planet(name="Tatooine")
+    tatooine.terrains.add(desert)
+    out = StringIO()
+    call_command("check_denormalized", stdout=out)
+    assert "No drift." in out.getvalue()
+
+    # Writes bypassing the ORM are not followed.
+    Planet.objects.filter(pk=tatooine.pk).update(terrain_names=[])
+    with pytest.raises(CommandError, match="1 planets drifted"):
+        call_command("check_denormalized", stdout=StringIO())
+
+    version = Planet.objects.get(pk=tatooine.pk).version
+    out = StringIO()
+    call_command("check_denormalized", "--fix", "--batch-size", "1", stdout=out)
+    assert f"planet {tatooine.id} terrain_names: stored [], expected [{{'id': {desert.id}, 'name': 'desert'}}]" in out.getvalue()
+    assert "1 planets drifted and were rewritten." in out.getvalue()
+    assert names(tatooine) == ["desert"]
+    assert Planet.objects.get(pk=tatooine.pk).version == version + 1
+    assert denorm.drift() == []
@@ -0,0 +1,89 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.fixture(scope="function")
+def catalogue(add_planet, add_terrain, add_climate):
+    """
+    Fixture that adds five planets, the first ones with terrains and climates.
+
+    Returns:
+        list: The created planet objects.
+    """
+    desert = add_terrain(name="desert")
+    ocean = add_terrain(name="ocean")
+    arid = add_climate(name="arid")
+    planets = [add_planet(name=f"Planet {index}", population=index * 1000 or None) for index in range(5)]
+    planets[0].terrains.add(desert, ocean)
+    planets[0].climates.add(arid)
+    planets[1].terrains.add(ocean)
+    return planets
+
+
+def export(*args):
+    """
+    Run export_planets, capturing its binary standard output and its standard error.
+
+    Returns:
+        tuple: The exported bytes and the report.
+    """
+    stdout = io.TextIOWrapper(io.BytesIO())
+    stderr = io.StringIO()
+    call_command("export_planets", *args, stdout=stdout, stderr=stderr)
+    stdout.flush()
+    return stdout.buffer.getvalue(), stderr.getvalue()
+
+
+@pytest.mark.django_db
+def test_export_ndjson_matches_the_api_stream(client, catalogue, django_assert_num_queries):
+    """
+    Test case to verify that the NDJSON export holds the same lines as the streamed list, read with one query.
+    """
+    with django_assert_num_queries(1):
+        data, report = export("--chunk-size", "2")
+    resp = client.get("/api/planets/?stream=ndjson")
+    assert data == b"".join(resp.streaming_content)
+    assert [json.loads(line)["name"] for line in data.splitlines()][:2] == ["Planet 0", "Planet 1"]
+    assert report.startswith("Exported 5 planets in ")
+    assert "rows/s" in report
+
+
+@pytest.mark.django_db
+def test_export_json_and_csv_to_files(catalogue, tmp_path):
+    """
+    Test case to verify that the JSON and gzipped CSV exports are written to their paths.
+    """
+    path = tmp_path / "planets.json"
+    call_command("export_planets", "--format", "json", "--output", str(path), stderr=io.StringIO())
+    planets = json.loads(path.read_bytes())
+    assert [planet["name"] for planet in planets] == [f"Planet {index}" for index in range(5)]
+    assert [terrain["name"] for terrain in planets[0]["terrains"]] == ["desert", "ocean"]
+
+    path = tmp_path / "planets.csv.gz"
+    call_command("export_planets", "--format", "csv", "--output", str(path), "--chunk-size", "3", stderr=io.StringIO())
+    with gzip.open(path, "rt", newline="") as export_file:
+        rows = list(csv.reader(export_file))
+    assert rows[0] == ["id", "name", "population", "terrains", "climates"]
+    assert rows[1][1:] == ["Planet 0", "", "desert;ocean", "arid"]
+    assert rows[2][1:] == ["Planet 1", "1000", "ocean", ""]
+    assert len(rows) == 6
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["planets.csv.gz", "planets.json"]
+
+
+@pytest.mark.django_db
+def test_export_empty_catalogue():
+    """
+    Test case to verify that exporting no planets writes an empty document of each format.
+    """
+    assert export("--format", "json")[0] == b"[]"
+    assert export("--format", "ndjson")[0] == b""
+    assert export("--format", "csv")[0] == b"id,name,population,terrains,climates\r\n"
+    assert gzip.decompress(export("--format", "json", "--gzip")[0]) == b"[]"
+    with pytest.raises(CommandError):
+        export("--chunk-size", "0")
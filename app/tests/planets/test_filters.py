@@ -0,0 +1,216 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from planets.filters import PlanetFilterBackend
+from planets.models import Planet
+
+
+@pytest.fixture(scope="function")
+def planets(add_planet, add_terrain, add_climate):
+    """
+    Fixture that adds planets with various terrains, climates and populations.
+
+    Returns:
+        dict: The planets by name.
+    """
+    desert = add_terrain("desert")
+    mountains = add_terrain("Mountains")
+    tundra = add_terrain("tundra")
+    arid = add_climate("arid")
+    frozen = add_climate("frozen")
+
+    tatooine = add_planet(name="Tatooine", population=200_000)
+    tatooine.terrains.add(desert, mountains)
+    tatooine.climates.add(arid)
+    taris = add_planet(name="Taris", population=1_500_000_000)
+    taris.terrains.add(mountains)
+    hoth = add_planet(name="Hoth")
+    hoth.terrains.add(tundra, mountains)
+    hoth.climates.add(frozen)
+    jakku = add_planet(name="Jakku", population=1_000_000_000)
+    jakku.terrains.add(desert)
+    jakku.climates.add(arid)
+    return {planet.name: planet for planet in (tatooine, taris, hoth, jakku)}
+
+
+def get_names(client, query):
+    resp = client.get(f"/api/planets/?{query}")
+    assert resp.status_code == 200
+    return [planet["name"] for planet in resp.data["results"]]
+
+
+@pytest.mark.django_db
+def test_filter_by_terrain_and_climate(client, planets):
+    """
+    Test case to verify that comma separated terrains are alternatives, repeated terrains must all match, and names are matched regardless of their case.
+
+    Args:
+        client: Django test client object.
+        planets: Fixture adding the planets.
+
+    Returns:
+        None
+    """
+    assert get_names(client, "terrain=desert") == ["Tatooine", "Jakku"]
+    assert get_names(client, "terrain=DESERT,tundra") == ["Tatooine", "Hoth", "Jakku"]
+    assert get_names(client, "terrain=desert&terrain=mountains") == ["Tatooine"]
+    assert get_names(client, "terrain=mountains&climate=frozen") == ["Hoth"]
+    assert get_names(client, "climate=arid,frozen") == ["Tatooine", "Hoth", "Jakku"]
+    assert get_names(client, "terrain=swamp") == []
+
+
+@pytest.mark.django_db
+def test_filter_by_population_and_name(client, planets):
+    """
+    Test case to verify the population bounds and the name filters.
+
+    Args:
+        client: Django test client object.
+        planets: Fixture adding the planets.
+
+    Returns:
+        None
+    """
+    assert get_names(client, "population__gte=1e9") == ["Taris", "Jakku"]
+    assert get_names(client, "population__gt=1e9") == ["Taris"]
+    assert get_names(client, "population__lt=1000000000.5") == ["Tatooine", "Jakku"]
+    assert get_names(client, "population__lte=2e5") == ["Tatooine"]
+    assert get_names(client, "name__startswith=Ta") == ["Tatooine", "Taris"]
+    assert get_names(client, "name__startswith=ta") == []
+    assert get_names(client, "name=Hoth") == ["Hoth"]
+    assert get_names(client, "name__startswith=Ta&terrain=desert&population__lt=1e6") == ["Tatooine"]
+
+
+@pytest.mark.django_db
+def test_filter_name_prefix_ending_in_last_characters(client, add_planet):
+    """
+    Test case to verify that prefixes ending in the largest characters, or before the surrogates, still match.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    add_planet(name="Ta \ud7ffb")
+    add_planet(name="Ta \U0010ffffb")
+    add_planet(name="Ta b")
+
+    assert get_names(client, "name__startswith=Ta \ud7ff") == ["Ta \ud7ffb"]
+    assert get_names(client, "name__startswith=Ta \U0010ffff") == ["Ta \U0010ffffb"]
+    assert get_names(client, "name__startswith=Ta ") == ["Ta \ud7ffb", "Ta \U0010ffffb", "Ta b"]
+
+    backend = PlanetFilterBackend()
+    assert backend.prefix_upper_bound("Ta") == "Tb"
+    assert backend.prefix_upper_bound("a\ud7ff") == "a\ue000"
+    assert backend.prefix_upper_bound("a\U0010ffff") == "b"
+    assert backend.prefix_upper_bound("\U0010ffff") is None
+
+
+@pytest.mark.django_db
+def test_filter_with_pagination_and_streaming(client, planets):
+    """
+    Test case to verify that filters apply to every page and to streamed lists.
+
+    Args:
+        client: Django test client object.
+        planets: Fixture adding the planets.
+
+    Returns:
+        None
+    """
+    resp = client.get("/api/planets/?terrain=mountains&page_size=2")
+    assert [planet["name"] for planet in resp.data["results"]] == ["Tatooine", "Taris"]
+    resp = client.get(resp.data["next"])
+    assert [planet["name"] for planet in resp.data["results"]] == ["Hoth"]
+
+    resp = client.get("/api/planets/?stream=ndjson&climate=arid")
+    lines = b"".join(resp.streaming_content).splitlines()
+    assert len(lines) == 2
+
+
+@pytest.mark.django_db
+def test_filter_invalid_population(client):
+    """
+    Test case to verify that a population bound that is not a number, or out of range, returns a 400 status code.
+
+    Args:
+        client: Django test client object.
+
+    Returns:
+        None
+    """
+    resp = client.get("/api/planets/?population__gte=many")
+    assert resp.status_code == 400
+    assert resp.data == {"population__gte": ["A valid number is required."]}
+    resp = client.get("/api/planets/?population__lt=nan")
+    assert resp.status_code == 400
+    resp = client.get("/api/planets/?population__gte=1e30")
+    assert resp.status_code == 400
+    assert resp.data == {"population__gte": [
+        "Ensure this value is between -9223372036854775808 and 9223372036854775807."
+    ]}
+    resp = client.get("/api/planets/?population__lt=-1e30")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_filter_population_large_integer_is_exact(client, add_planet):
+    """
+    Test case to verify that integer bounds above 2**53 are compared exactly, without going through a float.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    add_planet(name="Coruscant", population=2**53)
+    add_planet(name="Kamino", population=2**53 + 1)
+
+    resp = client.get(f"/api/planets/?paginate=false&population__gte={2**53 + 1}")
+    assert [planet["name"] for planet in resp.data] == ["Kamino"]
+    resp = client.get(f"/api/planets/?paginate=false&population__lt={2**53 + 1}")
+    assert [planet["name"] for planet in resp.data] == ["Coruscant"]
+    resp = client.get("/api/planets/?paginate=false&population__gt=9.007199254740992e15")
+    assert [planet["name"] for planet in resp.data] == ["Kamino"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", [
+    "terrain=desert",
+    "terrain=desert,tundra&terrain=mountains",
+    "climate=arid",
+    "population__gte=1e9",
+    "population__lt=1e6",
+    "name__startswith=Ta",
+    "name=Hoth",
+])
+def test_filters_use_indexes(planets, query):
+    """
+    Test case to verify with EXPLAIN that each filter is answered from an index, without scanning a whole table.
+
+    Args:
+        planets: Fixture adding the planets.
+        query (str): The query string of the filter.
+
+    Returns:
+        None
+    """
+    request = Request(RequestFactory().get(f"/api/planets/?{query}"))
+    queryset = PlanetFilterBackend().filter_queryset(request, Planet.objects.all(), None)
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        assert "Seq Scan" not in plan
+    else:
+        plan = queryset.explain()
+        scans = [line for line in plan.splitlines() if " SCAN " in line]
+        assert all("INDEX" in line for line in scans), plan
+        assert "USING" in plan
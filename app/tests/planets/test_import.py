@@ -0,0 +1,117 @@
+import io
+import json
+
+import pytest
+from django.test import RequestFactory
+
+from planets.models import Planet
+from planets.views import PlanetImport
+
+
+def ndjson(*items):
+    return b"".join(
+        (item if isinstance(item, bytes) else json.dumps(item).encode()) + b"\n" for item in items
+    )
+
+
+@pytest.mark.django_db
+def test_import_planets(client, add_planet, add_terrain, django_assert_num_queries):
+    """
+    Test case to verify that the planets of an NDJSON body are upserted in batches with their terrains and climates.
+    """
+    add_planet(name="Earth", population=1)
+    add_terrain(name="Desert")
+    body = ndjson(
+        {"name": "Earth", "population": 8_100_000_000, "terrains": ["desert", "ocean"]},
+        {"name": "Mars", "terrains": [{"id": 9, "name": "desert"}], "climates": ["arid"]},
+        b"",
+        {"name": "Venus", "population": None, "climates": ["arid"]},
+    )
+    resp = client.post("/api/planets/import/?batch_size=2", body, content_type="application/x-ndjson")
+
+    assert resp.status_code == 200
+    assert resp.data == {
+        "lines": 3, "imported": 3, "failed": 0, "batches": 2, "errors": [], "errors_truncated": False,
+        "inserted": 2, "updated": 1, "unchanged": 0, "terrains_inserted": 1, "climates_inserted": 1,
+    }
+    earth = Planet.objects.get(name="Earth")
+    assert earth.population == 8_100_000_000
+    assert sorted(terrain.name for terrain in earth.terrains.all()) == ["Desert", "ocean"]
+    assert [climate.name for climate in Planet.objects.get(name="Venus").climates.all()] == ["arid"]
+
+
+@pytest.mark.django_db
+def test_import_counts_repeated_names_once(client):
+    """
+    Test case to verify that a planet repeated within a batch is imported once, with its last line.
+    """
+    body = ndjson(
+        {"name": "Mars", "population": 1},
+        {"name": "Venus"},
+        {"name": "Mars", "population": 2},
+    )
+    resp = client.post("/api/planets/import/", body, content_type="application/x-ndjson")
+
+    assert resp.status_code == 200
+    assert (resp.data["lines"], resp.data["imported"], resp.data["inserted"]) == (3, 2, 2)
+    assert Planet.objects.get(name="Mars").population == 2
+
+
+@pytest.mark.django_db
+def test_import_reports_invalid_lines(client, settings):
+    """
+    Test case to verify that invalid lines are skipped and reported with their line number.
+    """
+    settings.PLANETS_IMPORT_MAX_ERRORS = 2
+    body = ndjson(
+        {"name": "Mars"},
+        b'{"name": ',
+        {"population": 12},
+        {"name": "Venus", "terrains": [""]},
+        [1, 2],
+    )
+    resp = client.post("/api/planets/import/", body, content_type="application/x-ndjson")
+
+    assert resp.status_code == 207
+    assert (resp.data["imported"], resp.data["failed"], resp.data["errors_truncated"]) == (1, 4, True)
+    assert resp.data["errors"][0]["line"] == 2
+    assert resp.data["errors"][0]["errors"]["detail"].startswith("JSON parse error - ")
+    assert resp.data["errors"][1] == {"line": 3, "errors": {"name": ["This field is required."]}}
+    assert list(Planet.objects.values_list("name", flat=True)) == ["Mars"]
+
+    resp = client.post("/api/planets/import/", ndjson({"name": ""}), content_type="application/x-ndjson")
+    assert resp.status_code == 400
+    assert resp.data["errors"] == [{"line": 1, "errors": {"name": ["This field may not be blank."]}}]
+
+
+@pytest.mark.django_db
+def test_import_rejects_other_bodies(client):
+    """
+    Test case to verify that empty bodies and other media types are rejected.
+    """
+    resp = client.post("/api/planets/import/", b"\n", content_type="application/x-ndjson")
+    assert resp.status_code == 400
+    assert resp.data == {"detail": "Expected planets, one per line."}
+
+    resp = client.post("/api/planets/import/", [{"name": "Mars"}], content_type="application/json")
+    assert resp.status_code == 415
+
+
+@pytest.mark.django_db
+def test_import_chunked_body():
+    """
+    Test case to verify that a body without a Content-Length, as sent chunked, is read from the server input.
+    """
+    body = ndjson(*({"name": f"Planet {index}"} for index in range(5)))
+    request = RequestFactory().post("/api/planets/import/")
+    request.environ.update({
+        "CONTENT_TYPE": "application/x-ndjson",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.input_terminated": True,
+    })
+    del request.META["CONTENT_LENGTH"]
+
+    resp = PlanetImport.as_view()(request)
+    assert resp.status_code == 200
+    assert resp.data["inserted"] == 5
+    assert Planet.objects.count() == 5
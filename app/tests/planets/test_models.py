@@ -1,8 +1,12 @@
 import pytest
+from django.db import IntegrityError
+from django.db import transaction
 
 from planets.models import Climate
 from planets.models import Planet
+from planets.models import PlanetQuerySet
 from planets.models import Terrain
+from planets.models import TerrainStats
 
 
 @pytest.mark.django_db
@@ -58,3 +62,46 @@ def test_planet_model_with_two_climates():
     assert planet.name == "Mars"
     assert planet.population == None
     assert planet.climates.count() == 2
+
+
+@pytest.mark.django_db
+def test_names_are_unique():
+    """
+    Test case to verify that planet names are unique, and terrain and climate names are unique regardless of their case.
+    """
+    Planet.objects.create(name="Mars")
+    Terrain.objects.create(name="desert")
+    Climate.objects.create(name="arid")
+
+    for model, name in ((Planet, "Mars"), (Terrain, "Desert"), (Climate, "ARID")):
+        with pytest.raises(IntegrityError), transaction.atomic():
+            model.objects.create(name=name)
+    Planet.objects.create(name="mars")
+
+
+@pytest.mark.django_db
+def test_upsert_updates_planets_inserted_concurrently(monkeypatch):
+    """
+    Test case to verify that a planet inserted by someone else during an upsert is updated with a new version and its stats.
+    """
+    desert = Terrain.objects.create(name="desert")
+    values_list = PlanetQuerySet.values_list
+    versions = []
+
+    def insert_after_lookup(queryset, *fields, **kwargs):
+        rows = list(values_list(queryset, *fields, **kwargs))
+        if not versions:
+            Planet.objects.create(name="Hoth", population=10).terrains.add(desert)
+            versions.append(Planet.objects.get(name="Hoth").version)
+        return rows
+
+    with monkeypatch.context() as patch:
+        patch.setattr(PlanetQuerySet, "values_list", insert_after_lookup)
+        new, changed = Planet.objects.upsert(
+            [Planet(name="Tatooine", population=1), Planet(name="Hoth", population=20)], ["population"]
+        )
+
+    assert ([planet.name for planet in new], [planet.name for planet in changed]) == (["Tatooine"], ["Hoth"])
+    hoth = Planet.objects.get(name="Hoth")
+    assert (hoth.population, hoth.version) == (20, versions[0] + 1)
+    assert TerrainStats.objects.get(terrain=desert).population_total == 20
@@ -0,0 +1,443 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from benchmarks.fake_graphql import make_planets
+from planets.loaders import PlanetLoader
+from planets.management.commands.populate import Command
+from planets.models import Climate
+from planets.models import Planet
+from planets.models import Terrain
+
+
+PLANETS = [
+    {"name": "Tatooine", "population": 200000.0, "terrains": ["desert"], "climates": ["arid"]},
+    {"name": "Hoth", "population": None, "terrains": ["tundra", "ice caves"], "climates": ["frozen"]},
+    {"name": "Naboo", "population": 4500000000.0, "terrains": ["grassy hills"], "climates": ["temperate"]},
+]
+
+
+def populate(monkeypatch, planets, *args):
+    """
+    Run the populate command against the given planets instead of the GraphQL API.
+
+    Returns:
+        str: The output of the command.
+    """
+    monkeypatch.setattr(Command, "get_planets", lambda self, **kwargs: iter(planets))
+    out = StringIO()
+    call_command("populate", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_populate_inserts_planets(monkeypatch):
+    """
+    Test case to verify that populate inserts the planets, their terrains and climates.
+
+    Args:
+        monkeypatch: Fixture to replace the GraphQL query.
+
+    Returns:
+        None
+    """
+    out = populate(monkeypatch, PLANETS)
+
+    assert "Planets: 3 inserted, 0 updated, 0 unchanged, 0 deleted." in out
+    assert "Terrains: 4 inserted. Climates: 3 inserted." in out
+    hoth = Planet.objects.get(name="Hoth")
+    assert hoth.population is None
+    assert sorted(hoth.terrains.values_list("name", flat=True)) == ["ice caves", "tundra"]
+    assert Planet.objects.get(name="Naboo").population == 4_500_000_000
+    assert Terrain.objects.count() == 4
+    assert Climate.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_populate_updates_and_counts_unchanged(monkeypatch):
+    """
+    Test case to verify that a second run updates changed planets and leaves the others alone.
+
+    Args:
+        monkeypatch: Fixture to replace the GraphQL query.
+
+    Returns:
+        None
+    """
+    populate(monkeypatch, PLANETS)
+    tatooine = Planet.objects.get(name="Tatooine")
+    planets = [
+        {**PLANETS[0], "population": 300000},
+        {**PLANETS[1], "climates": ["frozen", "windy"]},
+        PLANETS[2],
+        {"name": "Dagobah", "population": None, "terrains": ["swamp"], "climates": []},
+    ]
+
+    out = populate(monkeypatch, planets, "--batch-size", "2")
+
+    assert "Planets: 1 inserted, 2 updated, 1 unchanged, 0 deleted." in out
+    assert "Terrains: 1 inserted. Climates: 1 inserted." in out
+    tatooine.refresh_from_db()
+    assert tatooine.population == 300_000
+    assert tatooine.version == 2
+    assert Planet.objects.get(name="Hoth").version == 2
+    assert Planet.objects.get(name="Naboo").version == 1
+    assert Planet.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_loader_query_count_does_not_grow_with_batch(django_assert_num_queries):
+    """
+    Test case to verify that a batch is written with the same number of queries whatever its size.
+
+    Args:
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    for size in (10, 100):
+        planets = [
+            {"name": f"Planet {size} {index}", "population": index,
+             "terrains": ["desert", f"t{size} {index}"], "climates": [f"c{size} {index}"]}
+            for index in range(size)
+        ]
+        loader = PlanetLoader(batch_size=1000)
+
+        # Planets: select, upsert and read back the new ids. Per relation:
+        # select, insert and read back the names, select and insert the
+        # links, then create and update the stats rows. Then the denormalized
+        # names: select the links of each relation and update the planets.
+        with django_assert_num_queries(3 + 2 * 7 + 3):
+            loader.load(planets)
+        assert loader.stats["inserted"] == size
+
+    assert Planet.objects.get(name="Planet 100 99").terrains.count() == 2
+
+
+@pytest.mark.django_db
+def test_loader_matches_terrains_and_climates_regardless_of_case(add_terrain):
+    """
+    Test case to verify that the loader reuses terrains and climates whose names differ only by case.
+
+    Args:
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    desert = add_terrain("Desert")
+    loader = PlanetLoader()
+
+    loader.load([
+        {"name": "Tatooine", "terrains": ["desert"], "climates": ["Arid"]},
+        {"name": "Jakku", "terrains": ["DESERT"], "climates": ["arid"]},
+    ])
+
+    assert loader.stats["terrains_inserted"] == 0
+    assert loader.stats["climates_inserted"] == 1
+    assert list(Planet.objects.get(name="Jakku").terrains.all()) == [desert]
+    assert list(Climate.objects.values_list("name", flat=True)) == ["Arid"]
+
+
+@pytest.mark.django_db
+def test_populate_from_ndjson_file(tmp_path):
+    """
+    Test case to verify that populate reads planets from an NDJSON file, skipping blank lines.
+
+    Args:
+        tmp_path: Fixture providing a temporary directory.
+
+    Returns:
+        None
+    """
+    source = tmp_path / "planets.ndjson"
+    source.write_text("\n".join(json.dumps(planet) for planet in PLANETS) + "\n\n")
+    out = StringIO()
+
+    call_command("populate", "--source", str(source), "--batch-size", "2", stdout=out)
+
+    assert "Planets: 3 inserted, 0 updated, 0 unchanged, 0 deleted." in out.getvalue()
+    assert Planet.objects.get(name="Tatooine").terrains.get().name == "desert"
+
+
+@pytest.mark.django_db
+def test_populate_from_json_files(tmp_path):
+    """
+    Test case to verify that populate reads a JSON list of planets and a saved GraphQL response.
+
+    Args:
+        tmp_path: Fixture providing a temporary directory.
+
+    Returns:
+        None
+    """
+    planets = tmp_path / "planets.json"
+    planets.write_text(json.dumps(PLANETS[:1]))
+    response = tmp_path / "response.json"
+    response.write_text(json.dumps({"data": {"allPlanets": {"planets": PLANETS}}}))
+
+    call_command("populate", "--source", str(planets), stdout=StringIO())
+    assert Planet.objects.count() == 1
+
+    out = StringIO()
+    call_command("populate", "--source", str(response), stdout=out)
+    assert "Planets: 2 inserted, 0 updated, 1 unchanged, 0 deleted." in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_populate_from_stdin():
+    """
+    Test case to verify that populate reads NDJSON from the standard input with `--source -`.
+    """
+    stdin = StringIO("\n".join(json.dumps(planet) for planet in PLANETS))
+
+    call_command("populate", "--source", "-", stdin=stdin, stdout=StringIO())
+
+    assert Planet.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_populate_from_invalid_file(tmp_path):
+    """
+    Test case to verify that an invalid line aborts populate without writing anything.
+
+    Args:
+        tmp_path: Fixture providing a temporary directory.
+
+    Returns:
+        None
+    """
+    source = tmp_path / "planets.ndjson"
+    source.write_text(json.dumps(PLANETS[0]) + "\n{not json\n")
+
+    with pytest.raises(CommandError, match="Line 2"):
+        call_command("populate", "--source", str(source), "--batch-size", "1", stdout=StringIO())
+    assert Planet.objects.count() == 0
+
+    source.write_text(json.dumps({"population": 1}) + "\n")
+    with pytest.raises(CommandError, match="Record 1: expected a planet with a name"):
+        call_command("populate", "--source", str(source), stdout=StringIO())
+
+    with pytest.raises(CommandError, match="Cannot read"):
+        call_command("populate", "--source", str(tmp_path / "missing.ndjson"), stdout=StringIO())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("population", ["unknown", "1,000", True, [1], 1e30])
+def test_populate_from_file_with_invalid_population(tmp_path, population):
+    """
+    Test case to verify that a record with an invalid population aborts populate, naming the record, without writing anything.
+
+    Args:
+        tmp_path: Fixture providing a temporary directory.
+        population: The invalid population of the second record.
+
+    Returns:
+        None
+    """
+    source = tmp_path / "planets.ndjson"
+    source.write_text(json.dumps(PLANETS[0]) + "\n" + json.dumps({"name": "Yavin IV", "population": population}) + "\n")
+
+    with pytest.raises(CommandError, match="Record 2: expected a number or null as population"):
+        call_command("populate", "--source", str(source), "--batch-size", "1", stdout=StringIO())
+    assert Planet.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_incremental_rerun_reads_only(django_assert_num_queries):
+    """
+    Test case to verify that an incremental run over unchanged data costs one read query per batch.
+
+    Args:
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    PlanetLoader(incremental=True).load(PLANETS)
+    versions = dict(Planet.objects.values_list("name", "version"))
+
+    loader = PlanetLoader(batch_size=2, incremental=True)
+    with django_assert_num_queries(2):
+        loader.load([{**planet, "terrains": planet["terrains"][::-1]} for planet in PLANETS])
+
+    assert loader.stats["unchanged"] == 3
+    assert loader.stats["inserted"] == loader.stats["updated"] == 0
+    assert dict(Planet.objects.values_list("name", "version")) == versions
+
+
+@pytest.mark.django_db
+def test_incremental_syncs_changed_planets_exactly():
+    """
+    Test case to verify that an incremental run rewrites changed planets and removes their extra links.
+    """
+    PlanetLoader(incremental=True).load(PLANETS)
+    planets = [
+        {**PLANETS[0], "terrains": ["dunes"], "climates": ["arid", "hot"]},
+        PLANETS[1],
+        PLANETS[2],
+    ]
+
+    stats = PlanetLoader(incremental=True).load(planets)
+
+    assert stats["updated"] == 1
+    assert stats["unchanged"] == 2
+    tatooine = Planet.objects.get(name="Tatooine")
+    assert list(tatooine.terrains.values_list("name", flat=True)) == ["dunes"]
+    assert list(tatooine.climates.values_list("name", flat=True)) == ["arid", "hot"]
+    assert tatooine.version == 2
+    assert Planet.objects.get(name="Hoth").version == 1
+
+
+@pytest.mark.django_db
+def test_incremental_rewrites_planets_changed_locally(add_terrain):
+    """
+    Test case to verify that a planet changed outside the sync is rewritten by the next incremental run.
+
+    Args:
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    PlanetLoader(incremental=True).load(PLANETS)
+    hoth = Planet.objects.get(name="Hoth")
+    hoth.population = 5
+    hoth.save()
+    Planet.objects.get(name="Naboo").terrains.add(add_terrain(name="lava"))
+
+    stats = PlanetLoader(incremental=True).load(PLANETS)
+
+    assert stats["updated"] == 2
+    assert Planet.objects.get(name="Hoth").population is None
+    assert list(Planet.objects.get(name="Naboo").terrains.values_list("name", flat=True)) == [
+        "grassy hills"
+    ]
+
+
+@pytest.mark.django_db
+def test_populate_incremental_prune(monkeypatch):
+    """
+    Test case to verify that `--prune` deletes the planets missing from the source.
+
+    Args:
+        monkeypatch: Fixture to replace the GraphQL query.
+
+    Returns:
+        None
+    """
+    populate(monkeypatch, PLANETS, "--incremental")
+
+    out = populate(monkeypatch, PLANETS[:2], "--incremental", "--prune")
+
+    assert "Planets: 0 inserted, 0 updated, 2 unchanged, 1 deleted." in out
+    assert sorted(Planet.objects.values_list("name", flat=True)) == ["Hoth", "Tatooine"]
+
+    with pytest.raises(CommandError, match="refusing to prune"):
+        populate(monkeypatch, [], "--incremental", "--prune")
+    assert Planet.objects.count() == 2
+
+
+def call_populate(*args):
+    """
+    Run the populate command with the given arguments.
+
+    Returns:
+        str: The output of the command.
+    """
+    out = StringIO()
+    call_command("populate", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_populate_fetches_pages_concurrently(fake_graphql):
+    """
+    Test case to verify that populate fetches every page, several at a time.
+
+    Args:
+        fake_graphql: Fixture to start a local GraphQL API.
+
+    Returns:
+        None
+    """
+    server = fake_graphql(make_planets(95), latency=0.05)
+
+    out = call_populate("--url", server.url, "--page-size", "10", "--concurrency", "4")
+
+    assert "Planets: 95 inserted" in out
+    assert Planet.objects.count() == 95
+    assert len(server.requests) == 10
+    assert all(variables["first"] == 10 for variables in server.requests)
+    assert 1 < server.max_in_flight <= 4
+    planet = Planet.objects.get(name="Planet 94")
+    assert planet.population == 94000
+    assert sorted(planet.terrains.values_list("name", flat=True)) == [
+        "terrain 14", "terrain 15", "terrain 16",
+    ]
+
+
+@pytest.mark.django_db
+def test_populate_follows_opaque_cursors(fake_graphql):
+    """
+    Test case to verify that populate falls back to fetching one page after the other when the cursors are opaque.
+
+    Args:
+        fake_graphql: Fixture to start a local GraphQL API.
+
+    Returns:
+        None
+    """
+    server = fake_graphql(make_planets(25), latency=0.01, opaque_cursors=True)
+
+    call_populate("--url", server.url, "--page-size", "10")
+
+    assert Planet.objects.count() == 25
+    assert len(server.requests) == 3
+    assert server.max_in_flight == 1
+
+
+@pytest.mark.django_db
+def test_populate_retries_failed_requests(monkeypatch, fake_graphql):
+    """
+    Test case to verify that populate retries the requests the API failed to answer.
+
+    Args:
+        monkeypatch: Fixture to shorten the backoff.
+        fake_graphql: Fixture to start a local GraphQL API.
+
+    Returns:
+        None
+    """
+    monkeypatch.setattr(Command, "backoff", 0.01)
+    server = fake_graphql(make_planets(30), failures=2)
+
+    call_populate("--url", server.url, "--page-size", "10", "--retries", "2")
+
+    assert Planet.objects.count() == 30
+    assert len(server.requests) == 3 + 2
+
+
+@pytest.mark.django_db
+def test_populate_fails_when_retries_are_exhausted(monkeypatch, fake_graphql):
+    """
+    Test case to verify that populate stops with an error, and writes nothing, when a page cannot be fetched.
+
+    Args:
+        monkeypatch: Fixture to shorten the backoff.
+        fake_graphql: Fixture to start a local GraphQL API.
+
+    Returns:
+        None
+    """
+    monkeypatch.setattr(Command, "backoff", 0.01)
+    server = fake_graphql(make_planets(30), failures=3)
+
+    with pytest.raises(CommandError, match="Error"):
+        call_populate("--url", server.url, "--page-size", "10", "--retries", "1")
+
+    assert Planet.objects.count() == 0
@@ -0,0 +1,138 @@
+import pytest
+from django.http import QueryDict
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from planets.models import Planet
+from planets.serializers import PlanetReadSerializer
+from planets.serializers import PlanetSerializer
+
+
+@pytest.fixture(scope="function")
+def catalogue(add_planet, add_terrain, add_climate):
+    """
+    Fixture that adds a few planets covering the shapes the serializers must agree on.
+
+    Returns:
+        list: The created planet objects.
+    """
+    desert = add_terrain(name="desert")
+    mountain = add_terrain(name="mountain")
+    ocean = add_terrain(name="océan")
+    arid = add_climate(name="arid")
+    frozen = add_climate(name="frozen cold")
+
+    earth = add_planet(name="Earth", population=8_100_000_000)
+    earth.terrains.add(ocean, desert, mountain)
+    earth.climates.add(arid)
+    mars = add_planet(name="Mars")
+    mars.terrains.add(desert)
+    mars.climates.add(frozen, arid)
+    empty = add_planet(name="Ĥoth", population=0)
+    return [earth, mars, empty]
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_read_serializer_many_is_byte_identical(catalogue):
+    """
+    Test case to verify that a list of planets renders to the same bytes with both serializers.
+    """
+    expected = render(PlanetSerializer(Planet.objects.all(), many=True).data)
+    planets = Planet.objects.values(*PlanetReadSerializer.fields)
+    assert render(PlanetReadSerializer(planets, many=True).data) == expected
+
+
+@pytest.mark.django_db
+def test_read_serializer_single_is_byte_identical(catalogue):
+    """
+    Test case to verify that each planet renders to the same bytes with both serializers.
+    """
+    for planet in catalogue:
+        expected = render(PlanetSerializer(planet).data)
+        row = Planet.objects.values(*PlanetReadSerializer.fields).get(pk=planet.pk)
+        assert render(PlanetReadSerializer(row).data) == expected
+
+
+@pytest.mark.django_db
+def test_read_serializer_accepts_model_querysets(catalogue):
+    """
+    Test case to verify that a queryset of model instances is read as rows.
+    """
+    expected = render(PlanetSerializer(Planet.objects.all(), many=True).data)
+    assert render(PlanetReadSerializer(Planet.objects.all(), many=True).data) == expected
+
+
+@pytest.mark.django_db
+def test_read_serializer_nested_objects_are_ordered_by_id(catalogue):
+    """
+    Test case to verify that nested terrains are ordered by id whatever the order they were added in.
+    """
+    earth = catalogue[0]
+    data = PlanetReadSerializer(Planet.objects.filter(pk=earth.pk), many=True).data
+    assert [terrain["name"] for terrain in data[0]["terrains"]] == ["desert", "mountain", "océan"]
+
+
+@pytest.mark.django_db
+def test_read_serializer_query_count(catalogue, django_assert_num_queries):
+    """
+    Test case to verify that the serializer reads the denormalized columns, or each relation with a single query when joined.
+    """
+    planets = list(Planet.objects.values(*PlanetReadSerializer.fields))
+    with django_assert_num_queries(0):
+        denormalized = PlanetReadSerializer(planets, many=True).data
+    with django_assert_num_queries(2):
+        joined = PlanetReadSerializer(planets, many=True, joined=True).data
+    assert render(denormalized) == render(joined)
+
+
+@pytest.mark.django_db
+def test_read_serializer_empty_list(django_assert_num_queries):
+    """
+    Test case to verify that serializing no planets returns an empty list without extra queries.
+    """
+    with django_assert_num_queries(0):
+        assert PlanetReadSerializer([], many=True).data == []
+
+
+def test_read_serializer_parse_fields():
+    """
+    Test case to verify that `?fields=` and `?expand=` select fields in representation order, and reject unknown ones.
+    """
+    parse = PlanetReadSerializer.parse_fields
+    assert parse(QueryDict("")) is None
+    assert parse(QueryDict("expand=terrains")) is None
+    assert parse(QueryDict("fields=name,id")) == ("id", "name")
+    assert parse(QueryDict("fields=name&expand=climates,terrains")) == ("name", "terrains", "climates")
+    with pytest.raises(ValidationError):
+        parse(QueryDict("fields=id,mass"))
+    with pytest.raises(ValidationError):
+        parse(QueryDict("fields=id&expand=name"))
+    with pytest.raises(ValidationError):
+        parse(QueryDict("fields="))
+
+    assert PlanetReadSerializer.columns(("name",)) == ("id", "name")
+    assert PlanetReadSerializer.columns(("id", "terrains")) == ("id", "terrain_names")
+
+
+@pytest.mark.django_db
+def test_read_serializer_sparse_fields(catalogue, django_assert_num_queries):
+    """
+    Test case to verify that only the requested fields are read and serialized, and unrequested relations are not queried.
+    """
+    earth = catalogue[0]
+    fields = ("id", "name", "terrains")
+    expected = {key: value for key, value in PlanetSerializer(earth).data.items() if key in fields}
+    with django_assert_num_queries(1):
+        rows = Planet.objects.filter(pk=earth.pk).values(*PlanetReadSerializer.columns(fields))
+        assert PlanetReadSerializer(rows, many=True, fields=fields).data == [expected]
+
+    planets = list(Planet.objects.values("id", "name"))
+    with django_assert_num_queries(0):
+        data = PlanetReadSerializer(planets, many=True, joined=True, fields=("id", "name")).data
+    assert data[0] == {"id": earth.pk, "name": "Earth"}
+    with django_assert_num_queries(1):
+        PlanetReadSerializer(planets, many=True, joined=True, fields=("name", "climates")).data
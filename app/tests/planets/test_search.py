@@ -0,0 +1,103 @@
+import pytest
+
+from planets.models import Planet
+from planets.search import fts_query
+from planets.search import search_planets
+
+
+def search_names(query, limit=10):
+    return [planet["name"] for planet in search_planets(query, limit)]
+
+
+def test_fts_query():
+    """
+    Test case to verify that searches become FTS5 prefix queries, without FTS5 syntax leaking in.
+    """
+    assert fts_query("tat") == '"tat"*'
+    assert fts_query('Coruscant "pri') == '"Coruscant"* "pri"*'
+    assert fts_query("NOT -*") == '"NOT"*'
+    assert fts_query(" -* ") == ""
+
+
+@pytest.mark.django_db
+def test_search_ranks_prefix_matches_first(add_planet):
+    """
+    Test case to verify that the names starting with the search come before the other matches, whatever the case.
+
+    Args:
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    for name in ("Polis Massa", "Tatooine", "Taris", "Mustafar", "Mon Cala", "Toydaria"):
+        add_planet(name=name)
+
+    assert search_names("ta") == ["Taris", "Tatooine"]
+    assert search_names("ma")[0] == "Polis Massa"
+    assert search_names("mo") == ["Mon Cala"]
+    assert search_names("mon c") == ["Mon Cala"]
+    assert search_names("MUST") == ["Mustafar"]
+    assert search_names("zz") == []
+    assert search_names("t", limit=1) == ["Taris"]
+
+
+@pytest.mark.django_db
+def test_search_follows_writes(add_planet):
+    """
+    Test case to verify that the search index follows inserts, renames, bulk writes and deletes.
+
+    Args:
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    hoth = add_planet(name="Hoth")
+    assert search_names("ho") == ["Hoth"]
+
+    hoth.name = "Echo Base"
+    hoth.save()
+    assert search_names("ho") == []
+    assert search_names("echo") == ["Echo Base"]
+
+    Planet.objects.filter(pk=hoth.pk).update(name="Hoth")
+    Planet.objects.upsert([Planet(name="Hosnian Prime", population=1)], ["population"])
+    assert sorted(search_names("ho")) == ["Hosnian Prime", "Hoth"]
+
+    Planet.objects.filter(name="Hoth").delete()
+    assert search_names("ho") == ["Hosnian Prime"]
+
+
+@pytest.mark.django_db
+def test_search_endpoint(client, add_planet, django_assert_num_queries):
+    """
+    Test case to verify that the search endpoint returns the ranked matches with one query.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    tatooine = add_planet(name="Tatooine", population=200_000)
+    add_planet(name="Taris")
+
+    with django_assert_num_queries(1):
+        resp = client.get("/api/planets/search/?q=tat")
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == 1
+    result = resp.data["results"][0]
+    assert result["id"] == tatooine.id
+    assert result["name"] == "Tatooine"
+    assert result["population"] == 200_000
+    assert result["score"] > 0
+
+    resp = client.get("/api/planets/search/?q=ta&limit=1")
+    assert [planet["name"] for planet in resp.data["results"]] == ["Taris"]
+
+    resp = client.get("/api/planets/search/?q=%20")
+    assert resp.status_code == 400
+    assert resp.data == {"q": ["This field is required."]}
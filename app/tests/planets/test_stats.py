@@ -0,0 +1,207 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from planets import stats
+from planets.loaders import PlanetLoader
+from planets.models import Climate
+from planets.models import Planet
+from planets.models import Terrain
+from planets.models import TerrainStats
+
+
+def stored(model, name):
+    """
+    Read the stored stats of a terrain or climate.
+
+    Returns:
+        tuple: The planet count, populated count and population total.
+    """
+    row = model.objects.filter(name=name).values_list(
+        "stats__planet_count", "stats__populated_count", "stats__population_total"
+    ).get()
+    return tuple(value or 0 for value in row)
+
+
+@pytest.mark.django_db
+def test_stats_follow_links(add_planet, add_terrain):
+    """
+    Test case to verify that adding, removing and clearing links from both sides updates the stats with deltas.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    desert = add_terrain("desert")
+    tundra = add_terrain("tundra")
+    tatooine = add_planet(name="Tatooine", population=200_000)
+    jakku = add_planet(name="Jakku")
+    hoth = add_planet(name="Hoth", population=10)
+
+    tatooine.terrains.add(desert, tundra)
+    desert.planets.add(jakku, hoth)
+    assert stored(Terrain, "desert") == (3, 2, 200_010)
+    assert stored(Terrain, "tundra") == (1, 1, 200_000)
+
+    tatooine.terrains.remove(desert)
+    desert.planets.remove(tatooine, hoth)
+    jakku.terrains.remove(tundra)
+    assert stored(Terrain, "desert") == (1, 0, 0)
+
+    tundra.planets.add(hoth)
+    tundra.planets.clear()
+    jakku.terrains.clear()
+    hoth.terrains.set([desert, tundra])
+    assert stored(Terrain, "desert") == (1, 1, 10)
+    assert stored(Terrain, "tundra") == (1, 1, 10)
+    assert stats.drift() == []
+
+
+@pytest.mark.django_db
+def test_stats_follow_planet_writes(add_planet, add_terrain, add_climate):
+    """
+    Test case to verify that population changes and deletions of planets, terrains and climates update the stats.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        add_climate: Fixture to add a climate.
+
+    Returns:
+        None
+    """
+    desert = add_terrain("desert")
+    arid = add_climate("arid")
+    tatooine = add_planet(name="Tatooine", population=200_000)
+    jakku = add_planet(name="Jakku", population=100)
+    for planet in (tatooine, jakku):
+        planet.terrains.add(desert)
+        planet.climates.add(arid)
+
+    tatooine.population = 300_000
+    tatooine.save()
+    jakku.population = None
+    jakku.save(update_fields=["population"])
+    tatooine.name = "Tatooine I"
+    tatooine.save(update_fields=["name"])
+    assert stored(Terrain, "desert") == (2, 1, 300_000)
+    assert stored(Climate, "arid") == (2, 1, 300_000)
+
+    Planet.objects.upsert([Planet(name="Jakku", population=50)], ["population"])
+    assert stored(Climate, "arid") == (2, 2, 300_050)
+
+    tatooine.delete()
+    assert stored(Terrain, "desert") == (1, 1, 50)
+    Planet.objects.filter(name="Jakku").delete()
+    assert stored(Climate, "arid") == (0, 0, 0)
+
+    desert.delete()
+    assert not TerrainStats.objects.exists()
+    assert stats.drift() == []
+
+
+@pytest.mark.django_db
+def test_stats_follow_loader_and_bulk_endpoint(client):
+    """
+    Test case to verify that the set-based writes of the loader and the bulk endpoint keep the stats exact.
+
+    Args:
+        client: Django test client object.
+
+    Returns:
+        None
+    """
+    loader = PlanetLoader(incremental=True, track_names=True)
+    loader.load([
+        {"name": "Tatooine", "population": 200_000, "terrains": ["desert"], "climates": ["arid"]},
+        {"name": "Hoth", "population": None, "terrains": ["tundra", "ice caves"], "climates": ["frozen"]},
+    ])
+    assert stored(Terrain, "desert") == (1, 1, 200_000)
+
+    loader = PlanetLoader(incremental=True, track_names=True)
+    loader.load([
+        {"name": "Tatooine", "population": 300_000, "terrains": ["desert", "tundra"], "climates": []},
+        {"name": "Jakku", "population": 5, "terrains": ["desert"], "climates": ["arid"]},
+    ])
+    loader.prune()
+    assert stored(Terrain, "desert") == (2, 2, 300_005)
+    assert stored(Terrain, "tundra") == (1, 1, 300_000)
+    assert stored(Climate, "arid") == (1, 1, 5)
+    assert stats.drift() == []
+
+    jakku = Planet.objects.get(name="Jakku")
+    client.patch("/api/planets/bulk/", [{"id": jakku.id, "population": 7}], content_type="application/json")
+    client.post("/api/planets/bulk/", [{"name": "Tatooine", "population": 1}], content_type="application/json")
+    assert stored(Terrain, "desert") == (2, 2, 8)
+    client.delete("/api/planets/bulk/", [jakku.id], content_type="application/json")
+    assert stored(Terrain, "desert") == (1, 1, 1)
+    assert stats.drift() == []
+
+
+@pytest.mark.django_db
+def test_stats_endpoint(client, add_planet, add_terrain, add_climate, django_assert_num_queries):
+    """
+    Test case to verify that the stats endpoint reads the summary tables with one query per relation.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        add_climate: Fixture to add a climate.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    desert = add_terrain("desert")
+    add_terrain("swamp")
+    arid = add_climate("arid")
+    for name, population in (("Tatooine", 200_000), ("Jakku", 100), ("Ord Mantell", None)):
+        planet = add_planet(name=name, population=population)
+        planet.terrains.add(desert)
+        planet.climates.add(arid)
+
+    with django_assert_num_queries(2):
+        resp = client.get("/api/planets/stats/")
+    assert resp.status_code == 200
+    assert resp.data["terrains"] == [
+        {"id": desert.id, "name": "desert", "planets": 3, "population": 200_100, "average_population": 100_050},
+        {"id": desert.id + 1, "name": "swamp", "planets": 0, "population": 0, "average_population": None},
+    ]
+    assert resp.data["climates"][0]["planets"] == 3
+
+
+@pytest.mark.django_db
+def test_rebuild_stats_command(add_planet, add_terrain):
+    """
+    Test case to verify that the rebuild_stats command reports drift, fails on it with --check, and fixes it.
+
+    Args:
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+
+    Returns:
+        None
+    """
+    desert = add_terrain("desert")
+    add_planet(name="Tatooine", population=200_000).terrains.add(desert)
+    out = StringIO()
+    call_command("rebuild_stats", "--check", stdout=out)
+    assert "No drift." in out.getvalue()
+
+    # Writes bypassing the ORM are not counted.
+    Planet.objects.filter(name="Tatooine").update(population=1)
+    with pytest.raises(CommandError, match="1 stats rows drifted"):
+        call_command("rebuild_stats", "--check", stdout=StringIO())
+
+    out = StringIO()
+    call_command("rebuild_stats", stdout=out)
+    assert f"terrains {desert.id}: stored (planets, populated, population) (1, 1, 200000), expected (1, 1, 1)" in out.getvalue()
+    assert "1 stats rows drifted. 1 stats rows rebuilt." in out.getvalue()
+    assert stored(Terrain, "desert") == (1, 1, 1)
+    assert stats.drift() == []
@@ -1,8 +1,10 @@
 import json
 
 import pytest
+from rest_framework.request import Request
 
 from planets.models import Planet
+from planets.pagination import PlanetCursorPagination
 
 
 @pytest.mark.django_db
@@ -39,6 +41,35 @@ def test_add_planet(client):
     assert len(planets) == 1
 
 
+@pytest.mark.django_db
+def test_add_planet_with_existing_name_updates_it(client, add_planet):
+    """
+    Test case to verify that adding a planet with the name of an existing one updates it instead.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture for adding a planet to the database.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth", population=8_100_000_000)
+
+    resp = client.post(
+        "/api/planets/",
+        {"name": "Earth", "population": 8_300_000_000},
+        content_type="application/json"
+    )
+    assert resp.status_code == 200
+    assert resp.data["id"] == planet.id
+    assert resp.data["population"] == 8_300_000_000
+
+    planet.refresh_from_db()
+    assert planet.population == 8_300_000_000
+    assert planet.version == 2
+    assert Planet.objects.count() == 1
+
+
 @pytest.mark.django_db
 def test_add_planet_invalid_json(client):
     """
@@ -140,8 +171,8 @@ def test_get_all_planets(client, add_planet):
     planet_two = add_planet(name="Mars")
     resp = client.get(f"/api/planets/")
     assert resp.status_code == 200
-    assert resp.data[0]["name"] == planet_one.name
-    assert resp.data[1]["name"] == planet_two.name
+    assert resp.data["results"][0]["name"] == planet_one.name
+    assert resp.data["results"][1]["name"] == planet_two.name
 
 
 @pytest.mark.django_db
@@ -170,7 +201,7 @@ def test_remove_planet(client, add_planet):
 
     resp_three = client.get("/api/planets/")
     assert resp_three.status_code == 200
-    assert len(resp_three.data) == 0
+    assert len(resp_three.data["results"]) == 0
 
 
 @pytest.mark.django_db
@@ -220,6 +251,32 @@ def test_update_planet(client, add_planet):
     assert resp.data["population"] == 8_300_000_000
 
 
+@pytest.mark.django_db
+def test_update_planet_with_taken_name(client, add_planet):
+    """
+    Test case to verify that renaming a planet to the name of another one returns a 400 status code.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture for adding a planet to the database.
+
+    Returns:
+        None
+    """
+    add_planet(name="Earth")
+    mars = add_planet(name="Mars")
+
+    resp = client.put(
+        f"/api/planets/{mars.id}/",
+        {"name": "Earth"},
+        content_type="application/json"
+    )
+    assert resp.status_code == 400
+    assert resp.data == {"name": ["planet with this name already exists."]}
+    mars.refresh_from_db()
+    assert mars.name == "Mars"
+
+
 @pytest.mark.django_db
 def test_update_planet_incorrect_id(client):
     """
@@ -325,3 +382,333 @@ def test_add_planet_with_climates(client, add_planet, add_climate):
     assert resp.data["population"] == 8_100_000_000
     assert len(resp.data["climates"]) == 1
     assert resp.data["climates"][0]["name"] == "temperate"
+
+
+@pytest.mark.django_db
+def test_get_all_planets_query_count_is_constant(
+    client, add_planet, add_terrain, add_climate, django_assert_num_queries
+):
+    """
+    Test case to verify that listing planets runs a fixed number of queries.
+
+    The list view needs one query for its ETag and one for the planets, whose
+    terrains and climates are denormalized, no matter how many planets exist.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        add_climate: Fixture to add a climate.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    desert = add_terrain(name="desert")
+    arid = add_climate(name="arid")
+    for index in range(10):
+        planet = add_planet(name=f"Planet {index}")
+        planet.terrains.add(desert)
+        planet.climates.add(arid)
+
+    with django_assert_num_queries(2):
+        resp = client.get("/api/planets/")
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == 10
+    assert resp.data["results"][9]["terrains"][0]["name"] == "desert"
+    assert resp.data["results"][9]["climates"][0]["name"] == "arid"
+
+
+@pytest.mark.django_db
+def test_get_single_planet_query_count(
+    client, add_planet, add_terrain, add_climate, django_assert_num_queries
+):
+    """
+    Test case to verify that retrieving a planet loads its relations in a fixed number of queries.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        add_climate: Fixture to add a climate.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth", population=8_100_000_000)
+    planet.terrains.add(add_terrain(name="desert"), add_terrain(name="mountain"))
+    planet.climates.add(add_climate(name="temperate"))
+
+    with django_assert_num_queries(2):
+        resp = client.get(f"/api/planets/{planet.id}/")
+    assert resp.status_code == 200
+    assert len(resp.data["terrains"]) == 2
+    assert len(resp.data["climates"]) == 1
+
+
+@pytest.mark.django_db
+def test_get_all_planets_unpaginated(client, add_planet):
+    """
+    Test case to verify that the unpaginated list is still available with `?paginate=false`.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    planet_one = add_planet(name="Earth", population=1_000_000)
+    planet_two = add_planet(name="Mars")
+    resp = client.get("/api/planets/?paginate=false")
+    assert resp.status_code == 200
+    assert [planet["name"] for planet in resp.data] == [planet_one.name, planet_two.name]
+
+
+@pytest.mark.django_db
+def test_get_all_planets_cursor_pagination(client, add_planet, django_assert_num_queries):
+    """
+    Test case to verify that the planets can be walked page by page with the cursor links.
+
+    Every page, including the last one, is fetched with the same number of queries.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    planets = [add_planet(name=f"Planet {index}") for index in range(5)]
+
+    resp = client.get("/api/planets/?page_size=2")
+    assert resp.status_code == 200
+    assert resp.data["previous"] is None
+    names = [planet["name"] for planet in resp.data["results"]]
+
+    while resp.data["next"]:
+        with django_assert_num_queries(2):
+            resp = client.get(resp.data["next"])
+        assert resp.status_code == 200
+        assert resp.data["previous"] is not None
+        names += [planet["name"] for planet in resp.data["results"]]
+
+    assert names == [planet.name for planet in planets]
+
+    resp = client.get(resp.data["previous"])
+    assert [planet["name"] for planet in resp.data["results"]] == ["Planet 2", "Planet 3"]
+
+
+@pytest.mark.django_db
+def test_get_all_planets_client_ordering(client, add_planet):
+    """
+    Test case to verify that clients can choose an allowed ordering and that unknown ones are ignored.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    add_planet(name="Earth")
+    add_planet(name="Mars")
+    add_planet(name="Alderaan")
+
+    resp = client.get("/api/planets/?ordering=-id")
+    assert [planet["name"] for planet in resp.data["results"]] == ["Alderaan", "Mars", "Earth"]
+
+    resp = client.get("/api/planets/?ordering=name&page_size=2")
+    assert [planet["name"] for planet in resp.data["results"]] == ["Alderaan", "Earth"]
+    resp = client.get(resp.data["next"])
+    assert [planet["name"] for planet in resp.data["results"]] == ["Mars"]
+
+    resp = client.get("/api/planets/?ordering=population")
+    assert [planet["name"] for planet in resp.data["results"]] == ["Earth", "Mars", "Alderaan"]
+
+
+def test_cursor_pagination_breaks_ties_by_id(rf):
+    """
+    Test case to verify that the pages are also ordered by id, so rows sharing a name keep their order from page to page.
+
+    Args:
+        rf: Django request factory.
+
+    Returns:
+        None
+    """
+    def ordering(query):
+        return PlanetCursorPagination().get_ordering(Request(rf.get(f"/api/planets/?{query}")), None, None)
+
+    assert ordering("ordering=name") == ("name", "id")
+    assert ordering("ordering=-name") == ("-name", "-id")
+    assert ordering("ordering=-id") == ("-id",)
+    assert ordering("ordering=population") == ("id",)
+
+
+@pytest.mark.django_db
+def test_get_all_planets_invalid_cursor(client):
+    """
+    Test case to verify that an invalid cursor returns a 404 status code.
+    """
+    resp = client.get("/api/planets/?cursor=foo")
+    assert resp.status_code == 404
+
+
+@pytest.mark.django_db
+def test_stream_all_planets_json(client, add_planet, add_terrain, settings):
+    """
+    Test case to verify that `?stream=1` streams every planet as a JSON array.
+
+    The chunk size is lowered so the planets are spread over several chunks,
+    and the streamed body must match the unpaginated response.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        settings: Fixture to override the Django settings.
+
+    Returns:
+        None
+    """
+    settings.PLANETS_STREAM_CHUNK_SIZE = 2
+    desert = add_terrain(name="desert")
+    for index in range(5):
+        add_planet(name=f"Planet {index}", population=index).terrains.add(desert)
+
+    resp = client.get("/api/planets/?stream=1")
+    assert resp.status_code == 200
+    assert resp.streaming
+    assert resp["Content-Type"] == "application/json"
+    content = b"".join(resp.streaming_content)
+    assert content == client.get("/api/planets/?paginate=false").content
+    assert json.loads(content)[4]["terrains"] == [{"id": desert.id, "name": "desert"}]
+
+
+@pytest.mark.django_db
+def test_stream_all_planets_empty(client):
+    """
+    Test case to verify that streaming an empty catalogue returns an empty JSON array.
+    """
+    resp = client.get("/api/planets/?stream=1")
+    assert resp.status_code == 200
+    assert b"".join(resp.streaming_content) == b"[]"
+
+
+@pytest.mark.django_db
+def test_stream_all_planets_ndjson(client, add_planet, settings):
+    """
+    Test case to verify that accepting `application/x-ndjson` streams one planet per line.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        settings: Fixture to override the Django settings.
+
+    Returns:
+        None
+    """
+    settings.PLANETS_STREAM_CHUNK_SIZE = 2
+    for index in range(3):
+        add_planet(name=f"Planet {index}")
+
+    resp = client.get("/api/planets/", HTTP_ACCEPT="application/x-ndjson")
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(resp.streaming_content).splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["Planet 0", "Planet 1", "Planet 2"]
+
+    resp = client.get("/api/planets/?stream=ndjson")
+    assert resp["Content-Type"] == "application/x-ndjson"
+    assert b"".join(resp.streaming_content).splitlines() == lines
+
+
+@pytest.mark.django_db
+def test_stream_all_planets_queries_per_chunk(client, add_planet, settings, django_assert_num_queries):
+    """
+    Test case to verify that the stream loads the planets and their relations chunk by chunk.
+
+    Each chunk costs a single query and a last empty chunk ends the stream.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        settings: Fixture to override the Django settings.
+        django_assert_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    settings.PLANETS_STREAM_CHUNK_SIZE = 2
+    for index in range(4):
+        add_planet(name=f"Planet {index}")
+
+    with django_assert_num_queries(2 + 1):
+        resp = client.get("/api/planets/?stream=1")
+        assert len(json.loads(b"".join(resp.streaming_content))) == 4
+
+
+@pytest.mark.django_db
+def test_get_all_planets_sparse_fields(client, add_planet, add_terrain, add_climate, django_assert_max_num_queries):
+    """
+    Test case to verify that `?fields=` trims the planets and their query, and `?expand=` adds relations.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+        add_terrain: Fixture to add a terrain.
+        add_climate: Fixture to add a climate.
+        django_assert_max_num_queries: Fixture to assert the number of queries.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth", population=8_100_000_000)
+    planet.terrains.add(add_terrain(name="desert"))
+    planet.climates.add(add_climate(name="arid"))
+
+    with django_assert_max_num_queries(2) as captured:
+        resp = client.get("/api/planets/?fields=name&ordering=-name")
+    assert resp.data["results"] == [{"name": "Earth"}]
+    planets_query = captured.captured_queries[-1]["sql"]
+    assert "terrain_names" not in planets_query and "population" not in planets_query
+
+    resp = client.get("/api/planets/?fields=id,name&expand=terrains")
+    assert resp.data["results"] == [{"id": planet.id, "name": "Earth", "terrains": [{"id": 1, "name": "desert"}]}]
+
+    resp = client.get("/api/planets/?paginate=false&fields=population")
+    assert resp.data == [{"population": 8_100_000_000}]
+
+    resp = client.get("/api/planets/?stream=ndjson&fields=id,climates")
+    assert json.loads(b"".join(resp.streaming_content)) == {"id": planet.id, "climates": [{"id": 1, "name": "arid"}]}
+
+    resp = client.get("/api/planets/?fields=mass")
+    assert resp.status_code == 400
+    assert resp.data == {"fields": ["Unknown fields: mass."]}
+
+
+@pytest.mark.django_db
+def test_get_single_planet_sparse_fields(client, add_planet):
+    """
+    Test case to verify that a single planet can be trimmed to some of its fields.
+
+    Args:
+        client: Django test client object.
+        add_planet: Fixture to add a planet.
+
+    Returns:
+        None
+    """
+    planet = add_planet(name="Earth", population=8_100_000_000)
+    resp = client.get(f"/api/planets/{planet.id}/?fields=name,population")
+    assert resp.status_code == 200
+    assert resp.data == {"name": "Earth", "population": 8_100_000_000}
+
+    resp = client.get(f"/api/planets/{planet.id}/?expand=climates&fields=")
+    assert resp.data == {"climates": []}
+
+    resp = client.get(f"/api/planets/{planet.id}/")
+    assert set(resp.data) == {"id", "name", "population", "terrains", "climates"}
@@ -0,0 +1,133 @@
+import pytest
+
+from benchmarks import api
+from benchmarks import asgi
+from benchmarks import connections
+from benchmarks import denorm
+from benchmarks import percentile
+from benchmarks import renderers
+from benchmarks import summarize
+from benchmarks import search
+
+
+def test_percentile_and_summary():
+    """
+    Test case to verify the nearest-rank percentiles of the benchmark summaries.
+    """
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 1) == 100
+    assert percentile([7], 0.99) == 7
+
+    summary = summarize([0.001, 0.002, 0.003, 0.010])
+    assert summary["count"] == 4
+    assert summary["p50_ms"] == 2
+    assert summary["max_ms"] == 10
+
+
+def test_synthetic_names_are_unique():
+    """
+    Test case to verify that the synthetic planet names are unique and not sorted.
+    """
+    names = search.synthetic_names(5000)
+    assert len(set(names)) == 5000
+    assert names != sorted(names)
+    assert all(len(name.split()) == 2 for name in names)
+
+
+@pytest.mark.django_db
+def test_search_benchmark_runs():
+    """
+    Test case to verify that the search benchmark runs end to end on a small dataset.
+    """
+    result = search.run(rows=300, queries=20, warmup=2)
+
+    assert result["rows"] == 300
+    assert result["count"] == 20
+    assert result["p95_ms"] <= result["max_ms"]
+    assert "passed" in result
+
+
+@pytest.mark.django_db
+def test_denorm_benchmark_runs():
+    """
+    Test case to verify that the denormalization benchmark times both read paths on a small dataset.
+    """
+    result = denorm.run(rows=200, pages=10, page_size=20, warmup=2)
+
+    assert result["rows"] == 200
+    assert result["join"]["count"] == result["denormalized"]["count"] == 10
+    assert result["speedup_p50"] > 0
+
+
+def test_asgi_benchmark_requests():
+    """
+    Test case to verify that the ASGI benchmark asks for one list page for every four planet details.
+    """
+    paths = asgi.sample_paths([1, 2, 3], 10)
+    assert paths.count("/api/planets/?page_size=20") == 2
+    assert set(paths) - {"/api/planets/?page_size=20"} <= {"/api/planets/1/", "/api/planets/2/", "/api/planets/3/"}
+    assert set(asgi.SERVERS) == {"wsgi", "asgi_sync_views", "asgi"}
+
+
+@pytest.mark.django_db
+def test_connections_benchmark_runs():
+    """
+    Test case to verify that the connections benchmark times new and persistent connections, and pools on PostgreSQL only.
+    """
+    result = connections.run(requests=20, warmup=2)
+
+    assert result["per_request"]["count"] == result["persistent"]["count"] == 20
+    assert "pooled" not in result
+    assert connections.modes("postgresql") == ["per_request", "persistent", "pooled"]
+
+
+def test_renderers_benchmark_runs():
+    """
+    Test case to verify that the renderers benchmark checks and times both implementations on each size.
+    """
+    result = renderers.run(sizes=[1, 50], repeat=3, warmup=1)
+
+    assert list(result["sizes"]) == [1, 50]
+    assert result["sizes"][50]["fast_render"]["count"] == 3
+    assert result["sizes"][50]["parse_speedup_p50"] > 0
+
+
+@pytest.mark.django_db
+def test_api_benchmark_runs():
+    """
+    Test case to verify that the API benchmark times every scenario and populate on a small dataset.
+    """
+    result = api.run(rows=100, requests=5, warmup=1, populate_rows=30)
+
+    assert list(result["scenarios"]) == [*api.SCENARIOS, "populate"]
+    assert result["scenarios"]["detail"]["count"] == 5
+    assert result["scenarios"]["list"]["queries"] >= 1
+    assert result["scenarios"]["populate"]["rows"] == 30
+    assert result["scenarios"]["populate"]["queries"] > 0
+
+
+def test_api_benchmark_compare():
+    """
+    Test case to verify that slower latencies, lower throughputs and extra queries past the tolerance are regressions.
+    """
+    baseline = {"runs": [{"rows": 1000, "scenarios": {
+        "list": {"p50_ms": 10, "p95_ms": 20, "throughput_rps": 100, "queries": 2},
+        "populate": {"seconds": 1, "rows_per_s": 1000, "queries": 50},
+    }}]}
+    result = {"runs": [
+        {"rows": 1000, "scenarios": {
+            "list": {"p50_ms": 11, "p95_ms": 30, "throughput_rps": 80, "queries": 3},
+            "populate": {"seconds": 1.1, "rows_per_s": 900, "queries": 50},
+            "detail": {"p50_ms": 100, "queries": 9},
+        }},
+        {"rows": 100_000, "scenarios": {"list": {"p50_ms": 1000}}},
+    ]}
+
+    regressions = api.compare(result, baseline, tolerance=0.2)
+
+    assert [(item["scenario"], item["metric"]) for item in regressions] == [
+        ("list", "p95_ms"), ("list", "throughput_rps"), ("list", "queries"),
+    ]
+    assert regressions[0] == {"rows": 1000, "scenario": "list", "metric": "p95_ms", "baseline": 20, "current": 30}
@@ -0,0 +1,175 @@
+import threading
+
+import pytest
+from django.db import connections
+from django.db.backends.sqlite3 import base as sqlite3
+
+from drf_project.db import pool
+from drf_project.db.pool import ConnectionPool
+from drf_project.db.pool import PooledDatabaseWrapperMixin
+from drf_project.db.pool import PoolTimeout
+
+
+class Connection:
+    """
+    Stand-in for a database connection, which only knows whether it is closed.
+    """
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class PooledSQLiteWrapper(PooledDatabaseWrapperMixin, sqlite3.DatabaseWrapper):
+    pass
+
+
+@pytest.fixture(scope="function")
+def pooled_database(db, tmp_path):
+    """
+    Fixture that gives a pooled SQLite database wrapper, and drops its pool afterwards.
+
+    Args:
+        db: Fixture enabling database access.
+        tmp_path: Fixture giving a temporary directory.
+
+    Returns:
+        DatabaseWrapper: The wrapper of a SQLite file with a pool of two connections.
+    """
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "NAME": str(tmp_path / "pooled.sqlite3"),
+        "POOL": {"MAX_SIZE": 2, "TIMEOUT": 0.1},
+    }
+    database = PooledSQLiteWrapper(settings_dict, alias="pooled")
+    yield database
+    database.close()
+    pool.pools.pop("pooled").close_idle()
+
+
+def test_pool_reuses_connections():
+    """
+    Test case to verify that checked in connections are handed out again, and closed ones are replaced.
+    """
+    connection_pool = ConnectionPool(max_size=2, timeout=1)
+    first = connection_pool.checkout(Connection)
+    connection_pool.checkin(first)
+    assert connection_pool.checkout(Connection) is first
+
+    first.close()
+    connection_pool.checkin(first)
+    second = connection_pool.checkout(Connection)
+    assert second is not first
+
+    connection_pool.checkin(second, discard=True)
+    assert second.closed
+    stats = connection_pool.stats()
+    assert (stats["size"], stats["opened"], stats["closed"], stats["checkouts"]) == (0, 2, 2, 3)
+
+
+def test_pool_is_bounded():
+    """
+    Test case to verify that a full pool makes threads wait for a connection, and times out.
+    """
+    connection_pool = ConnectionPool(max_size=1, timeout=0.05)
+    connection = connection_pool.checkout(Connection)
+    with pytest.raises(PoolTimeout, match="1 connections in use"):
+        connection_pool.checkout(Connection)
+
+    connection_pool.timeout = 5
+    checked_out = []
+    waiter = threading.Thread(target=lambda: checked_out.append(connection_pool.checkout(Connection)))
+    waiter.start()
+    while not connection_pool.stats()["waiting"]:
+        pass
+    connection_pool.checkin(connection)
+    waiter.join()
+    assert checked_out == [connection]
+
+    stats = connection_pool.stats()
+    assert (stats["size"], stats["in_use"], stats["timeouts"]) == (1, 1, 1)
+    assert stats["wait_max_ms"] > 0
+    assert stats["checkout_max_ms"] >= stats["wait_max_ms"]
+
+
+def test_pool_closes_expired_connections():
+    """
+    Test case to verify that connections past their lifetime are closed when checked in.
+    """
+    connection_pool = ConnectionPool(max_size=1, timeout=1, max_lifetime=0)
+    connection = connection_pool.checkout(Connection)
+    connection_pool.checkin(connection)
+    assert connection.closed
+    assert connection_pool.stats()["idle"] == 0
+
+
+def test_pooled_wrapper_checks_connections_in(pooled_database):
+    """
+    Test case to verify that closing a pooled database connection gives it back to the pool.
+
+    Args:
+        pooled_database: Fixture giving a pooled database wrapper.
+
+    Returns:
+        None
+    """
+    pooled_database.ensure_connection()
+    raw = pooled_database.connection
+    pooled_database.close()
+    assert pooled_database.connection is None
+
+    with pooled_database.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    assert pooled_database.connection is raw
+    pooled_database.close()
+
+    stats = pool.pools["pooled"].stats()
+    assert (stats["opened"], stats["checkouts"], stats["idle"]) == (1, 2, 1)
+
+
+def test_pooled_wrapper_rolls_back_and_discards(pooled_database):
+    """
+    Test case to verify that an open transaction is rolled back, and a connection closed inside an atomic block is discarded.
+
+    Args:
+        pooled_database: Fixture giving a pooled database wrapper.
+
+    Returns:
+        None
+    """
+    with pooled_database.cursor() as cursor:
+        cursor.execute("CREATE TABLE planet (name TEXT)")
+    pooled_database.set_autocommit(False)
+    with pooled_database.cursor() as cursor:
+        cursor.execute("INSERT INTO planet VALUES ('Tatooine')")
+    pooled_database.close()
+    pooled_database.ensure_connection()
+    pooled_database.set_autocommit(True)
+    with pooled_database.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM planet")
+        assert cursor.fetchone() == (0,)
+
+    pooled_database.in_atomic_block = True
+    pooled_database.close()
+    pooled_database.in_atomic_block = False
+    assert pool.pools["pooled"].stats()["closed"] == 1
+
+
+def test_db_pool_endpoint(client, pooled_database):
+    """
+    Test case to verify that the pool endpoint reports the pool of each pooled database.
+
+    Args:
+        client: Django test client object.
+        pooled_database: Fixture giving a pooled database wrapper.
+
+    Returns:
+        None
+    """
+    pooled_database.ensure_connection()
+    resp = client.get("/db/pool/")
+    assert resp.status_code == 200
+    assert resp.json()["pooled"]["in_use"] == 1
+    assert resp.json()["pooled"]["max_size"] == 2
@@ -0,0 +1,57 @@
+import pytest
+
+from drf_project.query_budget import QueryBudget
+from drf_project.query_budget import QueryBudgetExceeded
+from drf_project.query_budget import query_budget
+from planets.models import Planet
+
+
+@pytest.mark.django_db
+def test_query_budget_within_budget():
+    """
+    Test case to verify that a block within its budget runs normally and records its queries.
+    """
+    with QueryBudget(2, strict=True) as budget:
+        list(Planet.objects.all())
+        list(Planet.objects.all())
+    assert len(budget.queries) == 2
+
+
+@pytest.mark.django_db
+def test_query_budget_exceeded_raises():
+    """
+    Test case to verify that a strict budget raises when the block runs too many queries.
+    """
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        with QueryBudget(1, name="planets", strict=True):
+            list(Planet.objects.all())
+            list(Planet.objects.all())
+    assert "planets ran 2 queries, over its budget of 1" in str(excinfo.value)
+
+
+@pytest.mark.django_db
+def test_query_budget_exceeded_warns_when_not_strict(caplog):
+    """
+    Test case to verify that a non strict budget only logs a warning when it is exceeded.
+    """
+    with QueryBudget(0, strict=False):
+        list(Planet.objects.all())
+    assert "over its budget of 0" in caplog.text
+
+
+@pytest.mark.django_db
+def test_query_budget_decorator_follows_setting(settings):
+    """
+    Test case to verify that the decorator enforces the budget when QUERY_BUDGET_STRICT is on.
+    """
+    @query_budget(0)
+    def list_planets():
+        return list(Planet.objects.all())
+
+    settings.QUERY_BUDGET_STRICT = True
+    with pytest.raises(QueryBudgetExceeded):
+        list_planets()
+
+    settings.QUERY_BUDGET_STRICT = False
+    assert list_planets() == []
+    assert list_planets.query_budget == 0
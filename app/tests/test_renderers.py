@@ -0,0 +1,149 @@
+import datetime
+import decimal
+import io
+import random
+import uuid
+
+import pytest
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from drf_project import parsers
+from drf_project import renderers
+from drf_project.parsers import FastJSONParser
+from drf_project.renderers import FastJSONRenderer
+
+
+def planets(count, seed=0):
+    """
+    Build planet representations with non-ASCII names and line separators.
+
+    Returns:
+        list: The planets, as PlanetReadSerializer would serialize them.
+    """
+    rng = random.Random(seed)
+    names = ["Tatooine", "Ĥoth", "Naboo\u2028", "Ryl\u2029oth", "Dagobah \"swamp\"", "日本", "Kessel\\run"]
+    return [
+        {
+            "id": index,
+            "name": f"{rng.choice(names)} {index}",
+            "population": rng.choice([None, 0, rng.randrange(10**12)]),
+            "terrains": [{"id": rng.randrange(40), "name": "océan"} for _ in range(rng.randint(0, 3))],
+            "climates": [],
+        }
+        for index in range(count)
+    ]
+
+
+SAMPLES = [
+    planets(200),
+    {"detail": ErrorDetail("Not found.", code="not_found")},
+    ReturnDict({"name": ["planet with this name already exists."]}, serializer=None),
+    {"created": datetime.datetime(2023, 3, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc)},
+    {"day": datetime.date(2023, 3, 1), "time": datetime.time(12, 30), "uuid": uuid.UUID(int=7)},
+    {"average": decimal.Decimal("12.50"), "total": 2**70, 1: "integer key", "nested": ((1, 2), [])},
+    [1e16, 1e-05, 0.1, -0.0, 123456789.123, 2.5e-300, 0.00012],
+    {"texts": ["1e5 is a number", "", "\x00\x1f", "🚀"]},
+    [],
+    {},
+    "",
+    0,
+    True,
+]
+
+
+@pytest.mark.parametrize("data", SAMPLES)
+def test_fast_renderer_is_byte_identical(data):
+    """
+    Test case to verify that the fast renderer writes exactly the bytes of DRF's JSONRenderer.
+    """
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_fast_renderer_floats_are_byte_identical():
+    """
+    Test case to verify that floats of any magnitude are written as the stdlib writes them.
+    """
+    rng = random.Random(1)
+    values = [rng.random() * 10 ** rng.randint(-30, 30) * rng.choice([1, -1]) for _ in range(5000)]
+    assert FastJSONRenderer().render(values) == JSONRenderer().render(values)
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_fast_renderer_writes_non_finite_floats_as_null(value):
+    """
+    Test case to verify the one known difference from JSONRenderer: non-finite floats are written as null instead of raising.
+    """
+    data = {"population": value, "name": None}
+    with pytest.raises(ValueError):
+        JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data) == b'{"population":null,"name":null}'
+
+
+def test_fast_renderer_falls_back_to_json_renderer(monkeypatch):
+    """
+    Test case to verify that indented output, None and a missing orjson are left to JSONRenderer.
+    """
+    data = planets(3)
+    media_type = "application/json; indent=4"
+    assert FastJSONRenderer().render(data, media_type) == JSONRenderer().render(data, media_type)
+    assert FastJSONRenderer().render(data, renderer_context={"indent": 2}) == JSONRenderer().render(
+        data, renderer_context={"indent": 2}
+    )
+    assert FastJSONRenderer().render(None) == b""
+
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    with pytest.raises(TypeError):
+        FastJSONRenderer().render({"unknown": object()})
+
+
+def parse(parser, body, encoding="utf-8"):
+    return parser.parse(io.BytesIO(body), parser_context={"encoding": encoding})
+
+
+@pytest.mark.parametrize("data", SAMPLES)
+def test_fast_parser_reads_rendered_documents(data):
+    """
+    Test case to verify that the fast parser reads back what the renderer wrote, as JSONParser does.
+    """
+    body = FastJSONRenderer().render(data)
+    assert parse(FastJSONParser(), body) == parse(JSONParser(), body)
+
+
+@pytest.mark.parametrize("body", [
+    b'{"population": 123456789012345678901234567890}',
+    b'"\\ud800"',
+    b'{"name": "Hoth", "name": "Endor"}',
+])
+def test_fast_parser_matches_json_parser(body):
+    """
+    Test case to verify that long integers, lone surrogates and repeated keys are read as JSONParser reads them.
+    """
+    assert parse(FastJSONParser(), body) == parse(JSONParser(), body)
+
+
+@pytest.mark.parametrize("body", [b'{"name": ', b"NaN", b"\xff", b""])
+def test_fast_parser_errors_match_json_parser(body):
+    """
+    Test case to verify that invalid documents raise the ParseError of JSONParser.
+    """
+    with pytest.raises(ParseError) as expected:
+        parse(JSONParser(), body)
+    with pytest.raises(ParseError) as error:
+        parse(FastJSONParser(), body)
+    assert str(error.value) == str(expected.value)
+
+
+def test_fast_parser_falls_back_to_json_parser(monkeypatch):
+    """
+    Test case to verify that other encodings and a missing orjson are left to JSONParser.
+    """
+    body = '{"name": "Hôth"}'.encode("latin-1")
+    assert parse(FastJSONParser(), body, encoding="latin-1") == {"name": "Hôth"}
+
+    monkeypatch.setattr(parsers, "orjson", None)
+    assert parse(FastJSONParser(), b'{"id": 1}') == {"id": 1}
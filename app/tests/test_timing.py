@@ -0,0 +1,208 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.sync import iscoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+
+from drf_project.timing import RequestTimer
+from drf_project.timing import ServerTimingMiddleware
+from drf_project.timing import request_timer
+from drf_project.timing import timed
+from planets.models import Planet
+from planets.serializers import PlanetReadSerializer
+
+
+def parse_server_timing(header):
+    """
+    Read a Server-Timing header into a dict of metrics.
+
+    Args:
+        header (str): The header value.
+
+    Returns:
+        dict: The parameters of each metric, by metric name.
+    """
+    metrics = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db
+def test_server_timing_header_on_planet_list(client):
+    """
+    Test case to verify that the planet list reports its queries, serializer and render times.
+    """
+    Planet.objects.create(name="Tatooine")
+
+    with CaptureQueriesContext(connection) as queries:
+        resp = client.get("/api/planets/")
+    assert resp.status_code == 200
+
+    metrics = parse_server_timing(resp["Server-Timing"])
+    assert set(metrics) == {"db", "serialize", "render", "total"}
+    assert metrics["db"]["desc"] == f'"{len(queries)} queries"'
+    for metric in metrics.values():
+        assert float(metric["dur"]) >= 0
+    assert float(metrics["total"]["dur"]) >= float(metrics["render"]["dur"])
+    assert request_timer.get() is None
+
+
+@pytest.mark.django_db
+def test_server_timing_logs_request(client, caplog):
+    """
+    Test case to verify that each request is logged with its timings, also as structured fields.
+    """
+    with caplog.at_level(logging.INFO, logger="drf_project.timing"):
+        client.get("/ping/")
+
+    record, = [record for record in caplog.records if record.name == "drf_project.timing"]
+    assert record.getMessage().startswith("GET /ping/ 200 queries=0 db_ms=0.0 total_ms=")
+    assert record.server_timing["path"] == "/ping/"
+    assert record.server_timing["status"] == 200
+    assert record.server_timing["queries"] == 0
+
+
+@pytest.mark.django_db
+def test_server_timing_explains_slow_queries(client, caplog, settings):
+    """
+    Test case to verify that queries over the threshold are logged with their plan.
+    """
+    settings.SERVER_TIMING_SLOW_QUERY_MS = 0
+    Planet.objects.create(name="Tatooine")
+
+    with caplog.at_level(logging.INFO, logger="drf_project.timing"):
+        resp = client.get("/api/planets/?search=Tatooine")
+    assert resp.status_code == 200
+
+    slow = [record.slow_query for record in caplog.records if hasattr(record, "slow_query")]
+    assert slow
+    assert all(query["plan"] for query in slow if query["sql"].startswith("SELECT"))
+    assert "Plan:" in caplog.text
+    # The EXPLAIN queries are not counted as queries of the request.
+    assert parse_server_timing(resp["Server-Timing"])["db"]["desc"] == f'"{len(slow)} queries"'
+
+
+@pytest.mark.django_db
+def test_request_timer_does_not_explain_writes():
+    """
+    Test case to verify that only SELECT queries are explained.
+    """
+    timer = RequestTimer(slow_query_ms=0)
+    token = request_timer.set(timer)
+    try:
+        with connection.execute_wrapper(timer.record):
+            Planet.objects.create(name="Hoth")
+            list(Planet.objects.all())
+    finally:
+        request_timer.reset(token)
+
+    plans = {query["sql"].split()[0]: query["plan"] for query in timer.slow_queries}
+    assert plans["INSERT"] is None
+    assert plans["SELECT"]
+
+
+@pytest.mark.django_db
+def test_request_timer_explains_in_a_savepoint():
+    """
+    Test case to verify that a failing EXPLAIN is rolled back to a savepoint, leaving the transaction of the request usable.
+    """
+    timer = RequestTimer(slow_query_ms=0)
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            assert timer.explain(connection, "SELECT * FROM missing_table", []) is None
+        assert Planet.objects.create(name="Hoth").pk
+
+    statements = [query["sql"].split()[0] for query in queries]
+    assert statements == ["SAVEPOINT", "EXPLAIN", "ROLLBACK", "RELEASE"]
+
+
+def test_timed_nested_phases_count_once():
+    """
+    Test case to verify that nested blocks of a phase are counted once, and that timing is off outside requests.
+    """
+    with timed("serialize"):
+        pass
+
+    timer = RequestTimer()
+    token = request_timer.set(timer)
+    try:
+        with timed("serialize"):
+            with timed("serialize"):
+                pass
+            outer = timer.phases["serialize"]
+    finally:
+        request_timer.reset(token)
+    assert outer == 0
+    assert timer.phases["serialize"] > 0
+
+
+def test_server_timing_middleware_disabled(settings):
+    """
+    Test case to verify that the middleware is left out when SERVER_TIMING is off.
+    """
+    settings.SERVER_TIMING = False
+    with pytest.raises(MiddlewareNotUsed):
+        ServerTimingMiddleware(lambda request: HttpResponse())
+
+
+@pytest.mark.django_db
+def test_server_timing_stays_async_under_asgi(settings, caplog):
+    """
+    Test case to verify that async views are timed without adapting the middleware chain to sync.
+    """
+    settings.DEBUG = True
+    settings.ROOT_URLCONF = "tests.planets.async_urls"
+    planet = Planet.objects.create(name="Tatooine")
+
+    async def get_response(request):
+        return HttpResponse()
+
+    assert iscoroutinefunction(ServerTimingMiddleware(get_response))
+
+    client = AsyncClient()
+
+    async def fetch():
+        return await client.get(f"/api/planets/{planet.id}/")
+
+    with caplog.at_level(logging.DEBUG, logger="django.request"):
+        resp = async_to_sync(fetch)()
+    assert resp.status_code == 200
+    assert "adapted for middleware drf_project.timing" not in caplog.text
+
+    metrics = parse_server_timing(resp["Server-Timing"])
+    assert metrics["db"]["desc"] != '"0 queries"'
+    assert {"serialize", "render", "total"} <= set(metrics)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("joined", [False, True])
+def test_read_serializer_queries_outside_serialize_phase(joined):
+    """
+    Test case to verify that the read serializer runs its queries before its serialize phase, so they are not counted twice.
+    """
+    Planet.objects.create(name="Tatooine")
+    timer = RequestTimer()
+    phases_of_queries = []
+
+    def record_phase(execute, sql, params, many, context):
+        phases_of_queries.append(timer._depths["serialize"])
+        return execute(sql, params, many, context)
+
+    token = request_timer.set(timer)
+    try:
+        with connection.execute_wrapper(record_phase):
+            data = PlanetReadSerializer(Planet.objects.all(), many=True, joined=joined).data
+    finally:
+        request_timer.reset(token)
+
+    assert [planet["name"] for planet in data] == ["Tatooine"]
+    assert phases_of_queries and not any(phases_of_queries)
+    assert timer.phases["serialize"] > 0